@@ -11,6 +11,8 @@ from m5.objects.BranchPredictor import (
     MultiperspectivePerceptronTAGE64KB,
 )
 
+from utils import area_model
+
 @dataclasses.dataclass
 class O3CoreConfig:
     width: int
@@ -124,22 +126,23 @@ class O3CPU(BaseCPUProcessor):
         cores = big_cores + little_cores
         
         super().__init__(cores)
-        # self._width = width
-        # self._rob_size = rob_size
-        # self._num_int_regs = num_int_regs
-        # self._num_fp_regs = num_fp_regs
-
-    # def get_area_score(self):
-    #     """
-    #     :returns the area score of a pipeline using its parameters width,
-    #     rob_size, num_int_regs, and num_fp_regs.
-    #     """
-    #     score = (
-    #         self._width
-    #         * (2 * self._rob_size + self._num_int_regs + self._num_fp_regs)
-    #         + 4 * self._width
-    #         + 2 * self._rob_size
-    #         + self._num_int_regs
-    #         + self._num_fp_regs
-    #     )
-    #     return score
\ No newline at end of file
+        self._processor_configs = processor_configs
+
+    def get_area_score(self):
+        """
+        :returns the area score of the processor, i.e. the sum of the area
+        scores of all cores computed from their width, rob_size, num_int_regs,
+        and num_fp_regs.
+        """
+        score = 0
+        for core_config, core_num in (
+            (self._processor_configs.big_core, self._processor_configs.big_core_num),
+            (self._processor_configs.little_core, self._processor_configs.little_core_num),
+        ):
+            score += core_num * area_model.core_area_score(
+                core_config.width,
+                core_config.rob_size,
+                core_config.num_int_regs,
+                core_config.num_fp_regs,
+            )
+        return score
@@ -4,16 +4,25 @@ import dataclasses
 import csv
 import argparse
 from pathlib import Path
+from typing import Callable
 
+import m5
 from m5.objects import ReplacementPolicies, Prefetcher, Process
 from m5.util import addToPath
-from gem5.components.memory import SingleChannelDDR3_1600
+from gem5.components.memory import SingleChannelDDR3_1600, DualChannelDDR3_1600
 from gem5.components.boards.simple_board import SimpleBoard
 from gem5.resources.resource import BinaryResource
+from gem5.simulate.exit_event import ExitEvent
 from gem5.simulate.simulator import Simulator
 
 from components import cache_hierarchies, processors
 import utils.step1_dataclass as step1_dataclass
+import utils.cache_sizing as cache_sizing
+import utils.memory_sizing as memory_sizing
+import utils.stats_parser as stats_parser
+import utils.workload_builder as workload_builder
+import utils.workload_mix as workload_mix
+import utils.work_phases as work_phases
 
 @dataclasses.dataclass
 class ExperimentParams:
@@ -23,6 +32,10 @@ class ExperimentParams:
     processor_config: processors.O3HybridProcessorConfig
     
     mat_size: int = 0
+    kernel_variant: str = "ijk"
+    block_size: int = 0
+    # the workload of the big and the little cores
+    core_workloads: workload_mix.WorkloadMix | None = None
     
     experiment_index: int = -1
 
@@ -52,61 +65,52 @@ def get_prefetcher(prefetcher_type: str, degree: int) -> Prefetcher:
     else:
         raise ValueError("Invalid prefetcher type.")
 
+def get_memory(meta_params_batch: list[step1_dataclass.ExperimentMetaParameter]):
+    """Get a memory large enough for every process of the experiments."""
+    
+    memory_config = memory_sizing.memory_config(
+        memory_sizing.experiment_footprint_bytes(meta_params_batch)
+    )
+    if memory_config.num_channels == 1:
+        return SingleChannelDDR3_1600(memory_config.size_str)
+    elif memory_config.num_channels == 2:
+        return DualChannelDDR3_1600(memory_config.size_str)
+    else:
+        raise ValueError("Invalid memory channel count.")
+
 def parameterization(meta_params: step1_dataclass.ExperimentMetaParameter) -> ExperimentParams:
     """Generate all possible cache configurations based on the meta parameters."""
     
     # generate experiment cache configuration based on the meta parameter
     replacement_policy = get_replacement_policy(meta_params.replacement_policy)
-    
+    geometry = cache_sizing.hierarchy_geometry(
+        meta_params.l1_cache_sample_seed,
+        meta_params.l2_cache_sample_seed,
+        meta_params.l3_cache_sample_seed,
+    )
+
+    def level_config(level: str) -> cache_hierarchies.SingleCacheLevelConfig:
+        return cache_hierarchies.SingleCacheLevelConfig(
+            size=geometry[level].size_str,
+            assoc=geometry[level].assoc,
+            replacement_policy=replacement_policy,
+            prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=geometry[level].prefetch_degree),
+        )
+
     new_cache_config = cache_hierarchies.O3HybridCPUCacheHierarchyConfig(
         big_core_cache_config=cache_hierarchies.O3CPUCacheHierarchyCacheConfig(
-            l1d=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l1_cache_sample_seed * 2) + "kB",
-                assoc=8,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l1_cache_sample_seed * 2),
-            ),
-            l1i=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l1_cache_sample_seed * 2) + "kB",
-                assoc=8,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l1_cache_sample_seed * 2),
-            ),
-            l2=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l2_cache_sample_seed * 16) + "kB",
-                assoc=16,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l2_cache_sample_seed * 4),
-            ),
+            l1d=level_config("big_l1d"),
+            l1i=level_config("big_l1i"),
+            l2=level_config("big_l2"),
         ),
         big_core_type_id=0,
         little_core_cache_config=cache_hierarchies.O3CPUCacheHierarchyCacheConfig(
-            l1d=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l1_cache_sample_seed * 1) + "kB",
-                assoc=4,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l1_cache_sample_seed),
-            ),
-            l1i=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l1_cache_sample_seed * 1) + "kB",
-                assoc=4,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l1_cache_sample_seed),
-            ),
-            l2=cache_hierarchies.SingleCacheLevelConfig(
-                size=str(meta_params.l2_cache_sample_seed * 8) + "kB",
-                assoc=8,
-                replacement_policy=replacement_policy,
-                prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l2_cache_sample_seed * 2),
-            ),
+            l1d=level_config("little_l1d"),
+            l1i=level_config("little_l1i"),
+            l2=level_config("little_l2"),
         ),
         little_core_type_id=1,
-        l3=cache_hierarchies.SingleCacheLevelConfig(
-            size=str(meta_params.l3_cache_sample_seed * 64) + "kB",
-            assoc=32,
-            replacement_policy=replacement_policy,
-            prefetcher=get_prefetcher(meta_params.prefetcher_type, degree=meta_params.l3_cache_sample_seed * 4),
-        ),   
+        l3=level_config("l3"),
     )
     
     new_processor_config = processors.O3HybridProcessorConfig(
@@ -132,50 +136,163 @@ def parameterization(meta_params: step1_dataclass.ExperimentMetaParameter) -> Ex
         cache_config=new_cache_config,
         processor_config=new_processor_config,
         mat_size=meta_params.matsize,
+        kernel_variant=meta_params.kernel_variant,
+        block_size=meta_params.block_size,
+        core_workloads=workload_mix.core_workloads(meta_params),
     )
     
     return new_experiment
 
+def meta_params_from_row(row: dict) -> step1_dataclass.ExperimentMetaParameter:
+    """Convert a row of the metaparameter csv file to the dataclass."""
+    return step1_dataclass.ExperimentMetaParameter(
+        replacement_policy=row["replacement_policy"],
+        prefetcher_type=row["prefetcher_type"],
+        l1_cache_sample_seed=int(row["l1_cache_sample_seed"]),
+        l2_cache_sample_seed=int(row["l2_cache_sample_seed"]),
+        l3_cache_sample_seed=int(row["l3_cache_sample_seed"]),
+        big_core_width=int(row["big_core_width"]),
+        big_core_rob_size=int(row["big_core_rob_size"]),
+        big_core_num_int_regs=int(row["big_core_num_int_regs"]),
+        big_core_num_fp_regs=int(row["big_core_num_fp_regs"]),
+        small_core_width=int(row["small_core_width"]),
+        small_core_rob_size=int(row["small_core_rob_size"]),
+        small_core_num_int_regs=int(row["small_core_num_int_regs"]),
+        small_core_num_fp_regs=int(row["small_core_num_fp_regs"]),
+        big_core_num=int(row["big_core_num"]),
+        small_core_num=int(row["small_core_num"]),
+        matsize=int(row["matsize"]),
+        kernel_variant=row["kernel_variant"],
+        block_size=int(row["block_size"]),
+        workload_mix=row["workload_mix"],
+        seed=int(row["seed"]),
+    )
+
+def workload_arguments(workload: workload_mix.CoreWorkload, num_threads: int = 1) -> list[str]:
+    """The command line arguments of the workload of a core."""
+    # the blocked kernels take the block size as an extra argument, the
+    # threaded ones the thread count
+    arguments = [str(workload.matsize)]
+    if workload.kernel_variant in workload_builder.BLOCKED_VARIANTS:
+        arguments.append(str(workload.block_size))
+    elif workload.kernel_variant in workload_builder.THREADED_VARIANTS:
+        arguments.append(str(num_threads))
+    arguments.append(str(workload.seed))
+    return arguments
+
+def dump_stats(kind: str):
+    """Dump the stats and log the kind of the dump for the stats parser."""
+    
+    with open(Path(m5.options.outdir) / stats_parser.DUMP_KINDS_FILE_NAME, "a") as f:
+        f.write(kind + "\n")
+    m5.stats.dump()
+
+def workload_phase_handlers(
+    num_cores: int, work_id: Callable[[], int], stats_interval: int = 0
+) -> dict:
+    """Exit event handlers that turn every workload run into a stats phase.
+
+    Every core runs the same number of workloads and reports the begin and
+    end of each one with its run index as the work id, which `work_id`
+    returns for the last exit event. The n-th phase dump holds the n-th run,
+    see work_phases.WorkPhaseTracker.
+
+    With a stats interval, the stats are also dumped (without a reset) every
+    time the simulation reaches its tick limit, and before every reset that
+    starts a run, so consecutive dumps cover the whole run.
+    """
+    tracker = work_phases.WorkPhaseTracker(num_cores)
+
+    def on_work_begin():
+        while True:
+            for action in tracker.work_begin(work_id()):
+                if action == work_phases.RESET:
+                    if stats_interval:
+                        dump_stats(stats_parser.INTERVAL_DUMP)
+                    m5.stats.reset()
+            yield False
+
+    def on_work_end():
+        while True:
+            for action in tracker.work_end(work_id()):
+                if action == work_phases.DUMP_PHASE:
+                    dump_stats(stats_parser.PHASE_DUMP)
+                elif action == work_phases.RESET:
+                    m5.stats.reset()
+            yield False
+
+    def on_max_tick():
+        while True:
+            dump_stats(stats_parser.INTERVAL_DUMP)
+            yield False
+
+    handlers = {
+        ExitEvent.WORKBEGIN: on_work_begin(),
+        ExitEvent.WORKEND: on_work_end(),
+    }
+    if stats_interval:
+        handlers[ExitEvent.MAX_TICK] = on_max_tick()
+    return handlers
+
 if __name__ == "__m5_main__":
     parser = argparse.ArgumentParser(description="Hybrid CPU Experiment Executor")
     parser.add_argument("--param_file", type=str, help="The path to the experiment parameter file.")
     parser.add_argument("--target_index", type=int, help="The index of the target experiment.")
+    parser.add_argument(
+        "--target_indices",
+        type=str,
+        default=None,
+        help="Comma-separated indices of experiments that only differ in their "
+        "workload arguments. They are run back to back in one simulation, and "
+        "the stats of each one are dumped separately, in this order.",
+    )
     parser.add_argument("--workload", type=str, help="The workload to run.")
+    parser.add_argument(
+        "--variant_workload",
+        type=str,
+        action="append",
+        default=[],
+        help="VARIANT=PATH, the binary of a kernel variant used by a workload mix. "
+        "Can be given several times.",
+    )
+    parser.add_argument(
+        "--stats_interval",
+        type=int,
+        default=0,
+        help="Also dump the stats every STATS_INTERVAL ticks, 0 disables periodic "
+        "dumps. The interval restarts at every workload begin and end.",
+    )
     
     args = parser.parse_args()
+    if args.target_indices is not None:
+        target_indices = [int(index) for index in args.target_indices.split(",")]
+    else:
+        target_indices = [args.target_index]
     
     # step 1: load the experiment parameters
     # add target file to path
     addToPath(args.param_file)
     with open(args.param_file, "r") as f:
-        # find the target experiment
+        # find the target experiments
         reader = csv.DictReader(f)
-        target_experiment = None
+        target_rows = {}
         for row in reader:
-            if int(row["experiment_index"]) == args.target_index:
-                target_experiment = row
-                break
-        # convert the target experiment to dataclass
-        target_experiment = step1_dataclass.ExperimentMetaParameter(
-            replacement_policy=target_experiment["replacement_policy"],
-            prefetcher_type=target_experiment["prefetcher_type"],
-            l1_cache_sample_seed=int(target_experiment["l1_cache_sample_seed"]),
-            l2_cache_sample_seed=int(target_experiment["l2_cache_sample_seed"]),
-            l3_cache_sample_seed=int(target_experiment["l3_cache_sample_seed"]),
-            big_core_width=int(target_experiment["big_core_width"]),
-            big_core_rob_size=int(target_experiment["big_core_rob_size"]),
-            big_core_num_int_regs=int(target_experiment["big_core_num_int_regs"]),
-            big_core_num_fp_regs=int(target_experiment["big_core_num_fp_regs"]),
-            small_core_width=int(target_experiment["small_core_width"]),
-            small_core_rob_size=int(target_experiment["small_core_rob_size"]),
-            small_core_num_int_regs=int(target_experiment["small_core_num_int_regs"]),
-            small_core_num_fp_regs=int(target_experiment["small_core_num_fp_regs"]),
-            big_core_num=int(target_experiment["big_core_num"]),
-            small_core_num=int(target_experiment["small_core_num"]),
-            matsize=int(target_experiment["matsize"]),
-        )
-        # convert the target experiment to ExperimentParams
-        target_experiment = parameterization(target_experiment)
+            if int(row["experiment_index"]) in target_indices:
+                target_rows[int(row["experiment_index"])] = row
+    missing_indices = set(target_indices) - set(target_rows)
+    if missing_indices:
+        raise ValueError(f"Experiments not found: {sorted(missing_indices)}")
+    # all experiments of a batch share the board
+    board_rows = {
+        tuple((key, value) for key, value in row.items() if key not in step1_dataclass.WORKLOAD_FIELDS)
+        for row in target_rows.values()
+    }
+    if len(board_rows) != 1:
+        raise ValueError("Batched experiments differ in more than their workloads.")
+    # convert the target experiments to ExperimentParams
+    target_meta_params = [meta_params_from_row(target_rows[index]) for index in target_indices]
+    target_experiments = [parameterization(meta_params) for meta_params in target_meta_params]
+    target_experiment = target_experiments[0]
     
     # step 2: build experiment architecture
     processor = processors.O3CPU(target_experiment.processor_config)
@@ -184,7 +301,7 @@ if __name__ == "__m5_main__":
     board = SimpleBoard(
         processor=processor,
         cache_hierarchy=cache_hierarchy,
-        memory=SingleChannelDDR3_1600("32MiB"),
+        memory=get_memory(target_meta_params),
         clk_freq="3GHz",
     )
 
@@ -199,15 +316,65 @@ if __name__ == "__m5_main__":
         ),
     )
 
+    # the binary of every kernel variant
+    binaries = dict(
+        variant_workload.split("=", 1) for variant_workload in args.variant_workload
+    )
+    binaries[target_experiment.kernel_variant] = binary_path.as_posix()
+
     process = []
-    # set the process to each core
     cores = board.get_processor().get_cores()
-    for index in range(target_experiment.processor_config.big_core_num + target_experiment.processor_config.little_core_num):
+    num_cores = target_experiment.processor_config.big_core_num + target_experiment.processor_config.little_core_num
+    threaded = target_experiment.kernel_variant in workload_builder.THREADED_VARIANTS
+    if threaded:
+        # a single process with a thread per core, the threads are placed on
+        # the idle cores as they are cloned
+        workload_command = [binaries[target_experiment.kernel_variant]]
+        for experiment in target_experiments:
+            workload_command += workload_arguments(experiment.core_workloads.big_core, num_cores)
         process.append(Process())
-        process[-1].pid = 1000 + index # avoid pid conflict
-        process[-1].cmd = [binary_path.as_posix(), str(target_experiment.mat_size)]
-        cores[index].core.workload = process[-1]
+        process[-1].pid = 1000
+        process[-1].cmd = workload_command
+        for core in cores:
+            core.core.workload = process[-1]
+    else:
+        # set the process to each core
+        for index in range(num_cores):
+            # pick the workload of the core type from the mix, the core runs the
+            # experiments of a batch one after another
+            if index < target_experiment.processor_config.big_core_num:
+                core_workloads = [experiment.core_workloads.big_core for experiment in target_experiments]
+            else:
+                core_workloads = [experiment.core_workloads.little_core for experiment in target_experiments]
+            kernel_variant = core_workloads[0].kernel_variant
+            if kernel_variant not in binaries:
+                raise ValueError(f"No binary for kernel variant: {kernel_variant}")
+            workload_command = [binaries[kernel_variant]]
+            for core_workload in core_workloads:
+                workload_command += workload_arguments(core_workload)
+
+            process.append(Process())
+            process[-1].pid = 1000 + index # avoid pid conflict
+            process[-1].cmd = workload_command
+            cores[index].core.workload = process[-1]
         
     
-    Simulator(board).run()
+    # every workload run is a separate stats phase
+    board.exit_on_work_items = True
+    # only the main thread of a threaded workload reports its runs
+    num_reporting_processes = 1 if threaded else num_cores
+    # gem5 exits a work item event with its work id as the exit code
+    simulator = Simulator(
+        board,
+        on_exit_event=workload_phase_handlers(
+            num_reporting_processes,
+            lambda: simulator.get_last_exit_event_code(),
+            args.stats_interval,
+        ),
+    )
+    if args.stats_interval:
+        # every run of the simulation loop stops after at most one interval
+        simulator.run(max_ticks=args.stats_interval)
+    else:
+        simulator.run()
     
\ No newline at end of file
@@ -5,40 +5,101 @@ This lab intends to explore how cache configurations affect the performance of a
 """
 
 import dataclasses
+import glob
+import hashlib
+import numpy as np
 import pandas as pd
 import subprocess
 import os
 import tqdm
 
-from utils import parameterization, step1_dataclass
+from utils import (
+    area_model,
+    config_validation,
+    parameterization,
+    pareto,
+    stats_parser,
+    step1_dataclass,
+    workload_builder,
+    workload_mix,
+)
 
 
 def generate_metaparam_combinations(
-    meta_params: step1_dataclass.ExperimentMetaParameter, save_as: str
+    meta_params: step1_dataclass.ExperimentMetaParameter,
+    save_as: str,
+    rejected_save_as: str | None = None,
 ) -> int:
-    """Generate all possible cache configurations based on the meta parameters."""
+    """Generate all possible cache configurations based on the meta parameters.
+
+    Invalid combinations are rejected and equivalent ones merged before
+    anything is saved, so every saved row can be launched.
+    """
 
     # generate experiment cache configuration based on the meta parameter
     meta_params_list = parameterization.recursive_iterate_dataclass(meta_params)
-    meta_params_dicts = []
-    for index, meta_params in enumerate(meta_params_list):
-        meta_params.experiment_index = index
-        meta_params_dicts.append(dataclasses.asdict(meta_params))
+    meta_params_dicts = [
+        dataclasses.asdict(meta_params) for meta_params in meta_params_list
+    ]
 
     # convert the list of dataclasses to a pandas dataframe
     meta_params_df = pd.DataFrame(meta_params_dicts)
+    meta_params_df, rejected_df = config_validation.validate_meta_params(
+        meta_params_df
+    )
+    if not rejected_df.empty:
+        print(f"Rejected {len(rejected_df)} invalid metaparam combinations.")
+        if rejected_save_as is not None:
+            rejected_df.to_csv(rejected_save_as, index=False)
+    meta_params_df = meta_params_df.assign(experiment_index=range(len(meta_params_df)))
     # save the dataframe to a csv file
     meta_params_df.to_csv(save_as, index=False)
 
-    return len(meta_params_list)
+    return len(meta_params_df)
+
+
+def simulator_identity(gem5_path: str, sources: list[str]) -> str:
+    """Identify the simulator the design points run on.
+
+    The gem5 binary is identified by its size and modification time, the
+    Python sources of the executor by their contents.
+    """
+    digest = hashlib.sha256()
+    gem5_stat = os.stat(gem5_path)
+    digest.update(f"{gem5_path}:{gem5_stat.st_size}:{gem5_stat.st_mtime_ns}".encode())
+    for source in sorted(sources):
+        digest.update(source.encode())
+        with open(source, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def design_point_key(row: pd.Series, build_keys: list[str], simulator_key: str) -> str:
+    """Identify a design point across sweeps.
+
+    The workload inputs are seeded, so points with the same meta parameters,
+    workload binaries (`build_keys` of every variant the point runs) and
+    simulator give the same results and finished ones can be reused.
+    """
+    parameters = ",".join(
+        f"{column}={row[column]}" for column in sorted(row.index) if column != "experiment_index"
+    )
+    environment = hashlib.sha256(
+        "\n".join(sorted(set(build_keys)) + [simulator_key]).encode()
+    ).hexdigest()
+    return f"{parameters},environment={environment[:16]}"
 
 
 if __name__ == "__main__":
     # step 1: experiment preparation
     EXP_NAME = "step1_debug"
     META_PARAM_FILE_NAME = "step1_experiment_metaparams.csv"
+    REJECTED_META_PARAM_FILE_NAME = "step1_rejected_metaparams.csv"
     GEM5_RAW_FOLDER_NAME = "gem5_raw_output"
     DATA_FILE_NAME = "step1_experiment_data.csv"
+    PARETO_FILE_NAME = "step1_pareto_front.csv"
+    # results of every finished design point, shared by all experiments
+    RESULT_CACHE_FILE_NAME = "step1_result_cache.csv"
     DATA_FILE_COLUMNS = [
         "experiment_index",
         "simSeconds",
@@ -54,9 +115,15 @@ if __name__ == "__main__":
 
     CURR_DIR_ABS_PATH = os.path.dirname(os.path.abspath(__file__))
     EXECUTOR_REL_PATH = "step1_experiment_executor.py"
-    WORKLOAD_REL_PATH = "workload/matmul/mm-ijk-gem5"
+    WORKLOAD_SOURCE_REL_PATH = "workload/matmul"
+    WORKLOAD_CACHE_REL_PATH = "workload/matmul/build_cache"
+    WORKLOAD_TARGET = "gem5"
     RESULT_FOLDER_REL_PATH = "results"
     GEM5_ABS_PATH = "/home/ruhaotian/XJTU_sys_exp/gem5/build/RISCV/gem5.opt"
+    # ticks between periodic stats dumps, 0 only dumps once per workload; the
+    # per-interval IPC and miss rates are saved next to stats.txt
+    STATS_INTERVAL_TICKS = 0
+    INTERVAL_FILE_NAME = "stats_intervals.npz"
 
     # create the result directory
     result_dir = os.path.join(CURR_DIR_ABS_PATH, RESULT_FOLDER_REL_PATH, EXP_NAME)
@@ -89,146 +156,202 @@ if __name__ == "__main__":
         big_core_num=2,
         small_core_num=2,
         matsize=[64],
+        kernel_variant=["ijk"],
+        block_size=[0],
+        workload_mix=["uniform"],
+        seed=[0],
     )
     # save the metaparam combinations to a csv file
     meta_file = os.path.join(result_dir, META_PARAM_FILE_NAME)
-    experiment_num = generate_metaparam_combinations(meta_params, meta_file)
+    experiment_num = generate_metaparam_combinations(
+        meta_params,
+        meta_file,
+        rejected_save_as=os.path.join(result_dir, REJECTED_META_PARAM_FILE_NAME),
+    )
     print("Step 2: metaparam combinations generated and saved.")
 
+    # build one workload per kernel variant in the sweep, or reuse the cached
+    # binaries if nothing changed
+    builder = workload_builder.WorkloadBuilder(
+        source_dir=os.path.join(CURR_DIR_ABS_PATH, WORKLOAD_SOURCE_REL_PATH),
+        cache_dir=os.path.join(CURR_DIR_ABS_PATH, WORKLOAD_CACHE_REL_PATH),
+    )
+    meta_params_df = pd.read_csv(meta_file, index_col="experiment_index")
+    # the kernel variants of every core in every workload mix
+    core_workloads = {
+        index: workload_mix.core_workloads(row)
+        for index, row in meta_params_df.iterrows()
+    }
+    kernel_variants = set(meta_params_df["kernel_variant"]).union(
+        *(mix.kernel_variants for mix in core_workloads.values())
+    )
+    workload_specs = {
+        variant: workload_builder.WorkloadSpec(variant=variant, target=WORKLOAD_TARGET)
+        for variant in kernel_variants
+    }
+    workload_paths = builder.build_all(list(workload_specs.values()))
+    print("Workloads ready.")
+
+    # compute the area score of every design point, and describe each point
+    # by numeric features so that unfinished points can be compared with
+    # finished ones
+    area_scores = area_model.experiment_area_score(meta_params_df)
+    design_points = pd.get_dummies(meta_params_df, dtype=float)
+    feature_columns = list(design_points.columns)
+    design_points["area_score"] = area_scores
+    # points with the same key run on identical boards
+    board_keys = meta_params_df.drop(
+        columns=[
+            field
+            for field in step1_dataclass.WORKLOAD_FIELDS
+            if field in meta_params_df.columns
+        ]
+    ).apply(tuple, axis=1)
+    # points whose cores finish their runs at different times are run alone,
+    # so every stats phase holds a single run
+    batchable = config_validation.batchable(meta_params_df)
+
     # step 3: experiment execution
+    # run the points closest to the current Pareto front first, so a
+    # truncated sweep still covers the interesting trade-offs
+    pending_indices = list(range(experiment_num))
+    finished_sim_seconds = {}
     # create a progress bar
     progress_bar = tqdm.tqdm(total=experiment_num)
-    for index in range(experiment_num):
-        # make index dir
-        index_dir = os.path.join(result_dir, GEM5_RAW_FOLDER_NAME, str(index))
-        os.makedirs(index_dir)
-        redirect_command = "--outdir=" + index_dir
+
+    # reuse the results of points finished by earlier sweeps
+    # the results also depend on the workload binaries and the simulator, so
+    # they are part of the key
+    source_hash = builder.source_hash()
+    simulator_key = simulator_identity(
+        GEM5_ABS_PATH,
+        [os.path.join(CURR_DIR_ABS_PATH, EXECUTOR_REL_PATH)]
+        + [
+            source
+            for package in ("components", "utils")
+            for source in glob.glob(os.path.join(CURR_DIR_ABS_PATH, package, "*.py"))
+            if not source.endswith("_test.py")
+        ],
+    )
+    point_keys = pd.Series(
+        {
+            index: design_point_key(
+                row,
+                [
+                    builder.build_key(workload_specs[variant], source_hash)
+                    for variant in core_workloads[index].kernel_variants | {row["kernel_variant"]}
+                ],
+                simulator_key,
+            )
+            for index, row in meta_params_df.iterrows()
+        }
+    )
+    result_cache_file = os.path.join(
+        CURR_DIR_ABS_PATH, RESULT_FOLDER_REL_PATH, RESULT_CACHE_FILE_NAME
+    )
+    if os.path.exists(result_cache_file):
+        result_cache = pd.read_csv(result_cache_file, index_col="design_point")
+        result_cache = result_cache[~result_cache.index.duplicated(keep="last")]
+    else:
+        result_cache = pd.DataFrame(columns=DATA_FILE_COLUMNS[1:])
+        result_cache.index.name = "design_point"
+        result_cache.to_csv(result_cache_file)
+    cached_indices = [index for index in pending_indices if point_keys[index] in result_cache.index]
+    with open(data_file, "a") as f:
+        for index in cached_indices:
+            cached = result_cache.loc[point_keys[index]]
+            f.write(
+                ",".join([str(index)] + [str(cached[column]) for column in DATA_FILE_COLUMNS[1:]])
+                + "\n"
+            )
+            finished_sim_seconds[index] = cached["simSeconds"]
+            pending_indices.remove(index)
+    if cached_indices:
+        print(f"Reused the cached results of {len(cached_indices)} experiments.")
+        progress_bar.update(len(cached_indices))
+
+    while pending_indices:
+        finished_points = design_points.loc[list(finished_sim_seconds)].assign(
+            simSeconds=list(finished_sim_seconds.values())
+        )
+        index = pareto.prioritise_near_front(
+            design_points.loc[pending_indices], finished_points, feature_columns
+        )[0]
+        # run every pending point that only differs in its workload arguments
+        # in the same simulation, so gem5 start-up is paid once per board
+        batch = [index]
+        if batchable[index]:
+            batch += [
+                pending_index
+                for pending_index in pending_indices
+                if pending_index != index
+                and batchable[pending_index]
+                and board_keys[pending_index] == board_keys[index]
+            ]
+        for batch_index in batch:
+            pending_indices.remove(batch_index)
+
+        # make batch dir
+        batch_dir = os.path.join(
+            result_dir, GEM5_RAW_FOLDER_NAME, "-".join(str(i) for i in batch)
+        )
+        os.makedirs(batch_dir)
+        redirect_command = "--outdir=" + batch_dir
+        kernel_variant = meta_params_df.loc[index, "kernel_variant"]
+        workload_path = workload_paths[workload_specs[kernel_variant]]
+        # binaries of the other kernel variants of the workload mix
+        variant_workloads = [
+            f"--variant_workload={variant}={workload_paths[workload_specs[variant]]}"
+            for variant in sorted(core_workloads[index].kernel_variants)
+        ]
         subprocess.run(
             [
                 GEM5_ABS_PATH,
                 redirect_command,
                 os.path.join(CURR_DIR_ABS_PATH, EXECUTOR_REL_PATH),
                 f"--param_file={meta_file}",
-                f"--target_index={index}",
-                f"--workload={os.path.join(CURR_DIR_ABS_PATH, WORKLOAD_REL_PATH)}",
+                f"--target_indices={','.join(str(i) for i in batch)}",
+                f"--workload={workload_path}",
+                *variant_workloads,
+                f"--stats_interval={STATS_INTERVAL_TICKS}",
             ]
         )
 
         # summarize results
-        # load stats file
-        stats_file = os.path.join(index_dir, "stats.txt")
-        # only keep the stats after "End Simulation Statistics"
-        with open(stats_file, "r") as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if "End Simulation Statistics" in line:
-                    break
-            lines = lines[i:]
-
-        # read and categorize results
-        simSeconds = 0.0
-        simInsts = 0
-        big_l1i_missrate = []
-        big_l1d_missrate = []
-        big_l2_missrate = []
-        little_l1i_missrate = []
-        little_l1d_missrate = []
-        little_l2_missrate = []
-        l3_missrate = []
-        for line in lines:
-            curr_cluster = None
-            # find simSeconds
-            # example line: simSeconds                                   0.002261
-            if "simSeconds" in line:
-                simSeconds = float(line.split()[1])
-            # find simInsts
-            # example line: simInsts                                      8018609
-            if "simInsts" in line:
-                simInsts = int(line.split()[1])
-            # find cluster line
-            # example line: board.cache_hierarchy.clusters0.dptw_cache.tags.sampledRefs
-            if "clusters" in line:
-                # big core cluster num: 0-metaparams.big_core_num-1
-                # little core cluster num: metaparams.big_core_num-metaparams.big_core_num+metaparams.small_core_num-1
-                line_split = line.split(".")
-                # find the chunk that contains the 'clusters' keyword
-                for i, chunk in enumerate(line_split):
-                    if "clusters" in chunk:
-                        break
-                    
-                try:
-                    cluster_num = int(line_split[i][8])
-                except ValueError:
-                    raise ValueError("Cluster number is not an integer. Full line: " + line)
-                    exit(1)
-                
-                if cluster_num < meta_params.big_core_num:
-                    curr_cluster = "big"
-                else:
-                    curr_cluster = "little"
-
-            # find missrate line
-            # find line with 'overallMissRate::total'
-            # example line: board.cache_hierarchy.l3_cache.overallMissRate::total     0.096511
-            if "overallMissRate::total" in line:
-                # extract cache type: l1icache, l1dcache, l2cache, l3_cache
-                # first split by ' ', get the first part, then split by '.', get the second last part
-                cache_type = line.split()[0].split(".")[-2]
-                if cache_type == "l1icache":
-                    if curr_cluster == "big":
-                        big_l1i_missrate.append(float(line.split()[1]))
-                    else:
-                        little_l1i_missrate.append(float(line.split()[1]))
-                elif cache_type == "l1dcache":
-                    if curr_cluster == "big":
-                        big_l1d_missrate.append(float(line.split()[1]))
-                    else:
-                        little_l1d_missrate.append(float(line.split()[1]))
-                elif cache_type == "l2cache":
-                    if curr_cluster == "big":
-                        big_l2_missrate.append(float(line.split()[1]))
-                    else:
-                        little_l2_missrate.append(float(line.split()[1]))
-                elif cache_type == "l3_cache":
-                    l3_missrate.append(float(line.split()[1]))
-                else:
-                    raise ValueError("Unknown cache type. Full line: " + line)
-
-        # calculate average missrate
-        if len(big_l1i_missrate) == 0:
-            avg_big_l1i_missrate = 0.0
-        else: 
-            avg_big_l1i_missrate = sum(big_l1i_missrate) / len(big_l1i_missrate)
-        if len(big_l1d_missrate) == 0:
-            avg_big_l1d_missrate = 0.0
-        else:
-            avg_big_l1d_missrate = sum(big_l1d_missrate) / len(big_l1d_missrate)
-        if len(big_l2_missrate) == 0:
-            avg_big_l2_missrate = 0.0
-        else:
-            avg_big_l2_missrate = sum(big_l2_missrate) / len(big_l2_missrate)
-        if len(little_l1i_missrate) == 0:
-            avg_little_l1i_missrate = 0.0
-        else:
-            avg_little_l1i_missrate = sum(little_l1i_missrate) / len(little_l1i_missrate)
-        if len(little_l1d_missrate) == 0:
-            avg_little_l1d_missrate = 0.0
-        else:
-            avg_little_l1d_missrate = sum(little_l1d_missrate) / len(little_l1d_missrate)
-        if len(little_l2_missrate) == 0:
-            avg_little_l2_missrate = 0.0
-        else:
-            avg_little_l2_missrate = sum(little_l2_missrate) / len(little_l2_missrate)
-        if len(l3_missrate) == 0:
-            avg_l3_missrate = 0.0
-        else:
-            avg_l3_missrate = sum(l3_missrate) / len(l3_missrate)
-
-        # write results to the data file
-        with open(data_file, "a") as f:
-            f.write(
-                f"{index},{simSeconds},{simInsts},{avg_big_l1i_missrate},{avg_big_l1d_missrate},{avg_big_l2_missrate},{avg_little_l1i_missrate},{avg_little_l1d_missrate},{avg_little_l2_missrate},{avg_l3_missrate}\n"
+        # the executor dumps the stats of every workload of the batch in
+        # order, between its periodic dumps
+        stats_dumps = stats_parser.read_phase_dumps(batch_dir)
+        if STATS_INTERVAL_TICKS:
+            all_dumps = stats_parser.read_stats_dumps(os.path.join(batch_dir, "stats.txt"))
+            if all_dumps:
+                np.savez(
+                    os.path.join(batch_dir, INTERVAL_FILE_NAME),
+                    **stats_parser.interval_series(
+                        all_dumps, meta_params_df.loc[index, "big_core_num"]
+                    ),
+                )
+        if len(stats_dumps) < len(batch):
+            print(f"Missing stats for experiments {batch[len(stats_dumps):]}.")
+
+        for batch_index, stats_dump in zip(batch, stats_dumps):
+            summary = stats_parser.summarise_dump(
+                stats_dump, meta_params_df.loc[batch_index, "big_core_num"]
             )
+            # write results to the data file and the result cache
+            result_values = [str(summary[column]) for column in DATA_FILE_COLUMNS[1:]]
+            with open(data_file, "a") as f:
+                f.write(",".join([str(batch_index)] + result_values) + "\n")
+            with open(result_cache_file, "a") as f:
+                f.write(",".join([f'"{point_keys[batch_index]}"'] + result_values) + "\n")
+            finished_sim_seconds[batch_index] = summary["simSeconds"]
 
         # update progress bar
-        progress_bar.update(1)
+        progress_bar.update(len(batch))
+
+    # step 4: extract the performance/area Pareto front of the whole sweep
+    results_df = design_points[["area_score"]].join(
+        pd.read_csv(data_file, index_col="experiment_index")
+    )
+    pareto_front_df = pareto.pareto_front(results_df).join(meta_params_df)
+    pareto_front_df.to_csv(os.path.join(result_dir, PARETO_FILE_NAME))
+    print("Step 4: Pareto front extracted and saved.")
@@ -0,0 +1,95 @@
+"""A relative area (cost) model for the hybrid CPU design space.
+
+All functions accept scalars, NumPy arrays or pandas Series, so the area of a
+whole sweep can be computed in one call. The scores are unitless and only meant
+to compare design points against each other.
+"""
+
+import numpy as np
+
+from utils import cache_sizing
+
+# relative area of one KiB of SRAM data array, in core area score units
+CACHE_AREA_PER_KB = 16.0
+# extra tag/comparator area for every way of associativity, as a fraction of
+# the data array area
+CACHE_AREA_PER_WAY = 0.02
+
+
+def core_area_score(width, rob_size, num_int_regs, num_fp_regs):
+    """Area score of a single O3 core.
+
+    Wider pipelines need more ports on the ROB and both register files, so
+    those structures scale with the width.
+
+    Args:
+        width: Width of the fetch, decode, rename, issue, wb and commit stages.
+        rob_size: Number of entries in the reorder buffer.
+        num_int_regs: Size of the integer register file.
+        num_fp_regs: Size of the vector/floating point register file.
+    """
+    return (
+        width * (2 * rob_size + num_int_regs + num_fp_regs)
+        + 4 * width
+        + 2 * rob_size
+        + num_int_regs
+        + num_fp_regs
+    )
+
+
+def cache_area_score(size_kb, assoc):
+    """Area score of a single cache level.
+
+    Args:
+        size_kb: Cache capacity in KiB.
+        assoc: Associativity of the cache.
+    """
+    return CACHE_AREA_PER_KB * size_kb * (1 + CACHE_AREA_PER_WAY * assoc)
+
+
+def _private_cache_area_score(geometry: dict, core_type: str):
+    """Area score of the private L1I, L1D and L2 caches of one core."""
+    return sum(
+        cache_area_score(geometry[level].size_kb, geometry[level].assoc)
+        for level in (core_type + "_l1d", core_type + "_l1i", core_type + "_l2")
+    )
+
+
+def experiment_area_score(meta_params) -> np.ndarray:
+    """Total area score of every design point in a sweep.
+
+    The total covers all big and little cores, their private caches and the
+    shared L3.
+
+    Args:
+        meta_params (pd.DataFrame): The meta parameters of the sweep, with the
+            columns of `ExperimentMetaParameter`.
+
+    Returns:
+        np.ndarray: One area score per row of `meta_params`.
+    """
+    geometry = cache_sizing.hierarchy_geometry(
+        meta_params["l1_cache_sample_seed"].to_numpy(),
+        meta_params["l2_cache_sample_seed"].to_numpy(),
+        meta_params["l3_cache_sample_seed"].to_numpy(),
+    )
+
+    big_core_area = core_area_score(
+        meta_params["big_core_width"].to_numpy(),
+        meta_params["big_core_rob_size"].to_numpy(),
+        meta_params["big_core_num_int_regs"].to_numpy(),
+        meta_params["big_core_num_fp_regs"].to_numpy(),
+    ) + _private_cache_area_score(geometry, "big")
+    little_core_area = core_area_score(
+        meta_params["small_core_width"].to_numpy(),
+        meta_params["small_core_rob_size"].to_numpy(),
+        meta_params["small_core_num_int_regs"].to_numpy(),
+        meta_params["small_core_num_fp_regs"].to_numpy(),
+    ) + _private_cache_area_score(geometry, "little")
+    l3_area = cache_area_score(geometry["l3"].size_kb, geometry["l3"].assoc)
+
+    return (
+        meta_params["big_core_num"].to_numpy() * big_core_area
+        + meta_params["small_core_num"].to_numpy() * little_core_area
+        + l3_area
+    ).astype(float)
@@ -0,0 +1,581 @@
+"""A vectorised trace-driven cache hierarchy simulator for pre-screening.
+
+A single gem5 design point takes minutes to hours, but most cache
+configurations can already be ranked by their miss rates. This module replays
+analytically generated matmul address traces through a
+`SingleCacheLevelConfig`-style L1D/L2/L3 hierarchy.
+
+Cache sets are independent of each other, so every set of every simulated
+configuration is a separate lane, and one NumPy step processes the next access
+of all lanes at once. Configurations that share a cache level (and everything
+above it) share its simulation. The model is deliberately simple:
+
+- only the data accesses of a single core are modelled, so the L1I and
+  contention in the shared L3 are ignored;
+- caches are write-allocate and filled on demand misses;
+- the stride prefetcher is trained on every access of a level (as with
+  `prefetch_on_access=True`), runs ahead of each stream by `degree` strides
+  and only fills the level that issued it; other gem5 prefetchers are
+  simulated without prefetching;
+- register promotion by the compiler is not modelled, every innermost loop
+  iteration touches A[i][k], B[k][j] and C[i][j].
+"""
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from utils import cache_sizing
+
+ELEMENT_SIZE = 8  # the workload multiplies doubles
+PAGE_SIZE = 4096
+
+# ids of the supported gem5 replacement policies
+REPLACEMENT_POLICIES = {"LRURP": 0, "LFURP": 1, "SecondChanceRP": 2}
+LRU, LFU, SECOND_CHANCE = 0, 1, 2
+
+# the three matrices stand in for the PCs the stride prefetcher is keyed by
+NUM_STREAMS = 3
+
+# access latencies in cycles, following the gem5 standard library caches, the
+# L3Cache in components/cache_hierarchies.py and DDR3-1600 at 3GHz
+HIT_LATENCIES = (2, 20, 40)
+MEMORY_LATENCY = 150
+
+# tags of empty ways and of ways beyond a lane's associativity
+INVALID_TAG = -1
+DISABLED_TAG = -2
+# key of disabled ways, so victim selection never picks them
+NEVER = np.iinfo(np.int64).max
+
+# loop nests of the kernels in workload/matmul, outermost loop first. Each loop
+# is (axis, kind): "full" loops over the whole axis, "outer" over the tiles of
+# the axis and "inner" within a tile.
+LOOP_NESTS = {
+    "ijk": [("i", "full"), ("j", "full"), ("k", "full")],
+    "ikj": [("i", "full"), ("k", "full"), ("j", "full")],
+    "ij": [("i", "outer"), ("j", "outer"), ("i", "inner"), ("j", "inner"), ("k", "full")],
+    "ik": [("i", "outer"), ("k", "outer"), ("i", "inner"), ("k", "inner"), ("j", "full")],
+    "kj": [("k", "outer"), ("j", "outer"), ("i", "full"), ("k", "inner"), ("j", "inner")],
+}
+
+@dataclasses.dataclass
+class AddressTrace:
+    """A sequence of memory accesses seen by one cache level."""
+
+    # byte address of every access
+    addresses: np.ndarray
+    # the matrix (0 = A, 1 = B, 2 = C) every access touches
+    streams: np.ndarray
+    # number of demand accesses represented by every entry; 0 for prefetches
+    weights: np.ndarray
+    # whether an entry is a prefetch fill rather than a demand access
+    prefetch: np.ndarray
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def take(self, indices: np.ndarray) -> "AddressTrace":
+        return AddressTrace(
+            self.addresses[indices],
+            self.streams[indices],
+            self.weights[indices],
+            self.prefetch[indices],
+        )
+
+
+@dataclasses.dataclass
+class CacheLevelSweep:
+    """One cache level for a batch of configurations.
+
+    Mirrors `SingleCacheLevelConfig`, but every field is an array with one
+    entry per configuration.
+    """
+
+    size_kb: np.ndarray
+    assoc: np.ndarray
+    replacement_policy: np.ndarray
+    prefetcher_type: np.ndarray
+    prefetch_degree: np.ndarray
+
+
+def _iteration_order(mat_size: int, kernel_variant: str, block_size: int):
+    """Return (i, j, k) of every innermost loop iteration in execution order."""
+    try:
+        loop_nest = LOOP_NESTS[kernel_variant]
+    except KeyError:
+        raise ValueError(f"Invalid kernel variant: {kernel_variant}")
+    if block_size <= 0:
+        block_size = mat_size
+
+    extents = {
+        "full": mat_size,
+        "outer": -(-mat_size // block_size),
+        "inner": block_size,
+    }
+    scales = {"full": 1, "outer": block_size, "inner": 1}
+    coordinates = {"i": 0, "j": 0, "k": 0}
+    for depth, (axis, kind) in enumerate(loop_nest):
+        shape = [1] * len(loop_nest)
+        shape[depth] = extents[kind]
+        coordinates[axis] = coordinates[axis] + scales[kind] * np.arange(
+            extents[kind]
+        ).reshape(shape)
+
+    shape = [extents[kind] for _, kind in loop_nest]
+    i, j, k = (np.broadcast_to(coordinates[axis], shape).ravel() for axis in "ijk")
+    # drop the iterations of partial tiles that fall outside the matrix
+    valid = (i < mat_size) & (j < mat_size) & (k < mat_size)
+    return i[valid], j[valid], k[valid]
+
+
+def matmul_trace(
+    mat_size: int, kernel_variant: str = "ijk", block_size: int = 0
+) -> AddressTrace:
+    """Generate the data access trace of a matmul kernel analytically.
+
+    A, B and C are laid out as in mm.cpp: each one contiguous, row-major and
+    page-aligned.
+
+    Args:
+        mat_size (int): The matrix size.
+        kernel_variant (str): "ijk", "ikj" or a blocked variant "ij", "ik", "kj".
+        block_size (int): Tile size of the blocked variants.
+
+    Returns:
+        AddressTrace: The demand accesses in program order.
+    """
+    i, j, k = _iteration_order(mat_size, kernel_variant, block_size)
+
+    matrix_bytes = -(-mat_size * mat_size * ELEMENT_SIZE // PAGE_SIZE) * PAGE_SIZE
+    bases = np.arange(NUM_STREAMS) * (matrix_bytes + PAGE_SIZE)
+    elements = np.stack((i * mat_size + k, k * mat_size + j, i * mat_size + j), axis=1)
+    addresses = (bases + elements * ELEMENT_SIZE).ravel()
+
+    return AddressTrace(
+        addresses=addresses,
+        streams=np.tile(np.arange(NUM_STREAMS, dtype=np.int8), len(i)),
+        weights=np.ones(len(addresses), dtype=np.int64),
+        prefetch=np.zeros(len(addresses), dtype=bool),
+    )
+
+
+def add_stride_prefetches(
+    trace: AddressTrace, degree: int, line_size: int = cache_sizing.CACHE_LINE_SIZE
+) -> AddressTrace:
+    """Insert the fills of a per-stream stride prefetcher into a trace.
+
+    A stream is confident once two consecutive strides match. The first
+    confident access prefetches `degree` strides ahead, every following one
+    only the line that keeps the prefetcher `degree` strides ahead. Requests
+    for the line just accessed or just prefetched are dropped.
+
+    Args:
+        trace (AddressTrace): The demand accesses of a cache level.
+        degree (int): Number of strides the prefetcher runs ahead.
+        line_size (int): Cache line size in bytes.
+
+    Returns:
+        AddressTrace: The accesses with prefetch fills inserted right after
+            the accesses triggering them.
+    """
+    if degree <= 0 or len(trace) == 0:
+        return trace
+
+    triggers = []
+    targets = []
+    for stream in range(NUM_STREAMS):
+        positions = np.flatnonzero(trace.streams == stream)
+        addresses = trace.addresses[positions]
+        stride = np.diff(addresses, prepend=addresses[:1])
+        confident = np.zeros(len(positions), dtype=bool)
+        confident[2:] = (stride[2:] == stride[1:-1]) & (stride[2:] != 0)
+        run_start = confident & ~np.concatenate(([False], confident[:-1]))
+
+        # (trigger, distance) of every prefetch request
+        counts = np.where(run_start, degree, confident.astype(np.int64))
+        request_trigger = np.repeat(np.arange(len(positions)), counts)
+        request_distance = np.where(
+            run_start[request_trigger],
+            np.arange(len(request_trigger))
+            - np.repeat(np.cumsum(counts) - counts, counts)
+            + 1,
+            degree,
+        )
+        request_lines = (
+            addresses[request_trigger]
+            + request_distance * stride[request_trigger]
+        ) // line_size
+
+        keep = (request_lines >= 0) & (
+            request_lines != addresses[request_trigger] // line_size
+        )
+        keep[1:] &= request_lines[1:] != request_lines[:-1]
+        triggers.append(positions[request_trigger[keep]])
+        targets.append(request_lines[keep] * line_size)
+
+    triggers = np.concatenate(triggers)
+    prefetches = AddressTrace(
+        addresses=np.concatenate(targets),
+        streams=trace.streams[triggers],
+        weights=np.zeros(len(triggers), dtype=np.int64),
+        prefetch=np.ones(len(triggers), dtype=bool),
+    )
+
+    # demand accesses first, then the prefetches they trigger
+    keys = np.concatenate((np.arange(len(trace)) * 2, triggers * 2 + 1))
+    order = np.argsort(keys, kind="stable")
+    return AddressTrace(
+        addresses=np.concatenate((trace.addresses, prefetches.addresses))[order],
+        streams=np.concatenate((trace.streams, prefetches.streams))[order],
+        weights=np.concatenate((trace.weights, prefetches.weights))[order],
+        prefetch=np.concatenate((trace.prefetch, prefetches.prefetch))[order],
+    )
+
+
+def merge_repeats(
+    trace: AddressTrace, num_sets: int, line_size: int = cache_sizing.CACHE_LINE_SIZE
+) -> AddressTrace:
+    """Merge repeated accesses to a line with no other access to its set between.
+
+    The repeats always hit, so they only add their weight to the first access.
+
+    Args:
+        trace (AddressTrace): The trace to compress.
+        num_sets (int): The number of sets of the cache.
+        line_size (int): Cache line size in bytes.
+
+    Returns:
+        AddressTrace: The compressed trace, still in program order.
+    """
+    lines = trace.addresses // line_size
+    order = np.argsort(lines % num_sets, kind="stable")
+    sorted_lines = lines[order]
+    repeat = np.zeros(len(order), dtype=bool)
+    repeat[1:] = sorted_lines[1:] == sorted_lines[:-1]
+
+    # every entry is merged into the head of its run of repeats
+    heads = np.maximum.accumulate(np.where(repeat, 0, np.arange(len(order))))
+    run_weights = np.bincount(heads, weights=trace.weights[order], minlength=len(order))
+
+    merged = trace.take(order)
+    merged.weights = run_weights.astype(np.int64)
+    merged = merged.take(np.flatnonzero(~repeat))
+    # restore program order
+    return merged.take(np.argsort(order[~repeat], kind="stable"))
+
+
+def _simulate_lanes(
+    lanes: np.ndarray,
+    lines: np.ndarray,
+    weights: np.ndarray,
+    prefetch: np.ndarray,
+    lane_assoc: np.ndarray,
+    lane_policy: np.ndarray,
+) -> np.ndarray:
+    """Simulate the sets of many caches in lockstep.
+
+    Args:
+        lanes (np.ndarray): The lane (cache set) of every entry.
+        lines (np.ndarray): The line of every entry; within a lane the
+            entries are in program order.
+        weights (np.ndarray): Demand accesses per entry.
+        prefetch (np.ndarray): Whether every entry is a prefetch fill.
+        lane_assoc (np.ndarray): Associativity of every lane.
+        lane_policy (np.ndarray): Replacement policy id of every lane.
+
+    Returns:
+        np.ndarray: Whether every entry hit.
+    """
+    hits = np.zeros(len(lines), dtype=bool)
+    if len(lines) == 0:
+        return hits
+
+    # process lanes ordered by length, so the active lanes of every step are a
+    # prefix and the state can be sliced instead of gathered
+    lengths = np.bincount(lanes, minlength=len(lane_assoc))
+    lane_order = np.argsort(-lengths, kind="stable")
+    lane_rank = np.empty_like(lane_order)
+    lane_rank[lane_order] = np.arange(len(lane_order))
+    lengths = lengths[lane_order]
+    assoc = lane_assoc[lane_order]
+    policy = lane_policy[lane_order]
+
+    entry_order = np.argsort(lane_rank[lanes], kind="stable")
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    sorted_lines = lines[entry_order]
+    sorted_weights = weights[entry_order]
+    # demand accesses of an entry that are not re-references of its line
+    sorted_demand = (~prefetch[entry_order]).astype(np.int64)
+    sorted_hits = np.zeros(len(lines), dtype=bool)
+
+    num_ways = int(assoc.max())
+    ways = np.arange(num_ways)
+    enabled = ways < assoc[:, None]
+    tags = np.where(enabled, INVALID_TAG, DISABLED_TAG).astype(np.int64)
+    # last use (LRU) or use count (LFU) of every way; empty ways come first
+    # and disabled ways are never chosen as victims
+    keys = np.where(enabled, -1, NEVER).astype(np.int64)
+    referenced = np.zeros(tags.shape, dtype=bool)
+    # second chance is implemented as a clock, the hand points at the head of
+    # the FIFO
+    hands = np.zeros(len(lengths), dtype=np.int64)
+    is_lfu = policy == LFU
+    is_second_chance = policy == SECOND_CHANCE
+    any_second_chance = bool(is_second_chance.any())
+
+    # number of lanes still active at every step
+    active_counts = len(lengths) - np.searchsorted(
+        lengths[::-1], np.arange(lengths[0]), side="right"
+    )
+    for step, active in enumerate(active_counts.tolist()):
+        entries = starts[:active] + step
+        line = sorted_lines[entries]
+        weight = sorted_weights[entries]
+        match = tags[:active] == line[:, None]
+        hit = match.any(axis=1)
+        sorted_hits[entries] = hit
+
+        # hits: update the recency, frequency and reference state
+        touched = np.nonzero(hit & (weight > 0))[0]
+        if touched.size:
+            touched_way = match[touched].argmax(axis=1)
+            keys[touched, touched_way] = np.where(
+                is_lfu[touched],
+                keys[touched, touched_way] + weight[touched],
+                step + 1,
+            )
+            referenced[touched, touched_way] = True
+
+        missed = np.nonzero(~hit)[0]
+        if not missed.size:
+            continue
+
+        # misses: choose a victim
+        victim = keys[missed].argmin(axis=1)
+        if any_second_chance:
+            rows = np.nonzero(is_second_chance[missed])[0]
+            lanes_sc = missed[rows]
+            lane_assoc = assoc[lanes_sc, None]
+            # ways in FIFO order, starting at the hand; referenced lines lose
+            # their reference bit and the hand moves past them
+            columns = (hands[lanes_sc, None] + ways) % lane_assoc
+            valid = ways < lane_assoc
+            candidate = ~referenced[lanes_sc[:, None], columns] & valid
+            found = candidate.any(axis=1)
+            position = np.where(found, candidate.argmax(axis=1), 0)
+            spared_rows, spared_ways = np.nonzero(
+                np.where(found[:, None], ways < position[:, None], valid)
+            )
+            referenced[lanes_sc[spared_rows], columns[spared_rows, spared_ways]] = False
+            victim[rows] = columns[np.arange(rows.size), position]
+            hands[lanes_sc] = (victim[rows] + 1) % lane_assoc[:, 0]
+
+        fill_weight = weight[missed]
+        fill_demand = sorted_demand[entries[missed]]
+        tags[missed, victim] = line[missed]
+        # a fill counts as one reference, the merged repeats as one each,
+        # whether the fill was a demand access or a prefetch
+        keys[missed, victim] = np.where(
+            is_lfu[missed], fill_weight - fill_demand + 1, step + 1
+        )
+        # merged repeats re-reference the line right after the fill
+        referenced[missed, victim] = fill_weight > fill_demand
+
+    hits[entry_order] = sorted_hits
+    return hits
+
+
+@dataclasses.dataclass
+class _LevelGroup:
+    """Configurations that share a cache level and everything above it."""
+
+    num_sets: int
+    assoc: int
+    policy: int
+    prefetch_degree: int
+    # the accesses reaching this level
+    trace: AddressTrace
+
+
+def _simulate_level(groups: list[_LevelGroup], line_size: int):
+    """Simulate one cache level of many groups together.
+
+    Returns:
+        list[tuple[int, int, AddressTrace]]: Demand accesses, demand misses
+            and the trace of demand misses of every group.
+    """
+    traces = [
+        merge_repeats(
+            add_stride_prefetches(group.trace, group.prefetch_degree, line_size),
+            group.num_sets,
+            line_size,
+        )
+        for group in groups
+    ]
+    lane_offsets = np.concatenate(
+        ([0], np.cumsum([group.num_sets for group in groups])[:-1])
+    ).astype(np.int64)
+    lines = [trace.addresses // line_size for trace in traces]
+    hits = _simulate_lanes(
+        lanes=np.concatenate(
+            [
+                offset + line % group.num_sets
+                for offset, line, group in zip(lane_offsets, lines, groups)
+            ]
+        ),
+        lines=np.concatenate(lines),
+        weights=np.concatenate([trace.weights for trace in traces]),
+        prefetch=np.concatenate([trace.prefetch for trace in traces]),
+        lane_assoc=np.repeat(
+            [group.assoc for group in groups], [group.num_sets for group in groups]
+        ),
+        lane_policy=np.repeat(
+            [group.policy for group in groups], [group.num_sets for group in groups]
+        ),
+    )
+
+    results = []
+    boundaries = np.cumsum([len(trace) for trace in traces])[:-1]
+    for trace, hit in zip(traces, np.split(hits, boundaries)):
+        demand_misses = np.flatnonzero(~hit & ~trace.prefetch)
+        miss_trace = trace.take(demand_misses)
+        # merged repeats hit, so every miss is a single access downstream
+        miss_trace.weights = np.ones(len(miss_trace), dtype=np.int64)
+        results.append((int(trace.weights.sum()), len(demand_misses), miss_trace))
+    return results
+
+
+def simulate_hierarchy(
+    trace: AddressTrace,
+    levels: list[CacheLevelSweep],
+    line_size: int = cache_sizing.CACHE_LINE_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Replay a trace through a batch of cache hierarchies.
+
+    Args:
+        trace (AddressTrace): The demand accesses of the core.
+        levels (list[CacheLevelSweep]): The cache levels, closest to the core
+            first.
+        line_size (int): Cache line size in bytes.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Demand accesses and misses, each of
+            shape (num_configs, num_levels).
+    """
+    num_configs = len(levels[0].size_kb)
+    accesses = np.zeros((num_configs, len(levels)), dtype=np.int64)
+    misses = np.zeros((num_configs, len(levels)), dtype=np.int64)
+
+    # the group of every configuration, and the miss trace of every group
+    parent_group = np.zeros(num_configs, dtype=np.int64)
+    parent_traces = [trace]
+    for level_index, level in enumerate(levels):
+        assoc = np.broadcast_to(np.asarray(level.assoc, dtype=np.int64), num_configs)
+        num_sets = (
+            np.asarray(level.size_kb, dtype=np.int64)
+            * cache_sizing.BYTES_PER_KB
+            // (assoc * line_size)
+        )
+        if np.any(num_sets < 1):
+            raise ValueError("Cache smaller than one set.")
+        degree = np.where(
+            np.asarray(level.prefetcher_type) == "Stride",
+            np.asarray(level.prefetch_degree, dtype=np.int64),
+            0,
+        )
+        policy = np.array(
+            [REPLACEMENT_POLICIES[name] for name in level.replacement_policy]
+        )
+
+        keys = np.stack((parent_group, num_sets, assoc, policy, degree), axis=1)
+        unique_keys, group = np.unique(keys, axis=0, return_inverse=True)
+        group = group.ravel()
+        results = _simulate_level(
+            [
+                _LevelGroup(
+                    num_sets=int(key[1]),
+                    assoc=int(key[2]),
+                    policy=int(key[3]),
+                    prefetch_degree=int(key[4]),
+                    trace=parent_traces[key[0]],
+                )
+                for key in unique_keys
+            ],
+            line_size,
+        )
+        accesses[:, level_index] = [results[g][0] for g in group]
+        misses[:, level_index] = [results[g][1] for g in group]
+        parent_group = group
+        parent_traces = [miss_trace for _, _, miss_trace in results]
+
+    return accesses, misses
+
+
+def hierarchy_from_meta_params(
+    meta_params: pd.DataFrame, core_type: str = "big"
+) -> list[CacheLevelSweep]:
+    """Build the L1D, L2 and L3 of one core type for every row of a sweep.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+        core_type (str): "big" or "little".
+    """
+    geometry = cache_sizing.hierarchy_geometry(
+        meta_params["l1_cache_sample_seed"].to_numpy(),
+        meta_params["l2_cache_sample_seed"].to_numpy(),
+        meta_params["l3_cache_sample_seed"].to_numpy(),
+    )
+    return [
+        CacheLevelSweep(
+            size_kb=geometry[level].size_kb,
+            assoc=np.broadcast_to(geometry[level].assoc, len(meta_params)),
+            replacement_policy=meta_params["replacement_policy"].to_numpy(),
+            prefetcher_type=meta_params["prefetcher_type"].to_numpy(),
+            prefetch_degree=geometry[level].prefetch_degree,
+        )
+        for level in (core_type + "_l1d", core_type + "_l2", "l3")
+    ]
+
+
+def pre_rank(
+    meta_params: pd.DataFrame,
+    mat_size: int,
+    kernel_variant: str = "ijk",
+    block_size: int = 0,
+    core_type: str = "big",
+) -> pd.DataFrame:
+    """Predict miss rates for every row of a sweep and rank the rows.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+        mat_size (int): Matrix size of the simulated workload.
+        kernel_variant (str): Kernel variant of the simulated workload.
+        block_size (int): Tile size of the blocked kernel variants.
+        core_type (str): The core type whose caches are simulated.
+
+    Returns:
+        pd.DataFrame: `meta_params` with the predicted miss rate of every level
+            and an average memory access time estimate in cycles, sorted by
+            the latter.
+    """
+    accesses, misses = simulate_hierarchy(
+        matmul_trace(mat_size, kernel_variant, block_size),
+        hierarchy_from_meta_params(meta_params, core_type),
+    )
+    miss_rates = misses / np.maximum(accesses, 1)
+
+    amat = np.full(len(meta_params), float(MEMORY_LATENCY))
+    for level in reversed(range(len(HIT_LATENCIES))):
+        amat = HIT_LATENCIES[level] + miss_rates[:, level] * amat
+
+    ranked = meta_params.assign(
+        predicted_l1d_missrate=miss_rates[:, 0],
+        predicted_l2_missrate=miss_rates[:, 1],
+        predicted_l3_missrate=miss_rates[:, 2],
+        predicted_amat=amat,
+    )
+    return ranked.sort_values("predicted_amat", kind="stable")
@@ -0,0 +1,182 @@
+"""Tests for utils/cache_simulator.py."""
+
+import itertools
+import unittest
+
+import numpy as np
+
+from utils import cache_simulator, cache_sizing
+
+LINE_SIZE = cache_sizing.CACHE_LINE_SIZE
+
+
+class ReferenceSet:
+    """A single cache set, simulated one access at a time."""
+
+    def __init__(self, assoc: int, policy: int):
+        self.policy = policy
+        self.tags = [None] * assoc
+        # last use (LRU) or number of references since the fill (LFU)
+        self.keys = [0] * assoc
+        self.referenced = [False] * assoc
+        self.hand = 0
+        self.time = 0
+
+    def access(self, line: int, prefetch: bool) -> bool:
+        """Access a line and return whether it hit."""
+        self.time += 1
+        if line in self.tags:
+            way = self.tags.index(line)
+            # prefetches of resident lines are dropped
+            if not prefetch:
+                if self.policy == cache_simulator.LFU:
+                    self.keys[way] += 1
+                else:
+                    self.keys[way] = self.time
+                self.referenced[way] = True
+            return True
+
+        way = self.victim()
+        self.tags[way] = line
+        self.keys[way] = 1 if self.policy == cache_simulator.LFU else self.time
+        self.referenced[way] = False
+        return False
+
+    def victim(self) -> int:
+        if self.policy == cache_simulator.SECOND_CHANCE:
+            # FIFO order, referenced lines are moved to the back once
+            while self.referenced[self.hand]:
+                self.referenced[self.hand] = False
+                self.hand = (self.hand + 1) % len(self.tags)
+            way = self.hand
+            self.hand = (self.hand + 1) % len(self.tags)
+            return way
+        if None in self.tags:
+            return self.tags.index(None)
+        # the least recently or least frequently used line, the lowest way on
+        # ties
+        return self.keys.index(min(self.keys))
+
+
+def reference_hierarchy(
+    trace: cache_simulator.AddressTrace,
+    levels: list[tuple[int, int, int, int]],
+) -> list[tuple[int, int]]:
+    """Demand accesses and misses of every level, one access at a time.
+
+    Args:
+        trace (AddressTrace): The demand accesses of the core.
+        levels (list[tuple[int, int, int, int]]): (size_kb, assoc, policy,
+            stride prefetch degree) of every level, closest to the core first.
+    """
+    results = []
+    for size_kb, assoc, policy, degree in levels:
+        num_sets = size_kb * cache_sizing.BYTES_PER_KB // (assoc * LINE_SIZE)
+        sets = [ReferenceSet(assoc, policy) for _ in range(num_sets)]
+        trace = cache_simulator.add_stride_prefetches(trace, degree, LINE_SIZE)
+        demand_misses = []
+        for index, (address, prefetch) in enumerate(
+            zip(trace.addresses.tolist(), trace.prefetch.tolist())
+        ):
+            line = address // LINE_SIZE
+            if not sets[line % num_sets].access(line, prefetch) and not prefetch:
+                demand_misses.append(index)
+        results.append((int((~trace.prefetch).sum()), len(demand_misses)))
+        trace = trace.take(np.array(demand_misses, dtype=np.int64))
+    return results
+
+
+class CacheSimulatorTest(unittest.TestCase):
+    def assertMatchesReference(
+        self,
+        trace: cache_simulator.AddressTrace,
+        configs: list[list[tuple[int, int, str, int]]],
+    ):
+        """Simulate a batch of hierarchies and check every level of every
+        configuration against the reference model.
+
+        Args:
+            configs: (size_kb, assoc, replacement policy, stride prefetch
+                degree) of every level of every configuration.
+        """
+        levels = [
+            cache_simulator.CacheLevelSweep(
+                size_kb=np.array([config[level][0] for config in configs]),
+                assoc=np.array([config[level][1] for config in configs]),
+                replacement_policy=np.array([config[level][2] for config in configs]),
+                prefetcher_type=np.array(
+                    ["Stride" if config[level][3] else "Tagged" for config in configs]
+                ),
+                prefetch_degree=np.array([config[level][3] for config in configs]),
+            )
+            for level in range(len(configs[0]))
+        ]
+        accesses, misses = cache_simulator.simulate_hierarchy(trace, levels, LINE_SIZE)
+        for index, config in enumerate(configs):
+            expected = reference_hierarchy(
+                trace,
+                [
+                    (size_kb, assoc, cache_simulator.REPLACEMENT_POLICIES[policy], degree)
+                    for size_kb, assoc, policy, degree in config
+                ],
+            )
+            with self.subTest(config=config):
+                self.assertEqual(
+                    list(zip(accesses[index].tolist(), misses[index].tolist())),
+                    expected,
+                )
+
+    def test_single_level_matches_reference(self):
+        configs = [
+            [(size_kb, assoc, policy, degree)]
+            for size_kb, assoc, policy, degree in itertools.product(
+                (1, 2),
+                (2, 4),
+                cache_simulator.REPLACEMENT_POLICIES,
+                (0, 1, 4),
+            )
+        ]
+        for kernel_variant, block_size in (("ijk", 0), ("ikj", 0), ("kj", 4)):
+            with self.subTest(kernel_variant=kernel_variant):
+                self.assertMatchesReference(
+                    cache_simulator.matmul_trace(12, kernel_variant, block_size),
+                    configs,
+                )
+
+    def test_hierarchy_matches_reference(self):
+        configs = [
+            [(1, 2, policy, degree), (4, 4, policy, 2 * degree)]
+            for policy, degree in itertools.product(
+                cache_simulator.REPLACEMENT_POLICIES, (0, 2)
+            )
+        ]
+        self.assertMatchesReference(cache_simulator.matmul_trace(16, "ijk"), configs)
+
+    def test_random_trace_matches_reference(self):
+        # few lines and small sets, so lines are often evicted and refilled
+        rng = np.random.default_rng(0)
+        num_accesses = 2000
+        streams = rng.integers(0, cache_simulator.NUM_STREAMS, num_accesses)
+        # strided walks per stream with random jumps, to train the prefetcher
+        addresses = (
+            streams * 64 * LINE_SIZE
+            + (np.arange(num_accesses) // 7 % 16 + rng.integers(0, 3, num_accesses))
+            * LINE_SIZE
+        )
+        trace = cache_simulator.AddressTrace(
+            addresses=addresses,
+            streams=streams.astype(np.int8),
+            weights=np.ones(num_accesses, dtype=np.int64),
+            prefetch=np.zeros(num_accesses, dtype=bool),
+        )
+        configs = [
+            [(1, assoc, policy, degree)]
+            for assoc, policy, degree in itertools.product(
+                (2, 4, 8), cache_simulator.REPLACEMENT_POLICIES, (0, 2)
+            )
+        ]
+        self.assertMatchesReference(trace, configs)
+
+
+if __name__ == "__main__":
+    unittest.main()
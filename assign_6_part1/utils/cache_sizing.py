@@ -0,0 +1,85 @@
+"""Maps cache sample seeds to concrete cache geometries.
+
+The gem5 executor and the plain Python sweep tooling both derive cache sizes
+from the `l1/l2/l3_cache_sample_seed` meta parameters. Keeping the mapping
+here makes sure they always agree.
+"""
+
+import dataclasses
+
+# gem5 treats "kB" as 1024 bytes
+BYTES_PER_KB = 1024
+
+CACHE_LINE_SIZE = 64
+
+
+@dataclasses.dataclass
+class CacheLevelGeometry:
+    """Size, associativity and prefetch degree of a single cache level.
+
+    The fields may also hold NumPy arrays, in which case the geometry
+    describes one cache level for a whole sweep at once.
+    """
+
+    size_kb: int
+    assoc: int
+    prefetch_degree: int
+
+    @property
+    def size_str(self) -> str:
+        """The size in gem5 notation, e.g. "16kB"."""
+        return str(self.size_kb) + "kB"
+
+    @property
+    def size_bytes(self) -> int:
+        return self.size_kb * BYTES_PER_KB
+
+
+def hierarchy_geometry(
+    l1_cache_sample_seed: int,
+    l2_cache_sample_seed: int,
+    l3_cache_sample_seed: int,
+) -> dict[str, CacheLevelGeometry]:
+    """Derive the geometry of every cache level from the sample seeds.
+
+    Args:
+        l1_cache_sample_seed (int): The L1 cache sample seed.
+        l2_cache_sample_seed (int): The L2 cache sample seed.
+        l3_cache_sample_seed (int): The L3 cache sample seed.
+
+    Returns:
+        dict[str, CacheLevelGeometry]: Geometries keyed by "big_l1d",
+            "big_l1i", "big_l2", "little_l1d", "little_l1i", "little_l2"
+            and "l3".
+    """
+    big_l1 = CacheLevelGeometry(
+        size_kb=l1_cache_sample_seed * 2,
+        assoc=8,
+        prefetch_degree=l1_cache_sample_seed * 2,
+    )
+    little_l1 = CacheLevelGeometry(
+        size_kb=l1_cache_sample_seed * 1,
+        assoc=4,
+        prefetch_degree=l1_cache_sample_seed,
+    )
+    return {
+        "big_l1d": big_l1,
+        "big_l1i": dataclasses.replace(big_l1),
+        "big_l2": CacheLevelGeometry(
+            size_kb=l2_cache_sample_seed * 16,
+            assoc=16,
+            prefetch_degree=l2_cache_sample_seed * 4,
+        ),
+        "little_l1d": little_l1,
+        "little_l1i": dataclasses.replace(little_l1),
+        "little_l2": CacheLevelGeometry(
+            size_kb=l2_cache_sample_seed * 8,
+            assoc=8,
+            prefetch_degree=l2_cache_sample_seed * 2,
+        ),
+        "l3": CacheLevelGeometry(
+            size_kb=l3_cache_sample_seed * 64,
+            assoc=32,
+            prefetch_degree=l3_cache_sample_seed * 4,
+        ),
+    }
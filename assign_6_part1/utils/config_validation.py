@@ -0,0 +1,235 @@
+"""Pre-launch validation of sweep design points.
+
+Every row of the meta parameter sweep becomes an
+`O3HybridCPUCacheHierarchyConfig` and an `O3HybridProcessorConfig` in the gem5
+executor. gem5 only rejects invalid configurations after it has started and
+elaborated the whole board, so the same constraints are checked here in plain
+Python, on the whole sweep at once, before the meta parameter CSV is written.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import cache_sizing, memory_sizing, workload_builder, workload_mix
+
+# mirrors get_replacement_policy() and get_prefetcher() in the executor
+REPLACEMENT_POLICIES = ("LRURP", "LFURP", "SecondChanceRP")
+PREFETCHER_TYPES = ("Tagged", "Stride", "Signature", "ISB")
+# prefetchers constructed with a degree
+DEGREE_PREFETCHER_TYPES = ("Tagged", "Stride", "ISB")
+
+KERNEL_VARIANTS = (
+    ("ijk", "ikj") + workload_builder.BLOCKED_VARIANTS + workload_builder.THREADED_VARIANTS
+)
+
+# architectural registers of RV64GC; the O3 CPU needs at least one more
+# physical register than that to rename anything
+RISCV_NUM_INT_REGS = 32
+RISCV_NUM_FP_REGS = 32
+
+CACHE_LEVELS = (
+    "big_l1d",
+    "big_l1i",
+    "big_l2",
+    "little_l1d",
+    "little_l1i",
+    "little_l2",
+    "l3",
+)
+
+# meta parameter column prefix and count column of every core type
+CORE_TYPES = (("big_core", "big_core_num"), ("small_core", "small_core_num"))
+
+
+def _is_power_of_two(values: np.ndarray) -> np.ndarray:
+    return (values > 0) & ((values & (values - 1)) == 0)
+
+
+def _cache_errors(meta_params: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Masks of the rows violating every cache constraint."""
+    errors = {
+        "unknown replacement policy": ~meta_params["replacement_policy"]
+        .isin(REPLACEMENT_POLICIES)
+        .to_numpy(),
+        "unknown prefetcher type": ~meta_params["prefetcher_type"]
+        .isin(PREFETCHER_TYPES)
+        .to_numpy(),
+    }
+
+    geometry = cache_sizing.hierarchy_geometry(
+        meta_params["l1_cache_sample_seed"].to_numpy(),
+        meta_params["l2_cache_sample_seed"].to_numpy(),
+        meta_params["l3_cache_sample_seed"].to_numpy(),
+    )
+    uses_degree = meta_params["prefetcher_type"].isin(DEGREE_PREFETCHER_TYPES).to_numpy()
+    for level in CACHE_LEVELS:
+        size_bytes = np.asarray(geometry[level].size_bytes)
+        set_bytes = geometry[level].assoc * cache_sizing.CACHE_LINE_SIZE
+        errors[f"{level} size not a multiple of assoc x line size"] = (
+            size_bytes <= 0
+        ) | (size_bytes % set_bytes != 0)
+        # gem5 indexes sets with address bits
+        errors[f"{level} number of sets not a power of two"] = ~_is_power_of_two(
+            size_bytes // set_bytes
+        )
+        errors[f"{level} prefetch degree below 1"] = uses_degree & (
+            np.asarray(geometry[level].prefetch_degree) < 1
+        )
+    return errors
+
+
+def _processor_errors(meta_params: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Masks of the rows violating every processor constraint."""
+    core_nums = [meta_params[num_column].to_numpy() for _, num_column in CORE_TYPES]
+    errors = {
+        "negative core count": np.any([num < 0 for num in core_nums], axis=0),
+        "no cores": sum(core_nums) < 1,
+    }
+    for (prefix, num_column), core_num in zip(CORE_TYPES, core_nums):
+        # parameters of an absent core type are never instantiated
+        present = core_num > 0
+        errors[f"{prefix} width below 1"] = present & (
+            meta_params[f"{prefix}_width"].to_numpy() < 1
+        )
+        errors[f"{prefix} rob_size below 1"] = present & (
+            meta_params[f"{prefix}_rob_size"].to_numpy() < 1
+        )
+        errors[f"{prefix} num_int_regs not above {RISCV_NUM_INT_REGS}"] = present & (
+            meta_params[f"{prefix}_num_int_regs"].to_numpy() <= RISCV_NUM_INT_REGS
+        )
+        errors[f"{prefix} num_fp_regs not above {RISCV_NUM_FP_REGS}"] = present & (
+            meta_params[f"{prefix}_num_fp_regs"].to_numpy() <= RISCV_NUM_FP_REGS
+        )
+    return errors
+
+
+def _workload_errors(meta_params: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Masks of the rows violating every workload constraint."""
+    return {
+        "matsize below 1": meta_params["matsize"].to_numpy() < 1,
+        "seed below 0": meta_params["seed"].to_numpy() < 0,
+        "unknown kernel variant": ~meta_params["kernel_variant"]
+        .isin(KERNEL_VARIANTS)
+        .to_numpy(),
+        "unknown workload mix": ~meta_params["workload_mix"]
+        .isin([workload_mix.UNIFORM_MIX, *workload_mix.MIX_TABLE])
+        .to_numpy(),
+    }
+
+
+def _memory_errors(meta_params: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Masks of the rows whose processes do not fit into the largest memory."""
+    known_mix = meta_params["workload_mix"].isin(
+        [workload_mix.UNIFORM_MIX, *workload_mix.MIX_TABLE]
+    ).to_numpy()
+    fits = np.ones(len(meta_params), dtype=bool)
+    for position, (_, row) in enumerate(meta_params.iterrows()):
+        if not known_mix[position]:
+            continue
+        try:
+            memory_sizing.memory_config(memory_sizing.experiment_footprint_bytes([row]))
+        except ValueError:
+            fits[position] = False
+    return {"workload does not fit into memory": ~fits}
+
+
+def normalise_meta_params(meta_params: pd.DataFrame) -> pd.DataFrame:
+    """Map equivalent design points onto a single representative.
+
+    - At most `rob_size` instructions are in flight, so physical registers
+      beyond the architectural ones plus `rob_size` are never allocated and
+      are clamped away.
+    - Kernels without tiling ignore `block_size`, which is set to 0.
+    - Named workload mixes replace the experiment's own workload, which is
+      set to the workload of the big cores.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+
+    Returns:
+        pd.DataFrame: The normalised rows, indexed like `meta_params`.
+    """
+    normalised = meta_params.copy()
+    for prefix, _ in CORE_TYPES:
+        rob_size = normalised[f"{prefix}_rob_size"]
+        for column, num_arch_regs in (
+            (f"{prefix}_num_int_regs", RISCV_NUM_INT_REGS),
+            (f"{prefix}_num_fp_regs", RISCV_NUM_FP_REGS),
+        ):
+            normalised[column] = np.minimum(normalised[column], num_arch_regs + rob_size)
+
+    for mix_name, mix in workload_mix.MIX_TABLE.items():
+        mixed = normalised["workload_mix"] == mix_name
+        normalised.loc[mixed, "kernel_variant"] = mix.big_core.kernel_variant
+        normalised.loc[mixed, "matsize"] = mix.big_core.matsize
+        normalised.loc[mixed, "block_size"] = mix.big_core.block_size
+
+    tiled = normalised["kernel_variant"].isin(workload_builder.BLOCKED_VARIANTS)
+    normalised["block_size"] = normalised["block_size"].where(tiled, 0)
+    return normalised
+
+
+def validate_meta_params(
+    meta_params: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Normalise a sweep and split it into launchable and rejected rows.
+
+    Rows that become identical after normalisation are only kept once.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: The valid, normalised and
+            deduplicated rows, and the rejected rows with a "rejection_reason"
+            column listing every violated constraint.
+    """
+    normalised = normalise_meta_params(meta_params)
+    errors = {
+        **_cache_errors(normalised),
+        **_processor_errors(normalised),
+        **_workload_errors(normalised),
+        **_memory_errors(normalised),
+    }
+    reasons = pd.Series("", index=normalised.index)
+    for reason, mask in errors.items():
+        reasons[mask] += reason + "; "
+    rejected = reasons != ""
+
+    valid = normalised[~rejected]
+    # experiment_index is unique per row, so it is not part of the identity
+    identity = [column for column in valid.columns if column != "experiment_index"]
+    valid = valid[~valid.duplicated(subset=identity)]
+
+    rejected_rows = meta_params[rejected].assign(
+        rejection_reason=reasons[rejected].str.rstrip("; ")
+    )
+    return valid, rejected_rows
+
+
+def batchable(meta_params: pd.DataFrame) -> pd.Series:
+    """Whether the runs of every design point can share a simulation.
+
+    The stats phases of a batched simulation only hold one run each (see
+    `work_phases.WorkPhaseTracker`) if every core reporting work items takes
+    as long for every run. That holds if all cores are of one type and run
+    the same workload, or if a threaded workload is only reported by its main
+    thread. The big and little cores differ in
+    their pipelines and their caches, so points with cores of both types are
+    simulated alone, as are points with a non-uniform workload mix.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+
+    Returns:
+        pd.Series: A boolean mask of the rows that can be batched.
+    """
+    uniform = meta_params["workload_mix"] == workload_mix.UNIFORM_MIX
+    one_core_type = np.any(
+        [meta_params[num_column] == 0 for _, num_column in CORE_TYPES], axis=0
+    )
+    threaded = meta_params["kernel_variant"].isin(workload_builder.THREADED_VARIANTS)
+    return uniform & (one_core_type | threaded)
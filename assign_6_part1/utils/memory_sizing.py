@@ -0,0 +1,108 @@
+"""Sizes the simulated memory from the workload footprint.
+
+Every core runs its own process, and every matmul run allocates A, B and C
+(three N x N doubles plus their row pointers) on top of the fixed footprint
+of the process. The gem5 executor picks the memory size and channel count
+from that, and the sweep validation rejects points that cannot fit before
+anything is launched.
+"""
+
+import dataclasses
+
+from utils import workload_builder, workload_mix
+
+BYTES_PER_MIB = 1 << 20
+
+ELEMENT_SIZE = 8  # the workload multiplies doubles
+POINTER_SIZE = 8
+NUM_MATRICES = 3
+# text, libc, stack and heap bookkeeping of one statically linked process
+PROCESS_OVERHEAD_BYTES = 4 * BYTES_PER_MIB
+# default pthread stack of every thread but the main one
+THREAD_STACK_BYTES = 8 * BYTES_PER_MIB
+# slack for the page tables and allocator fragmentation
+HEADROOM = 1.25
+
+# the size of the old fixed memory, kept as the minimum
+MIN_MEMORY_BYTES = 32 * BYTES_PER_MIB
+# capacity of one DDR3-1600 channel, and the most channels gem5 provides a
+# DDR3-1600 memory for
+CHANNEL_CAPACITY_BYTES = 2048 * BYTES_PER_MIB
+MAX_CHANNELS = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class MemoryConfig:
+    """Size and channel count of the simulated memory."""
+
+    size_bytes: int
+    num_channels: int
+
+    @property
+    def size_str(self) -> str:
+        """The size in gem5 notation, e.g. "64MiB"."""
+        return f"{self.size_bytes // BYTES_PER_MIB}MiB"
+
+
+def workload_footprint_bytes(workload: workload_mix.CoreWorkload) -> int:
+    """Peak memory of a single matmul run."""
+    return NUM_MATRICES * workload.matsize * (
+        workload.matsize * ELEMENT_SIZE + POINTER_SIZE
+    )
+
+
+def experiment_footprint_bytes(meta_params_batch: list) -> int:
+    """Peak memory of all processes of a (batched) experiment.
+
+    Every core runs the workloads of a batch one after another and frees the
+    matrices in between, so each process only needs its largest one. The
+    threaded variants run a single process whose threads share the matrices.
+
+    Args:
+        meta_params_batch (list): `ExperimentMetaParameter`s, or rows of the
+            meta parameter table, that run on the same board.
+
+    Returns:
+        int: The footprint in bytes.
+    """
+    mixes = [workload_mix.core_workloads(meta_params) for meta_params in meta_params_batch]
+    big_core_bytes = max(workload_footprint_bytes(mix.big_core) for mix in mixes)
+    little_core_bytes = max(workload_footprint_bytes(mix.little_core) for mix in mixes)
+    meta_params = meta_params_batch[0]
+    num_cores = int(meta_params.big_core_num) + int(meta_params.small_core_num)
+    if mixes[0].big_core.kernel_variant in workload_builder.THREADED_VARIANTS:
+        return (
+            max(big_core_bytes, little_core_bytes)
+            + PROCESS_OVERHEAD_BYTES
+            + (num_cores - 1) * THREAD_STACK_BYTES
+        )
+    return int(meta_params.big_core_num) * (
+        big_core_bytes + PROCESS_OVERHEAD_BYTES
+    ) + int(meta_params.small_core_num) * (little_core_bytes + PROCESS_OVERHEAD_BYTES)
+
+
+def memory_config(footprint_bytes: int) -> MemoryConfig:
+    """Pick the memory for a footprint.
+
+    The size is the next power of two above the footprint plus headroom, and
+    channels are added once one is not enough.
+
+    Args:
+        footprint_bytes (int): The footprint of the experiment.
+
+    Returns:
+        MemoryConfig: The chosen memory.
+
+    Raises:
+        ValueError: If the footprint does not fit into the largest memory.
+    """
+    required_bytes = max(int(footprint_bytes * HEADROOM), MIN_MEMORY_BYTES)
+    size_bytes = 1 << (required_bytes - 1).bit_length()
+    num_channels = -(-size_bytes // CHANNEL_CAPACITY_BYTES)
+    if num_channels > MAX_CHANNELS:
+        raise ValueError(
+            f"A footprint of {footprint_bytes / BYTES_PER_MIB:.1f}MiB does not fit "
+            f"into {MAX_CHANNELS} x {CHANNEL_CAPACITY_BYTES // BYTES_PER_MIB}MiB "
+            "of memory."
+        )
+    return MemoryConfig(size_bytes=size_bytes, num_channels=num_channels)
@@ -0,0 +1,145 @@
+"""Pareto front extraction for multi-objective sweeps.
+
+All objectives are minimised, e.g. (`simSeconds`, area score).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def pareto_front_mask(objectives: np.ndarray) -> np.ndarray:
+    """Find the non-dominated points among a set of design points.
+
+    A point is dominated if another point is no worse in every objective and
+    strictly better in at least one.
+
+    Args:
+        objectives (np.ndarray): Objective values, shape (num_points,
+            num_objectives).
+
+    Returns:
+        np.ndarray: A boolean mask, True for points on the Pareto front.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    num_points = objectives.shape[0]
+    on_front = np.ones(num_points, dtype=bool)
+
+    # sort lexicographically so a point can only be dominated by earlier ones
+    order = np.lexsort(objectives.T[::-1])
+    sorted_objectives = objectives[order]
+
+    if objectives.shape[1] == 2:
+        # with two objectives a point is on the front iff its second objective
+        # is strictly below every earlier one
+        previous_best = np.minimum.accumulate(
+            np.concatenate(([np.inf], sorted_objectives[:-1, 1]))
+        )
+        on_front[order] = sorted_objectives[:, 1] < previous_best
+        return on_front
+
+    for position in range(num_points):
+        earlier = sorted_objectives[:position]
+        current = sorted_objectives[position]
+        dominated = np.any(
+            np.all(earlier <= current, axis=1) & np.any(earlier < current, axis=1)
+        )
+        # duplicates of a front point are kept out of the front
+        duplicated = np.any(np.all(earlier == current, axis=1))
+        on_front[order[position]] = not (dominated or duplicated)
+    return on_front
+
+
+def pareto_front(
+    results: pd.DataFrame, objectives: tuple[str, ...] = ("simSeconds", "area_score")
+) -> pd.DataFrame:
+    """Extract the Pareto front of a whole sweep.
+
+    Args:
+        results (pd.DataFrame): One row per design point.
+        objectives (tuple[str, ...]): The columns to minimise.
+
+    Returns:
+        pd.DataFrame: The non-dominated rows, sorted by the first objective.
+    """
+    mask = pareto_front_mask(results[list(objectives)].to_numpy())
+    return results[mask].sort_values(list(objectives))
+
+
+def distance_to_front(
+    objectives: np.ndarray, front_objectives: np.ndarray, scale: np.ndarray
+) -> np.ndarray:
+    """Normalised distance of every point to the closest point on a front.
+
+    Args:
+        objectives (np.ndarray): Points to measure, shape (num_points,
+            num_objectives).
+        front_objectives (np.ndarray): Points on the front, shape
+            (num_front_points, num_objectives).
+        scale (np.ndarray): Per-objective normalisation, e.g. the range of
+            each objective over the sweep.
+
+    Returns:
+        np.ndarray: One distance per point.
+    """
+    scale = np.where(np.asarray(scale, dtype=float) > 0, scale, 1.0)
+    difference = (
+        np.asarray(objectives, dtype=float)[:, None, :]
+        - np.asarray(front_objectives, dtype=float)[None, :, :]
+    ) / scale
+    return np.sqrt((difference**2).sum(axis=2)).min(axis=1)
+
+
+def prioritise_near_front(
+    pending: pd.DataFrame,
+    finished: pd.DataFrame,
+    feature_columns: list[str],
+    objectives: tuple[str, ...] = ("simSeconds", "area_score"),
+) -> pd.Index:
+    """Order pending design points by how close they are likely to be to the front.
+
+    Objectives that are only known after simulation (e.g. `simSeconds`) are
+    estimated from the nearest finished point in the normalised feature
+    space. Objectives already present in `pending` (e.g. the area score) are
+    used as they are.
+
+    Args:
+        pending (pd.DataFrame): Design points that have not been simulated.
+        finished (pd.DataFrame): Simulated design points with all objectives.
+        feature_columns (list[str]): Numeric columns describing a design point.
+        objectives (tuple[str, ...]): The columns to minimise.
+
+    Returns:
+        pd.Index: The index of `pending`, closest to the front first.
+    """
+    if finished.empty or pending.empty:
+        return pending.index
+
+    finished_features = finished[feature_columns].to_numpy(dtype=float)
+    pending_features = pending[feature_columns].to_numpy(dtype=float)
+    feature_range = np.ptp(
+        np.vstack((finished_features, pending_features)), axis=0
+    )
+    feature_range = np.where(feature_range > 0, feature_range, 1.0)
+    feature_distance = (
+        (
+            (pending_features[:, None, :] - finished_features[None, :, :])
+            / feature_range
+        )
+        ** 2
+    ).sum(axis=2)
+    nearest = feature_distance.argmin(axis=1)
+
+    estimated = np.column_stack(
+        [
+            pending[objective].to_numpy(dtype=float)
+            if objective in pending.columns
+            else finished[objective].to_numpy(dtype=float)[nearest]
+            for objective in objectives
+        ]
+    )
+    finished_objectives = finished[list(objectives)].to_numpy(dtype=float)
+    front_objectives = finished_objectives[pareto_front_mask(finished_objectives)]
+    scale = np.ptp(np.vstack((finished_objectives, estimated)), axis=0)
+
+    distance = distance_to_front(estimated, front_objectives, scale)
+    return pending.index[np.argsort(distance, kind="stable")]
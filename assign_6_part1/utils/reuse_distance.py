@@ -0,0 +1,226 @@
+"""Reuse-distance histograms and miss-ratio curves of the matmul workload.
+
+The reuse (stack) distance of an access is the number of distinct lines touched
+since the previous access to the same line. A fully associative LRU cache of C
+lines hits exactly the accesses with a reuse distance below C, so one histogram
+yields the miss ratio of every cache capacity at once.
+
+Distances are counted with a Fenwick tree holding a marker at the last access
+of every line. The trace is processed in blocks: the tree answers the queries
+of a whole block with one vectorised lookup, and the accesses within a block
+are accounted for pairwise.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import cache_simulator, cache_sizing
+
+# accesses whose distances are resolved together
+BLOCK_SIZE = 512
+
+# reuse distance of the first access to a line
+COLD = -1
+
+
+class FenwickTree:
+    """A binary indexed tree over counters, with vectorised queries and updates."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._tree = np.zeros(size + 1, dtype=np.int64)
+
+    def add(self, positions: np.ndarray, values: np.ndarray):
+        """Add `values` to the counters at `positions`."""
+        index = np.asarray(positions, dtype=np.int64) + 1
+        values = np.asarray(values, dtype=np.int64)
+        while index.size:
+            np.add.at(self._tree, index, values)
+            index = index + (index & -index)
+            inside = index <= self._size
+            index, values = index[inside], values[inside]
+
+    def prefix_sum(self, ends: np.ndarray) -> np.ndarray:
+        """Sum of the counters at positions [0, end) for every end."""
+        index = np.asarray(ends, dtype=np.int64).copy()
+        total = np.zeros(index.shape, dtype=np.int64)
+        while np.any(index > 0):
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+
+def reuse_distances(lines: np.ndarray) -> np.ndarray:
+    """Compute the reuse distance of every access.
+
+    Args:
+        lines (np.ndarray): The accessed line of every access, in order.
+
+    Returns:
+        np.ndarray: The number of distinct other lines accessed since the
+            previous access to the same line, or `COLD` for first accesses.
+    """
+    lines = np.asarray(lines)
+    num_accesses = len(lines)
+    positions = np.arange(num_accesses)
+
+    # previous and next access to the same line
+    order = np.argsort(lines, kind="stable")
+    same_line = lines[order][1:] == lines[order][:-1]
+    previous = np.full(num_accesses, COLD, dtype=np.int64)
+    previous[order[1:][same_line]] = order[:-1][same_line]
+    following = np.full(num_accesses, num_accesses, dtype=np.int64)
+    following[order[:-1][same_line]] = order[1:][same_line]
+
+    distances = np.full(num_accesses, COLD, dtype=np.int64)
+    # markers at the last access of every line before the current block
+    last_accesses = FenwickTree(num_accesses)
+    for start in range(0, num_accesses, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, num_accesses)
+        block = positions[start:stop]
+        block_previous = previous[start:stop]
+        reused = block_previous != COLD
+        earlier = block[None, :] < block[:, None]
+
+        # lines last accessed between the previous access and the block
+        before_block = np.maximum(
+            last_accesses.prefix_sum(np.full(block.size, start))
+            - last_accesses.prefix_sum(block_previous + 1),
+            0,
+        )
+        # ... minus those accessed again in the block before the current access
+        before_block -= np.count_nonzero(
+            earlier
+            & (block_previous[None, :] > block_previous[:, None])
+            & (block_previous[None, :] < start),
+            axis=1,
+        )
+        # lines accessed in the block and not since
+        in_block = np.count_nonzero(
+            earlier
+            & (block[None, :] > block_previous[:, None])
+            & (following[start:stop][None, :] > block[:, None]),
+            axis=1,
+        )
+        distances[start:stop] = np.where(reused, before_block + in_block, COLD)
+
+        moved = reused & (block_previous < start)
+        last_accesses.add(block_previous[moved], np.full(np.count_nonzero(moved), -1))
+        last = following[start:stop] >= stop
+        last_accesses.add(block[last], np.ones(np.count_nonzero(last), dtype=np.int64))
+
+    return distances
+
+
+def reuse_distance_histogram(
+    lines: np.ndarray, weights: np.ndarray | None = None
+) -> tuple[np.ndarray, int]:
+    """Histogram the reuse distances of a line trace.
+
+    Args:
+        lines (np.ndarray): The accessed line of every access, in order.
+        weights (np.ndarray | None): Accesses represented by every entry.
+
+    Returns:
+        tuple[np.ndarray, int]: The number of accesses with every reuse
+            distance, and the number of cold accesses.
+    """
+    if weights is None:
+        weights = np.ones(len(lines), dtype=np.int64)
+    distances = reuse_distances(lines)
+    cold = distances == COLD
+    histogram = np.bincount(distances[~cold], weights=weights[~cold]).astype(np.int64)
+    return histogram, int(weights[cold].sum())
+
+
+def miss_ratio_curve(histogram: np.ndarray, cold_accesses: int) -> np.ndarray:
+    """Turn a reuse-distance histogram into a miss-ratio curve.
+
+    Returns:
+        np.ndarray: The miss ratio of a fully associative LRU cache with
+            `index` lines; capacities beyond the end miss only cold accesses.
+    """
+    total = histogram.sum() + cold_accesses
+    # accesses with a distance of at least every capacity
+    misses = np.concatenate((np.cumsum(histogram[::-1])[::-1], [0])) + cold_accesses
+    return misses / max(total, 1)
+
+
+def matmul_miss_ratio_curve(
+    mat_size: int,
+    kernel_variant: str = "ijk",
+    block_size: int = 0,
+    line_size: int = cache_sizing.CACHE_LINE_SIZE,
+) -> np.ndarray:
+    """The miss-ratio curve of a matmul kernel, indexed by capacity in lines."""
+    trace = cache_simulator.matmul_trace(mat_size, kernel_variant, block_size)
+    lines = trace.addresses // line_size
+    # immediate repeats always have distance 0, so merge them beforehand
+    heads = np.flatnonzero(np.concatenate(([True], lines[1:] != lines[:-1])))
+    weights = np.diff(np.append(heads, len(lines)))
+    histogram, cold_accesses = reuse_distance_histogram(lines[heads], weights)
+    return miss_ratio_curve(histogram, cold_accesses)
+
+
+def _curve_at(curve: np.ndarray, size_kb, line_size: int) -> np.ndarray:
+    """Miss ratio of caches of the given capacities."""
+    capacity = np.asarray(size_kb) * cache_sizing.BYTES_PER_KB // line_size
+    return curve[np.minimum(capacity, len(curve) - 1)]
+
+
+def predict_miss_rates(
+    meta_params: pd.DataFrame,
+    mat_size: int,
+    kernel_variant: str = "ijk",
+    block_size: int = 0,
+    core_type: str = "big",
+    line_size: int = cache_sizing.CACHE_LINE_SIZE,
+) -> pd.DataFrame:
+    """Predict the miss rate of every cache level for every row of a sweep.
+
+    All rows share a single miss-ratio curve. The levels are treated as fully
+    associative LRU caches holding each other (inclusion), so the local miss
+    rate of a level is its global miss ratio divided by that of the level
+    above.
+
+    Args:
+        meta_params (pd.DataFrame): Rows with the columns of
+            `ExperimentMetaParameter`.
+        mat_size (int): Matrix size of the workload.
+        kernel_variant (str): Kernel variant of the workload.
+        block_size (int): Tile size of the blocked kernel variants.
+        core_type (str): "big" or "little".
+        line_size (int): Cache line size in bytes.
+
+    Returns:
+        pd.DataFrame: The local miss rates of the L1D, L2 and L3, indexed like
+            `meta_params`.
+    """
+    curve = matmul_miss_ratio_curve(mat_size, kernel_variant, block_size, line_size)
+    geometry = cache_sizing.hierarchy_geometry(
+        meta_params["l1_cache_sample_seed"].to_numpy(),
+        meta_params["l2_cache_sample_seed"].to_numpy(),
+        meta_params["l3_cache_sample_seed"].to_numpy(),
+    )
+
+    global_miss_ratios = [
+        _curve_at(curve, geometry[level].size_kb, line_size)
+        for level in (core_type + "_l1d", core_type + "_l2", "l3")
+    ]
+    local_miss_rates = [global_miss_ratios[0]] + [
+        np.divide(
+            below,
+            above,
+            out=np.zeros_like(below),
+            where=above > 0,
+        )
+        for above, below in zip(global_miss_ratios[:-1], global_miss_ratios[1:])
+    ]
+    return pd.DataFrame(
+        {
+            "mrc_l1d_missrate": local_miss_rates[0],
+            "mrc_l2_missrate": local_miss_rates[1],
+            "mrc_l3_missrate": local_miss_rates[2],
+        },
+        index=meta_params.index,
+    )
@@ -0,0 +1,101 @@
+"""Tests for utils/reuse_distance.py."""
+
+import unittest
+
+import numpy as np
+
+from utils import cache_simulator, cache_sizing, reuse_distance
+
+LINE_SIZE = cache_sizing.CACHE_LINE_SIZE
+
+
+def brute_force_reuse_distances(lines: np.ndarray) -> np.ndarray:
+    """Reuse distances by scanning back from every access, in O(n^2)."""
+    distances = np.full(len(lines), reuse_distance.COLD, dtype=np.int64)
+    for i, line in enumerate(lines):
+        for j in range(i - 1, -1, -1):
+            if lines[j] == line:
+                distances[i] = len(set(lines[j + 1 : i].tolist()))
+                break
+    return distances
+
+
+def fully_associative_lru(capacities: list[int]) -> list[cache_simulator.CacheLevelSweep]:
+    """A single fully associative LRU level of every capacity in lines."""
+    capacities = np.asarray(capacities)
+    return [
+        cache_simulator.CacheLevelSweep(
+            # one set holding all the lines
+            size_kb=capacities * LINE_SIZE // cache_sizing.BYTES_PER_KB,
+            assoc=capacities,
+            replacement_policy=np.full(len(capacities), "LRURP"),
+            prefetcher_type=np.full(len(capacities), "Tagged"),
+            prefetch_degree=np.zeros(len(capacities), dtype=np.int64),
+        )
+    ]
+
+
+class ReuseDistanceTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        block_size = reuse_distance.BLOCK_SIZE
+        # lengths within one block, at and across block boundaries
+        for num_accesses in (1, 2, 37, block_size, block_size + 1, 3 * block_size - 5):
+            for num_lines in (1, 4, 60, 2 * block_size):
+                with self.subTest(num_accesses=num_accesses, num_lines=num_lines):
+                    lines = rng.integers(0, num_lines, num_accesses)
+                    np.testing.assert_array_equal(
+                        reuse_distance.reuse_distances(lines),
+                        brute_force_reuse_distances(lines),
+                    )
+
+    def test_long_reuses_across_blocks(self):
+        # every line is reused a few blocks later, after all the other lines
+        num_lines = 3 * reuse_distance.BLOCK_SIZE + 11
+        lines = np.tile(np.arange(num_lines), 3)
+        distances = reuse_distance.reuse_distances(lines)
+        np.testing.assert_array_equal(distances[:num_lines], reuse_distance.COLD)
+        np.testing.assert_array_equal(distances[num_lines:], num_lines - 1)
+
+    def test_empty_trace(self):
+        self.assertEqual(len(reuse_distance.reuse_distances(np.array([], dtype=np.int64))), 0)
+
+    def assertMatchesSimulator(self, trace: cache_simulator.AddressTrace, curve: np.ndarray):
+        capacities = [16, 32, 64, 128]
+        accesses, misses = cache_simulator.simulate_hierarchy(
+            trace, fully_associative_lru(capacities), LINE_SIZE
+        )
+        for capacity, level_accesses, level_misses in zip(capacities, accesses, misses):
+            with self.subTest(capacity=capacity):
+                self.assertAlmostEqual(
+                    curve[min(capacity, len(curve) - 1)],
+                    level_misses[0] / level_accesses[0],
+                )
+
+    def test_miss_ratio_curve_matches_simulator(self):
+        rng = np.random.default_rng(1)
+        lines = rng.integers(0, 200, 3 * reuse_distance.BLOCK_SIZE + 100)
+        histogram, cold_accesses = reuse_distance.reuse_distance_histogram(lines)
+        trace = cache_simulator.AddressTrace(
+            addresses=lines * LINE_SIZE,
+            streams=np.zeros(len(lines), dtype=np.int8),
+            weights=np.ones(len(lines), dtype=np.int64),
+            prefetch=np.zeros(len(lines), dtype=bool),
+        )
+        self.assertMatchesSimulator(
+            trace, reuse_distance.miss_ratio_curve(histogram, cold_accesses)
+        )
+
+    def test_matmul_miss_ratio_curve_matches_simulator(self):
+        for kernel_variant, block_size in (("ijk", 0), ("ikj", 0), ("kj", 4)):
+            with self.subTest(kernel_variant=kernel_variant):
+                self.assertMatchesSimulator(
+                    cache_simulator.matmul_trace(16, kernel_variant, block_size),
+                    reuse_distance.matmul_miss_ratio_curve(
+                        16, kernel_variant, block_size, LINE_SIZE
+                    ),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""Parsers for the gem5 stats.txt of the hybrid CPU experiment."""
+
+import os
+import re
+
+import numpy as np
+
+BEGIN_MARKER = "Begin Simulation Statistics"
+END_MARKER = "End Simulation Statistics"
+
+# the executor logs the kind of every dump it makes, one per line, next to
+# stats.txt; the final dump gem5 makes at exit is not logged
+DUMP_KINDS_FILE_NAME = "stats_dump_kinds.txt"
+# the stats of a whole workload phase
+PHASE_DUMP = "phase"
+# a periodic dump, or the dump closing an interval before a phase reset
+INTERVAL_DUMP = "interval"
+
+# example line: board.cache_hierarchy.clusters0.dptw_cache.tags.sampledRefs
+CLUSTER_PATTERN = re.compile(r"\.clusters(\d+)\.")
+
+# result column of the overall miss rate of every (cluster, cache) pair
+MISSRATE_COLUMNS = {
+    ("big", "l1icache"): "avg_big_l1i_missrate",
+    ("big", "l1dcache"): "avg_big_l1d_missrate",
+    ("big", "l2cache"): "avg_big_l2_missrate",
+    ("little", "l1icache"): "avg_little_l1i_missrate",
+    ("little", "l1dcache"): "avg_little_l1d_missrate",
+    ("little", "l2cache"): "avg_little_l2_missrate",
+    (None, "l3_cache"): "avg_l3_missrate",
+}
+
+
+def read_stats_dumps(stats_file: str) -> list[list[str]]:
+    """Split a stats file into its dumps.
+
+    gem5 appends one block of statistics per `m5.stats.dump()`, plus a final
+    one when the simulation exits.
+
+    Args:
+        stats_file (str): The path of stats.txt.
+
+    Returns:
+        list[list[str]]: The lines of every dump, in order.
+    """
+    dumps = []
+    with open(stats_file, "r") as f:
+        for line in f:
+            if BEGIN_MARKER in line:
+                dumps.append([])
+            elif END_MARKER in line:
+                continue
+            elif dumps:
+                dumps[-1].append(line)
+    return dumps
+
+
+def read_phase_dumps(outdir: str) -> list[list[str]]:
+    """Read the dumps holding a workload phase each from a gem5 output folder.
+
+    Args:
+        outdir (str): The output folder of the executor.
+
+    Returns:
+        list[list[str]]: The lines of every phase dump, in order. If the
+            folder has no dump kind log, every dump is returned.
+    """
+    dumps = read_stats_dumps(os.path.join(outdir, "stats.txt"))
+    kinds_file = os.path.join(outdir, DUMP_KINDS_FILE_NAME)
+    if not os.path.exists(kinds_file):
+        return dumps
+    with open(kinds_file, "r") as f:
+        kinds = [line.strip() for line in f if line.strip()]
+    return [dump for dump, kind in zip(dumps, kinds) if kind == PHASE_DUMP]
+
+
+def _core_type(name: str, big_core_num: int) -> str | None:
+    """The core type of the cluster a stat belongs to, None for shared ones."""
+    cluster = CLUSTER_PATTERN.search(name)
+    if cluster is None:
+        return None
+    elif int(cluster.group(1)) < big_core_num:
+        return "big"
+    else:
+        return "little"
+
+
+def summarise_dump(lines: list[str], big_core_num: int) -> dict:
+    """Extract the result columns of the experiment from a single dump.
+
+    Miss rates are averaged over all clusters of a core type; clusters
+    0 to big_core_num - 1 are the big cores.
+
+    Args:
+        lines (list[str]): The lines of the dump.
+        big_core_num (int): The number of big cores.
+
+    Returns:
+        dict: simSeconds, simInsts and the average miss rate of every cache,
+            0.0 for caches without accesses.
+    """
+    sim_seconds = 0.0
+    sim_insts = 0
+    missrates = {column: [] for column in MISSRATE_COLUMNS.values()}
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        name = fields[0]
+        # example line: simSeconds                                   0.002261
+        if name == "simSeconds":
+            sim_seconds = float(fields[1])
+        # example line: simInsts                                      8018609
+        elif name == "simInsts":
+            sim_insts = int(fields[1])
+        # example line: board.cache_hierarchy.l3_cache.overallMissRate::total     0.096511
+        elif name.endswith(".overallMissRate::total"):
+            cache_type = name.split(".")[-2]
+            core_type = _core_type(name, big_core_num)
+            try:
+                column = MISSRATE_COLUMNS[(core_type, cache_type)]
+            except KeyError:
+                raise ValueError("Unknown cache type. Full line: " + line)
+            missrates[column].append(float(fields[1]))
+
+    summary = {"simSeconds": sim_seconds, "simInsts": sim_insts}
+    for column, values in missrates.items():
+        summary[column] = sum(values) / len(values) if values else 0.0
+    return summary
+
+
+def _dump_counters(lines: list[str], big_core_num: int) -> dict:
+    """Extract the cumulative counters behind the interval series of a dump."""
+    counters = {"finalTick": 0, "simTicks": 0, "simInsts": 0, "cycles": 0}
+    for key in MISSRATE_COLUMNS:
+        counters[("misses", key)] = 0.0
+        counters[("accesses", key)] = 0.0
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        name = fields[0]
+        if name in ("finalTick", "simTicks", "simInsts"):
+            counters[name] = int(fields[1])
+        # example line: board.processor.cores0.core.numCycles       6783210
+        # all cores share the board clock, halted ones stop counting
+        elif name.endswith(".numCycles"):
+            counters["cycles"] = max(counters["cycles"], int(fields[1]))
+        # example line: board.cache_hierarchy.l3_cache.overallMisses::total     1024
+        elif name.endswith((".overallMisses::total", ".overallAccesses::total")):
+            cache_type = name.split(".")[-2]
+            key = (_core_type(name, big_core_num), cache_type)
+            if key not in MISSRATE_COLUMNS:
+                raise ValueError("Unknown cache type. Full line: " + line)
+            counter = "misses" if "Misses" in name else "accesses"
+            counters[(counter, key)] += float(fields[1])
+    return counters
+
+
+def interval_series(dumps: list[list[str]], big_core_num: int) -> dict[str, np.ndarray]:
+    """Turn consecutive dumps into per-interval time series.
+
+    gem5 counters accumulate from the last stats reset, so the values of an
+    interval are the difference to the previous dump. A dump after a reset
+    (its reset tick, finalTick - simTicks, changed) starts a new run of
+    differences; the executor dumps before every reset, so no ticks are lost.
+
+    Args:
+        dumps (list[list[str]]): The lines of every dump, in order.
+        big_core_num (int): The number of big cores.
+
+    Returns:
+        dict[str, np.ndarray]: One value per interval: "end_tick", "ticks",
+            "insts", "ipc" (instructions of all cores per board clock cycle)
+            and the miss rate of every cache, e.g. "big_l1d_missrate". The
+            rates are NaN for intervals without cycles or accesses.
+    """
+    if not dumps:
+        raise ValueError("No stats dumps.")
+    counters = [_dump_counters(lines, big_core_num) for lines in dumps]
+    values = {
+        key: np.array([dump[key] for dump in counters], dtype=np.float64)
+        for key in counters[0]
+        if key != "finalTick"
+    }
+    end_tick = np.array([dump["finalTick"] for dump in counters], dtype=np.int64)
+    reset_tick = end_tick - values["simTicks"].astype(np.int64)
+
+    # subtract the previous dump unless a reset happened in between
+    continued = np.zeros(len(counters), dtype=bool)
+    continued[1:] = reset_tick[1:] == reset_tick[:-1]
+    deltas = {}
+    for key, cumulative in values.items():
+        previous = np.zeros_like(cumulative)
+        previous[1:] = cumulative[:-1]
+        deltas[key] = cumulative - np.where(continued, previous, 0.0)
+
+    series = {
+        "end_tick": end_tick,
+        "ticks": deltas["simTicks"],
+        "insts": deltas["simInsts"],
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series["ipc"] = np.where(
+            deltas["cycles"] > 0, deltas["simInsts"] / deltas["cycles"], np.nan
+        )
+        for key, column in MISSRATE_COLUMNS.items():
+            accesses = deltas[("accesses", key)]
+            series[column.removeprefix("avg_")] = np.where(
+                accesses > 0, deltas[("misses", key)] / accesses, np.nan
+            )
+    return series
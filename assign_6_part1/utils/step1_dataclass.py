@@ -1,5 +1,9 @@
 import dataclasses
 
+# fields of ExperimentMetaParameter that only change the workload arguments, so
+# experiments differing only in them can share a board
+WORKLOAD_FIELDS = ("matsize", "block_size", "seed", "experiment_index")
+
 @dataclasses.dataclass
 class CacheMetaParameter:
     """Meta parameters for cache configurations."""
@@ -38,6 +42,18 @@ class ExperimentMetaParameter:
     
     # workload params
     matsize: int | list[int]
+    # loop order of the matmul kernel: "ijk", "ikj", one of the blocked
+    # variants "ij", "ik", "kj", or the threaded "par_ikj", which runs as a
+    # single process with one thread per core
+    kernel_variant: str | list[str] = "ijk"
+    # tile size of the blocked variants, ignored by "ijk" and "ikj"
+    block_size: int | list[int] = 0
+    # name of a per-core-type workload mix in utils/workload_mix.py, or
+    # "uniform" to run the workload above on every core
+    workload_mix: str | list[str] = "uniform"
+    # seed of the random input matrices, the inputs only depend on the matrix
+    # size and the seed
+    seed: int | list[int] = 0
     
     # experiment index
     experiment_index: int = -1
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Accounting of the workload runs reported by the cores as gem5 work items."""
+
+import collections
+
+# the stats are reset, the next phase starts
+RESET = "reset"
+# the stats of a finished phase are dumped
+DUMP_PHASE = "dump_phase"
+
+
+class WorkPhaseTracker:
+    """Turns the work item events of the cores into stats phases.
+
+    Every core runs the same number of workloads and reports the begin and
+    end of the n-th one with the work id n. The n-th phase starts when the
+    first core begins run n and is dumped once every core has ended run n,
+    so the n-th phase dump holds the n-th run whichever core finishes first.
+
+    The stats can only hold one phase at a time: if a fast core begins run n
+    before run n - 1 is dumped, the reset is delayed until that dump, and the
+    work the fast core did on run n until then is counted in phase n - 1.
+    Only cores that run in lockstep give one run per phase, see
+    `config_validation.batchable`.
+    """
+
+    def __init__(self, num_cores: int):
+        self.num_cores = num_cores
+        self.begun = collections.Counter()
+        self.ended = collections.Counter()
+        # the runs dumped so far, the next phase to dump is run `dumped`
+        self.dumped = 0
+
+    def work_begin(self, run: int) -> list[str]:
+        """Record that a core began a run.
+
+        Args:
+            run (int): The work id of the run.
+
+        Returns:
+            list[str]: The actions to take on the stats, in order.
+        """
+        self.begun[run] += 1
+        # only the first core to begin a run starts its phase, and only once
+        # the previous runs are dumped
+        if self.begun[run] == 1 and run == self.dumped:
+            return [RESET]
+        return []
+
+    def work_end(self, run: int) -> list[str]:
+        """Record that a core ended a run.
+
+        Args:
+            run (int): The work id of the run.
+
+        Returns:
+            list[str]: The actions to take on the stats, in order.
+        """
+        if self.ended[run] >= self.num_cores:
+            raise ValueError(f"Run {run} ended more often than there are cores.")
+        self.ended[run] += 1
+        actions = []
+        while self.ended[self.dumped] == self.num_cores:
+            actions.append(DUMP_PHASE)
+            self.dumped += 1
+            # the reset of a run a fast core already began was delayed
+            if self.begun[self.dumped] > 0:
+                actions.append(RESET)
+        return actions
@@ -0,0 +1,164 @@
+"""Tests for utils/work_phases.py and the batching of design points on it."""
+
+import unittest
+
+import pandas as pd
+
+from utils import config_validation
+from utils.work_phases import DUMP_PHASE, RESET, WorkPhaseTracker
+
+
+def replay(num_cores: int, events: list[tuple[str, int]]) -> list[tuple[str, int]]:
+    """Replay (event, run) pairs and label every action with the run it was
+    taken on."""
+    tracker = WorkPhaseTracker(num_cores)
+    actions = []
+    for event, run in events:
+        if event == "begin":
+            actions += [(action, run) for action in tracker.work_begin(run)]
+        else:
+            actions += [(action, run) for action in tracker.work_end(run)]
+    return actions
+
+
+def phase_contents(run_times: list[float], num_runs: int) -> list[set[tuple[int, int]]]:
+    """Run every core through `num_runs` back-to-back runs and return the
+    (core, run) pairs whose work falls into every stats phase.
+
+    Args:
+        run_times (list[float]): How long every core takes for one run.
+        num_runs (int): The number of runs of the simulation.
+    """
+    events = []
+    for core, run_time in enumerate(run_times):
+        for run in range(num_runs):
+            events.append((run * run_time, "begin", core, run))
+            events.append(((run + 1) * run_time, "end", core, run))
+    # at equal times a core ends its run before beginning the next one
+    events.sort(key=lambda event: (event[0], event[1] == "begin"))
+
+    tracker = WorkPhaseTracker(len(run_times))
+    phase_start = None
+    phases = []
+    for time, event, _, run in events:
+        if event == "begin":
+            actions = tracker.work_begin(run)
+        else:
+            actions = tracker.work_end(run)
+        for action in actions:
+            if action == RESET:
+                phase_start = time
+            else:
+                phases.append((phase_start, time))
+
+    return [
+        {
+            (core, run)
+            for core, run_time in enumerate(run_times)
+            for run in range(num_runs)
+            # the run overlaps the phase
+            if run * run_time < end and start < (run + 1) * run_time
+        }
+        for start, end in phases
+    ]
+
+
+class WorkPhaseTrackerTest(unittest.TestCase):
+    def test_lockstep_cores(self):
+        events = [
+            ("begin", 0), ("begin", 0), ("end", 0), ("end", 0),
+            ("begin", 1), ("begin", 1), ("end", 1), ("end", 1),
+        ]
+        self.assertEqual(replay(2, events), [
+            (RESET, 0), (DUMP_PHASE, 0), (RESET, 1), (DUMP_PHASE, 1)])
+
+    def test_fast_cores_end_runs_early(self):
+        # 2 big cores finish runs 0 and 1 before either little core finishes run
+        # 0; the old end counting dumped phase 0 after the 4th end
+        events = [
+            ("begin", 0), ("begin", 0), ("begin", 0), ("begin", 0),
+            ("end", 0), ("end", 0), ("begin", 1), ("begin", 1),
+            ("end", 1), ("end", 1), ("begin", 2), ("begin", 2),
+            ("end", 0),
+            ("end", 0),
+            ("begin", 1), ("begin", 1), ("end", 2), ("end", 2),
+            ("end", 1), ("end", 1),
+            ("begin", 2), ("begin", 2), ("end", 2), ("end", 2),
+        ]
+        self.assertEqual(replay(4, events), [
+            (RESET, 0),
+            # the last little core ends run 0, run 1 has begun on the big cores
+            (DUMP_PHASE, 0), (RESET, 0),
+            (DUMP_PHASE, 1), (RESET, 1),
+            (DUMP_PHASE, 2),
+        ])
+
+    def test_phases_are_dumped_in_order(self):
+        tracker = WorkPhaseTracker(2)
+        tracker.work_begin(0)
+        tracker.work_begin(0)
+        tracker.work_end(0)
+        for run in (1, 2):
+            self.assertEqual(tracker.work_begin(run), [])
+            self.assertEqual(tracker.work_end(run), [])
+        # the slow core ends run 0, then its later runs complete the phases
+        self.assertEqual(tracker.work_end(0), [DUMP_PHASE, RESET])
+        tracker.work_begin(1)
+        self.assertEqual(tracker.work_end(1), [DUMP_PHASE, RESET])
+        tracker.work_begin(2)
+        self.assertEqual(tracker.work_end(2), [DUMP_PHASE])
+
+    def test_too_many_ends(self):
+        tracker = WorkPhaseTracker(1)
+        tracker.work_begin(0)
+        tracker.work_end(0)
+        with self.assertRaises(ValueError):
+            tracker.work_end(0)
+
+
+class BatchingTest(unittest.TestCase):
+    def test_fast_core_spills_into_the_previous_phase(self):
+        # a big core (1 time unit per run) begins run 1 long before the
+        # little core (3 units) ends run 0, so phase 0 takes in run 1 work
+        phases = phase_contents([1, 3], num_runs=2)
+        self.assertIn((0, 1), phases[0])
+
+    def test_unbatched_phases_hold_one_run(self):
+        # run alone, every simulation of the hybrid board has a single phase
+        # holding the one run of every core
+        for run_times in ([1, 3], [1, 1, 3, 3]):
+            with self.subTest(run_times=run_times):
+                self.assertEqual(
+                    phase_contents(run_times, num_runs=1),
+                    [{(core, 0) for core in range(len(run_times))}],
+                )
+
+    def test_lockstep_phases_hold_one_run(self):
+        phases = phase_contents([2, 2, 2], num_runs=3)
+        self.assertEqual(
+            phases, [{(core, run) for core in range(3)} for run in range(3)]
+        )
+
+    def test_batchable(self):
+        meta_params = pd.DataFrame(
+            [
+                # big and little cores
+                (2, 2, "ijk", "uniform"),
+                # a single core type
+                (2, 0, "ijk", "uniform"),
+                (0, 4, "kj", "uniform"),
+                # a threaded workload only reports from its main thread
+                (2, 2, "par_ikj", "uniform"),
+                # the core types run different workloads
+                (2, 0, "ijk", "big_ikj_little_ijk"),
+            ],
+            columns=["big_core_num", "small_core_num", "kernel_variant", "workload_mix"],
+        )
+        self.assertEqual(
+            config_validation.batchable(meta_params).tolist(),
+            [False, True, True, True, False],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""Content-hashed build cache for the matmul workload variants.
+
+Every binary is keyed by its variant, compiler flags, compiler version and a
+hash of the workload sources (mm.cpp and all headers, including matrix.h). A
+binary is only rebuilt if one of those changes, and missing binaries are built
+in parallel.
+"""
+
+import concurrent.futures
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# mirrors workload/matmul/Makefile, which is only used for manual builds; the
+# RISC-V compiler path is set here
+GEM5_COMPILER = "riscv64-unknown-linux-gnu-g++"
+NATIVE_COMPILER = "g++"
+COMMON_FLAGS = ("-static", "-O3")
+GEM5_FLAGS = ("-I../include", "-DGEM5", "-L../lib/riscv", "-lm5")
+ASM_FLAGS = ("-S", "-fverbose-asm")
+THREAD_FLAGS = ("-pthread",)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+# kernel variants that take a block size as their second argument
+BLOCKED_VARIANTS = ("ij", "ik", "kj")
+# kernel variants that split the rows over as many threads as their second
+# argument, and run as one process on all cores
+THREADED_VARIANTS = ("par_ikj",)
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkloadSpec:
+    """Parameters that identify a single workload binary."""
+
+    # loop order / kernel, e.g. "ijk", "ikj" or a blocked variant such as
+    # "kj"; selects the -D<VARIANT> macro
+    variant: str
+    # "gem5" links against libm5 with the RISC-V cross compiler, "native"
+    # uses the host compiler
+    target: str = "gem5"
+    # emit annotated assembly instead of a binary
+    asm: bool = False
+    # additional compiler flags, e.g. ("-DSOME_OPTION",)
+    extra_flags: tuple[str, ...] = ()
+
+    @property
+    def binary_name(self) -> str:
+        name = f"mm-{self.variant}-{self.target}"
+        if self.asm:
+            name += "-asm"
+        return name
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler: str) -> str:
+    """Return the first line of `compiler --version`."""
+    result = subprocess.run(
+        [compiler, "--version"], capture_output=True, text=True, check=True
+    )
+    return result.stdout.splitlines()[0]
+
+
+class WorkloadBuilder:
+    """Builds and caches matmul workload binaries."""
+
+    def __init__(
+        self,
+        source_dir: str,
+        cache_dir: str,
+        gem5_compiler: str = GEM5_COMPILER,
+        native_compiler: str = NATIVE_COMPILER,
+        max_workers: int | None = None,
+    ):
+        """
+        Args:
+            source_dir (str): The directory containing mm.cpp and its headers.
+            cache_dir (str): The directory the built binaries are cached in.
+            gem5_compiler (str): The RISC-V cross compiler for gem5 binaries.
+            native_compiler (str): The host compiler for native binaries.
+            max_workers (int | None): Maximum number of parallel builds,
+                defaults to the number of CPUs.
+        """
+        self._source_dir = Path(source_dir).resolve()
+        self._cache_dir = Path(cache_dir).resolve()
+        self._compilers = {"gem5": gem5_compiler, "native": native_compiler}
+        self._max_workers = max_workers or os.cpu_count()
+
+    def compiler(self, spec: WorkloadSpec) -> str:
+        try:
+            return self._compilers[spec.target]
+        except KeyError:
+            raise ValueError(f"Invalid workload target: {spec.target}")
+
+    def compile_command(self, spec: WorkloadSpec, output: Path) -> list[str]:
+        """The compiler invocation for a workload, run from the source dir."""
+        command = [
+            self.compiler(spec),
+            "mm.cpp",
+            "-o",
+            output.as_posix(),
+            *COMMON_FLAGS,
+            f"-D{spec.variant.upper()}",
+        ]
+        if spec.variant in THREADED_VARIANTS:
+            command += THREAD_FLAGS
+        if spec.target == "gem5":
+            command += GEM5_FLAGS
+        if spec.asm:
+            command += ASM_FLAGS
+        command += spec.extra_flags
+        return command
+
+    def source_hash(self) -> str:
+        """Hash of mm.cpp and every header in the source directory."""
+        digest = hashlib.sha256()
+        for source in sorted(self._source_dir.glob("*.h")) + [
+            self._source_dir / "mm.cpp"
+        ]:
+            digest.update(source.name.encode())
+            digest.update(source.read_bytes())
+        return digest.hexdigest()
+
+    def build_key(self, spec: WorkloadSpec, source_hash: str | None = None) -> str:
+        """The cache key of a workload binary."""
+        key = {
+            "spec": dataclasses.asdict(spec),
+            "command": self.compile_command(spec, Path(spec.binary_name)),
+            "compiler_version": compiler_version(self.compiler(spec)),
+            "source_hash": source_hash or self.source_hash(),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def binary_path(self, spec: WorkloadSpec, source_hash: str | None = None) -> Path:
+        """Where the binary of a workload is (or would be) cached."""
+        key = self.build_key(spec, source_hash)
+        return self._cache_dir / key[:16] / spec.binary_name
+
+    def _build(self, spec: WorkloadSpec, binary_path: Path, source_hash: str):
+        """Build a single binary into its cache slot."""
+        binary_path.parent.parent.mkdir(parents=True, exist_ok=True)
+        # build into a scratch directory and move it into place afterwards so
+        # an interrupted build never leaves a half-written binary behind
+        scratch_dir = Path(tempfile.mkdtemp(dir=binary_path.parent.parent))
+        try:
+            output = scratch_dir / spec.binary_name
+            subprocess.run(
+                self.compile_command(spec, output),
+                cwd=self._source_dir,
+                check=True,
+            )
+            manifest = {
+                "spec": dataclasses.asdict(spec),
+                "compiler": self.compiler(spec),
+                "compiler_version": compiler_version(self.compiler(spec)),
+                "source_hash": source_hash,
+            }
+            with open(scratch_dir / MANIFEST_FILE_NAME, "w") as f:
+                json.dump(manifest, f, indent=4)
+            try:
+                scratch_dir.rename(binary_path.parent)
+            except OSError:
+                # another builder filled the slot concurrently
+                if not binary_path.exists():
+                    raise
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def build_all(self, specs: list[WorkloadSpec]) -> dict[WorkloadSpec, Path]:
+        """Return the binaries of all workloads, building missing ones in parallel.
+
+        Args:
+            specs (list[WorkloadSpec]): The requested workloads.
+
+        Returns:
+            dict[WorkloadSpec, Path]: The binary path of every requested workload.
+        """
+        source_hash = self.source_hash()
+        paths = {spec: self.binary_path(spec, source_hash) for spec in set(specs)}
+        missing = [spec for spec, path in paths.items() if not path.exists()]
+
+        with concurrent.futures.ThreadPoolExecutor(self._max_workers) as executor:
+            builds = [
+                executor.submit(self._build, spec, paths[spec], source_hash)
+                for spec in missing
+            ]
+            for build in concurrent.futures.as_completed(builds):
+                # re-raise build failures
+                build.result()
+
+        return paths
+
+    def get(self, spec: WorkloadSpec) -> Path:
+        """Return the binary of a single workload, building it if necessary."""
+        return self.build_all([spec])[spec]
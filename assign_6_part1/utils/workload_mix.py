@@ -0,0 +1,87 @@
+"""Multiprogrammed workload mixes for the hybrid CPU.
+
+A mix assigns a workload to every core type, so big and little cores can run
+different jobs and contend for the shared L3. Mixes are referred to by name
+from `ExperimentMetaParameter.workload_mix`; the "uniform" mix runs the
+experiment's own workload (`kernel_variant`, `matsize`, `block_size`) on every
+core.
+"""
+
+import dataclasses
+
+UNIFORM_MIX = "uniform"
+
+
+@dataclasses.dataclass(frozen=True)
+class CoreWorkload:
+    """The matmul workload run by a single core."""
+
+    kernel_variant: str
+    matsize: int
+    # tile size of the blocked variants
+    block_size: int = 0
+    # seed of the random input matrices
+    seed: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkloadMix:
+    """The workload of every core type."""
+
+    big_core: CoreWorkload
+    little_core: CoreWorkload
+
+    @property
+    def kernel_variants(self) -> set[str]:
+        return {self.big_core.kernel_variant, self.little_core.kernel_variant}
+
+
+# named mixes that can be swept over
+MIX_TABLE = {
+    # big cores on a large, cache-friendly job, little cores on a small one
+    "big_ikj_little_ijk": WorkloadMix(
+        big_core=CoreWorkload("ikj", 128),
+        little_core=CoreWorkload("ijk", 32),
+    ),
+    # big cores on a large tiled job, little cores streaming through a
+    # medium-sized one
+    "big_kj_little_ijk": WorkloadMix(
+        big_core=CoreWorkload("kj", 128, 16),
+        little_core=CoreWorkload("ijk", 64),
+    ),
+    # both core types on large jobs, maximising L3 contention
+    "all_ikj_large": WorkloadMix(
+        big_core=CoreWorkload("ikj", 128),
+        little_core=CoreWorkload("ikj", 128),
+    ),
+}
+
+
+def core_workloads(meta_params) -> WorkloadMix:
+    """Resolve the workload of every core type of an experiment.
+
+    Args:
+        meta_params: An `ExperimentMetaParameter`, or a row of the meta
+            parameter table with the same fields.
+
+    Returns:
+        WorkloadMix: The workload of the big and the little cores.
+    """
+    seed = int(meta_params.seed)
+    if meta_params.workload_mix == UNIFORM_MIX:
+        workload = CoreWorkload(
+            kernel_variant=meta_params.kernel_variant,
+            matsize=int(meta_params.matsize),
+            block_size=int(meta_params.block_size),
+            seed=seed,
+        )
+        return WorkloadMix(big_core=workload, little_core=workload)
+    try:
+        mix = MIX_TABLE[meta_params.workload_mix]
+    except KeyError:
+        raise ValueError(f"Invalid workload mix: {meta_params.workload_mix}")
+    # the mixes fix the workloads, the inputs still follow the experiment
+    return WorkloadMix(
+        big_core=dataclasses.replace(mix.big_core, seed=seed),
+        little_core=dataclasses.replace(mix.little_core, seed=seed),
+    )
@@ -0,0 +1,26 @@
+
+#ifndef __MATMUL_BLOCK_IJ_MULTIPLY_H__
+#define __MATMUL_BLOCK_IJ_MULTIPLY_H__
+
+// Tiles the i and j loops, so a block_size x block_size tile of C stays in
+// the cache while the full k loop runs over it.
+void multiply(double** A, double** B, double** C, int size, int block_size)
+{
+    for (int ii = 0; ii < size; ii += block_size) {
+        int i_end = ii + block_size < size ? ii + block_size : size;
+        for (int jj = 0; jj < size; jj += block_size) {
+            int j_end = jj + block_size < size ? jj + block_size : size;
+            for (int i = ii; i < i_end; i++) {
+                for (int j = jj; j < j_end; j++) {
+                    double sum = C[i][j];
+                    for (int k = 0; k < size; k++) {
+                        sum += A[i][k] * B[k][j];
+                    }
+                    C[i][j] = sum;
+                }
+            }
+        }
+    }
+}
+
+#endif // __MATMUL_BLOCK_IJ_MULTIPLY_H__
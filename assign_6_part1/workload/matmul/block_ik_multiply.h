@@ -0,0 +1,25 @@
+
+#ifndef __MATMUL_BLOCK_IK_MULTIPLY_H__
+#define __MATMUL_BLOCK_IK_MULTIPLY_H__
+
+// Tiles the i and k loops, so a block_size x block_size tile of A is reused
+// while the rows of B it touches are streamed through.
+void multiply(double** A, double** B, double** C, int size, int block_size)
+{
+    for (int ii = 0; ii < size; ii += block_size) {
+        int i_end = ii + block_size < size ? ii + block_size : size;
+        for (int kk = 0; kk < size; kk += block_size) {
+            int k_end = kk + block_size < size ? kk + block_size : size;
+            for (int i = ii; i < i_end; i++) {
+                for (int k = kk; k < k_end; k++) {
+                    double r = A[i][k];
+                    for (int j = 0; j < size; j++) {
+                        C[i][j] += r * B[k][j];
+                    }
+                }
+            }
+        }
+    }
+}
+
+#endif // __MATMUL_BLOCK_IK_MULTIPLY_H__
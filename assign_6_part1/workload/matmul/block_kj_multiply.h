@@ -0,0 +1,25 @@
+
+#ifndef __MATMUL_BLOCK_KJ_MULTIPLY_H__
+#define __MATMUL_BLOCK_KJ_MULTIPLY_H__
+
+// Tiles the k and j loops, so a block_size x block_size tile of B stays in
+// the cache while every row of A and C sweeps over it.
+void multiply(double** A, double** B, double** C, int size, int block_size)
+{
+    for (int kk = 0; kk < size; kk += block_size) {
+        int k_end = kk + block_size < size ? kk + block_size : size;
+        for (int jj = 0; jj < size; jj += block_size) {
+            int j_end = jj + block_size < size ? jj + block_size : size;
+            for (int i = 0; i < size; i++) {
+                for (int k = kk; k < k_end; k++) {
+                    double r = A[i][k];
+                    for (int j = jj; j < j_end; j++) {
+                        C[i][j] += r * B[k][j];
+                    }
+                }
+            }
+        }
+    }
+}
+
+#endif // __MATMUL_BLOCK_KJ_MULTIPLY_H__
@@ -1,65 +1,92 @@
 import argparse
-from numpy.random import uniform
+from pathlib import Path
+
+import numpy as np
+
+# rows are formatted and written in chunks of about this many elements
+CHUNK_ELEMENTS = 1 << 20
+
+# every element in [0, 1] rounded to two decimals prints as exactly four
+# characters ("0.00" to "1.00"), followed by a ", " separator
+ELEMENT_WIDTH = 6
+ELEMENT_TABLE = np.frombuffer(
+    "".join(f"{value / 100:.2f}, " for value in range(101)).encode(), dtype=np.uint8
+).reshape(101, ELEMENT_WIDTH)
+
+HEADER_PROLOGUE = """#ifndef __MATMUL_MATRIX_H__
+#define __MATMUL_MATRIX_H__
+
+#define SIZE {mat_size}
+#define NUM_ELEMENTS {num_elements}
+double C [NUM_ELEMENTS] = {{0}};
+
+"""
+
+HEADER_EPILOGUE = "#endif // __MATMUL_MATRIX_H__\n"
 
 
 def get_inputs():
     argparser = argparse.ArgumentParser()
     argparser.add_argument("mat_size", type=int)
+    argparser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the numpy generator. mm.cpp generates its own inputs from "
+        "its seed argument with a different generator, so the two are unrelated.",
+    )
+    argparser.add_argument(
+        "--output_dir", type=str, default=".", help="Where to write matrix.h."
+    )
     args = argparser.parse_args()
-    return args.mat_size
+    return args
+
+
+def write_matrix(header_file, name, matrix):
+    """Write a matrix with elements in [0, 1] as a C initialiser list.
+
+    Every matrix row becomes one line. The text of whole blocks of rows is
+    built with a single table lookup on the rounded elements and written in
+    one go, so no Python code runs per element.
+    """
+    num_rows, num_cols = matrix.shape
+    rows_per_chunk = max(1, CHUNK_ELEMENTS // num_cols)
+
+    header_file.write(f"double {name} [NUM_ELEMENTS] = {{ \n".encode())
+    for start in range(0, num_rows, rows_per_chunk):
+        hundredths = np.rint(matrix[start : start + rows_per_chunk] * 100).astype(
+            np.intp
+        )
+        text = np.empty(
+            (hundredths.shape[0], num_cols * ELEMENT_WIDTH + 1), dtype=np.uint8
+        )
+        text[:, :-1] = ELEMENT_TABLE[hundredths].reshape(hundredths.shape[0], -1)
+        text[:, -1] = ord("\n")
+        header_file.write(text.tobytes())
+    header_file.write(b"}; \n")
+    header_file.write(b"\n")
+
+
+def write_text_matrices(output_dir, mat_size, matrix_a, matrix_b):
+    """Write matrix.h with A and B embedded as initialiser lists."""
+    with open(output_dir / "matrix.h", "wb") as header_file:
+        header_file.write(
+            HEADER_PROLOGUE.format(
+                mat_size=mat_size, num_elements=mat_size * mat_size
+            ).encode()
+        )
+        write_matrix(header_file, "A", matrix_a)
+        write_matrix(header_file, "B", matrix_b)
+        header_file.write(HEADER_EPILOGUE.encode())
 
 
 if __name__ == "__main__":
-    mat_size = get_inputs()
-    matrix_a = uniform(0.0, 1.0, mat_size * mat_size)
-    matrix_b = uniform(0.0, 1.0, mat_size * mat_size)
-
-    lines = ["double A [NUM_ELEMENTS] = { \n"]
-    line = ""
-    for element in matrix_a:
-        printable = round(element, 2)
-        if line == "":
-            line = f"{printable}"
-        else:
-            line += f", {printable}"
-        if len(line) > 80:
-            line += ", \n"
-            lines.append(line)
-            line = ""
-    if line != "":
-        line += " \n"
-        lines.append(line)
-    lines.append("}; \n")
-    lines.append("\n")
-
-    lines.append("double B [NUM_ELEMENTS] = { \n")
-    line = ""
-    for element in matrix_b:
-        printable = round(element, 2)
-        if line == "":
-            line = f"{printable}"
-        else:
-            line += f", {printable}"
-        if len(line) > 80:
-            line += ", \n"
-            lines.append(line)
-            line = ""
-    if line != "":
-        line += " \n"
-        lines.append(line)
-    lines.append("}; \n")
-    lines.append("\n")
-    lines.append("#endif // __MATMUL_MATRIX_H__\n")
-
-    lines = [
-        "#ifndef __MATMUL_MATRIX_H__\n",
-        "#define __MATMUL_MATRIX_H__\n",
-        "\n",
-        f"#define SIZE {mat_size}\n",
-        f"#define NUM_ELEMENTS {mat_size*mat_size}",
-        "\n",
-        f"double C [NUM_ELEMENTS] = {{0}};\n",
-        "\n",
-    ] + lines
-    with open("matrix.h", "w") as header_file:
-        header_file.writelines(lines)
+    args = get_inputs()
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    rng = np.random.default_rng(args.seed)
+    matrix_a = rng.uniform(0.0, 1.0, (args.mat_size, args.mat_size))
+    matrix_b = rng.uniform(0.0, 1.0, (args.mat_size, args.mat_size))
+
+    write_text_matrices(output_dir, args.mat_size, matrix_a, matrix_b)
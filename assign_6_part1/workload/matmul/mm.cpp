@@ -1,4 +1,5 @@
 #include <chrono>
+#include <cstdlib>
 #include <iostream>
 #include <random>
 
@@ -10,7 +11,7 @@
 #include "ikj_multiply.h"
 #endif
 
-/* #ifdef IJ
+#ifdef IJ
 #include "block_ij_multiply.h"
 #endif
 
@@ -20,42 +21,34 @@
 
 #ifdef KJ
 #include "block_kj_multiply.h"
-#endif */
-
-#ifdef GEM5
-#include "gem5/m5ops.h"
 #endif
 
-int main(int argc, char** argv)
-{
+#ifdef PAR_IKJ
+#include "par_ikj_multiply.h"
+#endif
 
-#if defined(IJK) || defined(IKJ)
-    int matrix_size;
-    if (argc != 2) {
-        std::cout << "Invalid count for command line inputs. Please refer to "
-        "the usage example below for more information." << std::endl;
-        std::cout << "[matrix_size: int]" << std::endl;
-    } else {
-        matrix_size = std::atoi(argv[1]);
-    }
+#ifdef GEM5
+#include "gem5/m5ops.h"
 #endif
 
 #if defined(IJ) || defined(IK) || defined(KJ)
-    int matrix_size;
-    int block_size;
-    if (argc != 3) {
-        std::cout << "Invalid count for command line inputs. Please refer to "
-        "the usage example below for more information." << std::endl;
-        std::cout << "[matrix_size: int] [block_size: int]" << std::endl;
-    } else {
-        matrix_size = std::atoi(argv[1]);
-        block_size = std::atoi(argv[2]);
-    }
+// every run takes a matrix size, a block size and a seed
+#define ARGS_PER_RUN 3
+#define USAGE "[matrix_size: int] [block_size: int] [seed: int] ..."
+#elif defined(PAR_IKJ)
+// every run takes a matrix size, a thread count and a seed
+#define ARGS_PER_RUN 3
+#define USAGE "[matrix_size: int] [num_threads: int] [seed: int] ..."
+#else
+#define ARGS_PER_RUN 2
+#define USAGE "[matrix_size: int] [seed: int] ..."
 #endif
 
-#if defined(IJK) || defined(IKJ) || defined(IJ) || defined(IK) || defined(KJ)
-    std::random_device rd;
-    std::mt19937 gen(rd());
+// Multiplies two random matrices, enclosed in a gem5 work item. The matrices
+// only depend on the size and the seed, so identical runs are bit-identical.
+void run(int run_index, int matrix_size, int block_size, int num_threads, unsigned long seed)
+{
+    std::mt19937_64 gen(seed);
     std::uniform_real_distribution<> dis(0, 1);
 
     double *dataA = new double [matrix_size * matrix_size];
@@ -76,39 +69,67 @@ int main(int argc, char** argv)
             C[i][j] = 0;
         }
     }
-#endif
 
     std::cout << "Beginning matrix multiply ..." << std::endl;
     auto start = std::chrono::high_resolution_clock::now();
 
 #ifdef GEM5
-    m5_work_begin(0,0);
-#endif
-
-#if defined(IJK) || defined(IKJ)
-    multiply(A, B, C, matrix_size);
+    // the executor attributes the work items to runs by their work id
+    m5_work_begin(run_index, 0);
 #endif
 
 #if defined(IJ) || defined(IK) || defined(KJ)
     multiply(A, B, C, matrix_size, block_size);
+#elif defined(PAR_IKJ)
+    multiply(A, B, C, matrix_size, num_threads);
+#else
+    multiply(A, B, C, matrix_size);
 #endif
 
 #ifdef GEM5
-    m5_work_end(0,0);
+    m5_work_end(run_index, 0);
 #endif
 
     auto end = std::chrono::high_resolution_clock::now();
     std::cout << "Finished matrix multiply." << std::endl;
     std::cout << "Execution time: " << (double) (end - start).count() / 1e6 << " ms" << std::endl;
 
-#if defined(IJK) || defined(IKJ) || defined(IJ) || defined(IK) || defined(KJ)
     delete[] A;
     delete[] B;
     delete[] C;
     delete[] dataA;
     delete[] dataB;
     delete[] dataC;
+}
+
+int main(int argc, char** argv)
+{
+    // the arguments of several runs can be given back to back, they are run
+    // one after another as separate work items
+    if (argc < 1 + ARGS_PER_RUN || (argc - 1) % ARGS_PER_RUN != 0) {
+        std::cout << "Invalid count for command line inputs. Please refer to "
+        "the usage example below for more information." << std::endl;
+        std::cout << USAGE << std::endl;
+        return 1;
+    }
+
+    for (int run_index = 0; run_index < (argc - 1) / ARGS_PER_RUN; run_index++) {
+        char** run_args = &argv[1 + run_index * ARGS_PER_RUN];
+        int matrix_size = std::atoi(run_args[0]);
+        int block_size = matrix_size;
+        int num_threads = 1;
+#if defined(PAR_IKJ)
+        num_threads = std::atoi(run_args[1]);
+#elif ARGS_PER_RUN == 3
+        block_size = std::atoi(run_args[1]);
+        // a non-positive block size means a single tile
+        if (block_size <= 0) {
+            block_size = matrix_size;
+        }
 #endif
+        unsigned long seed = std::strtoul(run_args[ARGS_PER_RUN - 1], NULL, 10);
+        run(run_index, matrix_size, block_size, num_threads, seed);
+    }
 
     return 0;
 }
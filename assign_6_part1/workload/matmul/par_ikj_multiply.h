@@ -0,0 +1,67 @@
+#ifndef __MATMUL_PAR_IKJ_MULTIPLY_H__
+#define __MATMUL_PAR_IKJ_MULTIPLY_H__
+
+#include <pthread.h>
+
+// The rows of C computed by a single thread.
+struct RowRange
+{
+    double** A;
+    double** B;
+    double** C;
+    int size;
+    int row_begin;
+    int row_end;
+};
+
+void* multiply_rows(void* arg)
+{
+    RowRange* range = (RowRange*) arg;
+    for (int i = range->row_begin; i < range->row_end; i++) {
+        for (int k = 0; k < range->size; k++) {
+            double r = range->A[i][k];
+            for (int j = 0; j < range->size; j++) {
+                range->C[i][j] += r * range->B[k][j];
+            }
+        }
+    }
+    return NULL;
+}
+
+// Splits the rows of C into num_threads contiguous ranges and computes them
+// with the ikj loop order, one thread per range. The calling thread computes
+// the first range itself, so num_threads cores are busy. All threads share
+// A and B, so the rows of B are reused through the shared caches.
+void multiply(double** A, double** B, double** C, int size, int num_threads)
+{
+    if (num_threads < 1) {
+        num_threads = 1;
+    }
+    if (num_threads > size) {
+        num_threads = size;
+    }
+
+    RowRange* ranges = new RowRange [num_threads];
+    pthread_t* threads = new pthread_t [num_threads];
+    for (int t = 0; t < num_threads; t++) {
+        ranges[t].A = A;
+        ranges[t].B = B;
+        ranges[t].C = C;
+        ranges[t].size = size;
+        ranges[t].row_begin = (long) size * t / num_threads;
+        ranges[t].row_end = (long) size * (t + 1) / num_threads;
+    }
+
+    for (int t = 1; t < num_threads; t++) {
+        pthread_create(&threads[t], NULL, multiply_rows, &ranges[t]);
+    }
+    multiply_rows(&ranges[0]);
+    for (int t = 1; t < num_threads; t++) {
+        pthread_join(threads[t], NULL);
+    }
+
+    delete[] ranges;
+    delete[] threads;
+}
+
+#endif // __MATMUL_PAR_IKJ_MULTIPLY_H__
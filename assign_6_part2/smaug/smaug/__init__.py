@@ -17,6 +17,7 @@ from smaug.python.ops import custom_operators
 from smaug.python.graph import Graph
 from smaug.python.tensor import Tensor
 from smaug.python.node import Node
+from smaug.python.passes import PassManager
 
 def _autodoc_for_module():
   """Ensures that the top-level SMAUG module gets an autodoc link."""
@@ -13,6 +13,7 @@
 #include "smaug/core/network.h"
 #include "smaug/core/network_builder.h"
 #include "smaug/core/node.pb.h"
+#include "smaug/core/raw_params.h"
 #include "smaug/core/tensor.h"
 #include "smaug/core/tensor.pb.h"
 #include "smaug/core/types.pb.h"
@@ -103,6 +104,7 @@ ActivationInfo getActivationInfo(const ActivationParams& params) {
 template <typename Backend>
 static void createAndAddOperator(const NodeProto& node,
                                  const TensorDataArray& tensorDataArray,
+                                 const RawParamsFile* rawParams,
                                  HostMemoryAccessPolicy memPolicy,
                                  Network* network,
                                  Workspace* workspace) {
@@ -112,17 +114,37 @@ static void createAndAddOperator(const NodeProto& node,
     dout(0) << "Adding " << name << " (" << OpType_Name(type) << ").\n";
 
     if (type == OpType::Data) {
-        // Find the tensor data from the tensor data array.
-        TensorData tensorData;
-        for (int i = 0; i < tensorDataArray.data_array_size(); i++) {
-            if (tensorDataArray.data_array(i).name() ==
-                node.input_tensors(0).name()) {
-                tensorData = tensorDataArray.data_array(i);
-                break;
+        Tensor* inputTensor;
+        if (rawParams != nullptr) {
+            // Use the tensor data in the mapped raw parameters file in place.
+            const TensorProto& tensorProto = node.input_tensors(0);
+            const RawTensorEntry* entry = rawParams->find(tensorProto.name());
+            if (entry == nullptr) {
+                cout << "No data for tensor " << tensorProto.name()
+                     << " in the raw parameters file.\n";
+                exit(1);
             }
+            inputTensor = new Tensor(tensorProto, rawParams->data(*entry));
+            if (entry->data_type() != tensorProto.data_type() ||
+                entry->size() != (uint64_t)inputTensor->getShape().storageSize() *
+                                         inputTensor->getDataTypeSize()) {
+                cout << "The raw data of tensor " << tensorProto.name()
+                     << " does not match its shape and data type.\n";
+                exit(1);
+            }
+        } else {
+            // Find the tensor data from the tensor data array.
+            TensorData tensorData;
+            for (int i = 0; i < tensorDataArray.data_array_size(); i++) {
+                if (tensorDataArray.data_array(i).name() ==
+                    node.input_tensors(0).name()) {
+                    tensorData = tensorDataArray.data_array(i);
+                    break;
+                }
+            }
+            inputTensor = new Tensor(node.input_tensors(0), tensorData);
         }
-        auto inputTensor = workspace->addTensor(
-                new Tensor(node.input_tensors(0), tensorData));
+        workspace->addTensor(inputTensor);
         auto inputTensorOp = Backend::createDataOp(name, workspace);
         inputTensorOp->setData(inputTensor);
         network->addOperator(inputTensorOp);
@@ -325,6 +347,7 @@ static void createAndAddOperator(const NodeProto& node,
 template <typename Backend>
 static Network* createNetworkFromProto(const GraphProto& graphProto,
                                        const TensorDataArray& tensorDataArray,
+                                       const RawParamsFile* rawParams,
                                        SamplingInfo& sampling,
                                        Workspace* workspace) {
     Network* network = new Network(graphProto.name());
@@ -333,6 +356,7 @@ static Network* createNetworkFromProto(const GraphProto& graphProto,
         const NodeProto& node = graphProto.nodes(i);
         createAndAddOperator<Backend>(node,
                                       tensorDataArray,
+                                      rawParams,
                                       graphProto.mem_policy(),
                                       network,
                                       workspace);
@@ -391,15 +415,22 @@ Network* smaug::buildNetwork(const std::string& modelTopo,
         cout << "Failed to parse the network topology file!" << endl;
         exit(1);
     }
-    // Parse the network parameters from the protobuf binary file.
+    // Map the network parameters if they are a raw parameters file, or parse
+    // them from the protobuf binary file otherwise.
     TensorDataArray tensorDataArray;
-    fstream modelParamsFile(modelParams, ios::in | ios::binary);
-    if (!modelParamsFile) {
-        cout << modelParams << ": network parameters file not found." << endl;
-        exit(1);
-    } else if (!tensorDataArray.ParseFromIstream(&modelParamsFile)) {
-        cout << "Failed to parse the network parameters file.\n";
-        exit(1);
+    std::unique_ptr<RawParamsFile> rawParams;
+    if (RawParamsFile::isRawParamsFile(modelParams)) {
+        rawParams.reset(new RawParamsFile(modelParams));
+    } else {
+        fstream modelParamsFile(modelParams, ios::in | ios::binary);
+        if (!modelParamsFile) {
+            cout << modelParams << ": network parameters file not found."
+                 << endl;
+            exit(1);
+        } else if (!tensorDataArray.ParseFromIstream(&modelParamsFile)) {
+            cout << "Failed to parse the network parameters file.\n";
+            exit(1);
+        }
     }
 
     cout << "======================================================\n";
@@ -408,10 +439,10 @@ Network* smaug::buildNetwork(const std::string& modelTopo,
     Network* network = nullptr;
     if (graph.backend() == ReferenceBackend::Name) {
         network = createNetworkFromProto<ReferenceBackend>(
-                graph, tensorDataArray, sampling, workspace);
+                graph, tensorDataArray, rawParams.get(), sampling, workspace);
     } else if (graph.backend() == SmvBackend::Name) {
         network = createNetworkFromProto<SmvBackend>(
-                graph, tensorDataArray, sampling, workspace);
+                graph, tensorDataArray, rawParams.get(), sampling, workspace);
     } else {
         assert(false && "Unknown backend!");
     }
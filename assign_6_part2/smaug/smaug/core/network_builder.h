@@ -16,7 +16,8 @@ namespace smaug {
  *
  * @param modelTopoFile The path to the model topology protobuf.
  * @param modelParamsFile The path to the model parameters protobuf, which
- * contains values for all tensors in the network (weights *and* inputs).
+ * contains values for all tensors in the network (weights *and* inputs), or to
+ * a raw parameters file with the same contents, which is memory-mapped.
  * @param sampling Level of simulation sampling to apply to applicable kernels.
  * @param workspace Pointer to the global Workspace holding all tensors and
  * operators.
@@ -0,0 +1,96 @@
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+
+#include "smaug/core/raw_params.h"
+
+namespace smaug {
+
+namespace {
+
+const char kRawParamsMagic[] = "SMAUGRAW";
+const size_t kMagicSize = sizeof(kRawParamsMagic) - 1;
+// The magic, followed by the size of the index as a little-endian uint64.
+const size_t kHeaderSize = kMagicSize + sizeof(uint64_t);
+
+uint64_t readLittleEndian64(const char* bytes) {
+    uint64_t value = 0;
+    for (int i = 7; i >= 0; i--)
+        value = (value << 8) | static_cast<unsigned char>(bytes[i]);
+    return value;
+}
+
+size_t alignUp(size_t value, size_t alignment) {
+    return (value + alignment - 1) / alignment * alignment;
+}
+
+}  // namespace
+
+bool RawParamsFile::isRawParamsFile(const std::string& path) {
+    std::ifstream file(path, std::ios::in | std::ios::binary);
+    char magic[kMagicSize];
+    if (!file.read(magic, kMagicSize))
+        return false;
+    return memcmp(magic, kRawParamsMagic, kMagicSize) == 0;
+}
+
+RawParamsFile::RawParamsFile(const std::string& path) {
+    int fd = open(path.c_str(), O_RDONLY);
+    if (fd < 0) {
+        std::cout << path << ": network parameters file not found.\n";
+        exit(1);
+    }
+    struct stat fileStat;
+    if (fstat(fd, &fileStat) != 0 || fileStat.st_size < (off_t)kHeaderSize) {
+        std::cout << path << ": raw parameters file is truncated.\n";
+        exit(1);
+    }
+    fileSize = fileStat.st_size;
+    void* addr = mmap(
+            nullptr, fileSize, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (addr == MAP_FAILED) {
+        std::cout << path << ": failed to map the raw parameters file.\n";
+        exit(1);
+    }
+    size_t size = fileSize;
+    mapping = std::shared_ptr<char>(
+            static_cast<char*>(addr), [size](char* p) { munmap(p, size); });
+
+    uint64_t indexSize = readLittleEndian64(mapping.get() + kMagicSize);
+    RawTensorIndex index;
+    if (kHeaderSize + indexSize > fileSize ||
+        !index.ParseFromArray(mapping.get() + kHeaderSize, indexSize) ||
+        index.alignment() == 0) {
+        std::cout << "Failed to parse the raw parameters file index.\n";
+        exit(1);
+    }
+    dataStart = alignUp(kHeaderSize + indexSize, index.alignment());
+    for (const RawTensorEntry& entry : index.entries()) {
+        if (dataStart + entry.offset() + entry.size() > fileSize) {
+            std::cout << "Tensor " << entry.name()
+                      << " exceeds the raw parameters file.\n";
+            exit(1);
+        }
+        entries[entry.name()] = entry;
+    }
+}
+
+const RawTensorEntry* RawParamsFile::find(const std::string& name) const {
+    auto it = entries.find(name);
+    return it == entries.end() ? nullptr : &it->second;
+}
+
+std::shared_ptr<void> RawParamsFile::data(const RawTensorEntry& entry) const {
+    // Aliasing constructor: points into the mapping and keeps it alive.
+    return std::shared_ptr<void>(
+            mapping, mapping.get() + dataStart + entry.offset());
+}
+
+}  // namespace smaug
@@ -0,0 +1,54 @@
+/**
+ * \file raw_params.h
+ * \brief Memory-mapped raw parameter files.
+ */
+
+#ifndef _CORE_RAW_PARAMS_H_
+#define _CORE_RAW_PARAMS_H_
+
+#include <memory>
+#include <string>
+#include <unordered_map>
+
+#include "smaug/core/tensor.pb.h"
+
+namespace smaug {
+
+/**
+ * RawParamsFile gives access to the tensor data stored in a raw parameter
+ * file, written by smaug/python/raw_params.py.
+ *
+ * The file is memory-mapped as a whole and only its small RawTensorIndex is
+ * parsed, so the tensor data is never copied or parsed. The mapping is
+ * private, so writes to the tensor data never reach the file, and it is kept
+ * alive for as long as any tensor still refers to its data.
+ */
+class RawParamsFile {
+   public:
+    /** Returns true if the file starts with the raw parameter file magic. */
+    static bool isRawParamsFile(const std::string& path);
+
+    /** Maps the given raw parameter file and parses its index. */
+    RawParamsFile(const std::string& path);
+
+    /** Returns the index entry of a tensor, or nullptr if there is none. */
+    const RawTensorEntry* find(const std::string& name) const;
+
+    /**
+     * Returns a pointer to the data of a tensor, sharing the ownership of the
+     * mapping.
+     */
+    std::shared_ptr<void> data(const RawTensorEntry& entry) const;
+
+   protected:
+    /** The whole mapped file. */
+    std::shared_ptr<char> mapping;
+    size_t fileSize;
+    /** Offset of the data section from the start of the file. */
+    size_t dataStart;
+    std::unordered_map<std::string, RawTensorEntry> entries;
+};
+
+}  // namespace smaug
+
+#endif
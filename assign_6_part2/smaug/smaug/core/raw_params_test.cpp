@@ -0,0 +1,137 @@
+#include <cstdint>
+#include <memory>
+
+#include "catch.hpp"
+#include "smaug/core/raw_params.h"
+#include "smaug/core/smaug_test.h"
+#include "smaug/core/tensor.h"
+
+using namespace smaug;
+
+// raw_params.bin is written by smaug/python/raw_params.py, from these tensors:
+//   float_data: float32 [[0, 1, 2], [3, 4, 5]], NC layout, no alignment.
+//   fp16_data: float16 [[1.1, 2.2, 3.3], [4.4, 5.5, 6.6]], NC layout,
+//              aligned to 8 elements, so stored as [2, 8].
+//   int_data: int32 [-1, 2, -3], N layout, no alignment.
+// Every tensor starts at a 64-byte aligned offset into the data section.
+const std::string kRawParamsPath = "smaug/python/test_inputs/raw_params.bin";
+const size_t kRawParamsAlignment = 64;
+
+TensorProto createTensorProto(const std::string& name,
+                              DataType dataType,
+                              DataLayout layout,
+                              const std::vector<int>& dims,
+                              int alignment) {
+    TensorProto tensorProto;
+    tensorProto.set_name(name);
+    tensorProto.set_data_type(dataType);
+    tensorProto.set_data_format(Uncompressed);
+    TensorShapeProto* shapeProto = tensorProto.mutable_shape();
+    for (int dim : dims)
+        shapeProto->add_dims(dim);
+    shapeProto->set_layout(layout);
+    shapeProto->set_alignment(alignment);
+    return tensorProto;
+}
+
+// Creates a Tensor that uses the data of the raw parameter file in place, as
+// buildNetwork does for data ops.
+Tensor* createRawTensor(const RawParamsFile& rawParams,
+                        const TensorProto& tensorProto,
+                        Workspace* workspace) {
+    const RawTensorEntry* entry = rawParams.find(tensorProto.name());
+    REQUIRE(entry != nullptr);
+    Tensor* tensor = new Tensor(tensorProto, rawParams.data(*entry));
+    REQUIRE(entry->size() == (uint64_t)tensor->getShape().storageSize() *
+                                     tensor->getDataTypeSize());
+    workspace->addTensor(tensor);
+    return tensor;
+}
+
+TEST_CASE_METHOD(SmaugTest, "Raw parameter file index", "[rawparams]") {
+    REQUIRE(RawParamsFile::isRawParamsFile(kRawParamsPath));
+    REQUIRE(!RawParamsFile::isRawParamsFile(
+            "smaug/python/test_inputs/fp16_even_params.pb"));
+
+    RawParamsFile rawParams(kRawParamsPath);
+    REQUIRE(rawParams.find("missing_data") == nullptr);
+
+    const RawTensorEntry* floatEntry = rawParams.find("float_data");
+    REQUIRE(floatEntry != nullptr);
+    REQUIRE(floatEntry->data_type() == Float32);
+    REQUIRE(floatEntry->offset() == 0);
+    REQUIRE(floatEntry->size() == 6 * sizeof(float));
+
+    // The padding of the last dimension is stored with the data.
+    const RawTensorEntry* fp16Entry = rawParams.find("fp16_data");
+    REQUIRE(fp16Entry != nullptr);
+    REQUIRE(fp16Entry->data_type() == Float16);
+    REQUIRE(fp16Entry->dims_size() == 2);
+    REQUIRE(fp16Entry->dims(0) == 2);
+    REQUIRE(fp16Entry->dims(1) == 8);
+    REQUIRE(fp16Entry->offset() == kRawParamsAlignment);
+    REQUIRE(fp16Entry->size() == 16 * sizeof(float16));
+
+    const RawTensorEntry* intEntry = rawParams.find("int_data");
+    REQUIRE(intEntry != nullptr);
+    REQUIRE(intEntry->data_type() == Int32);
+    REQUIRE(intEntry->offset() == 2 * kRawParamsAlignment);
+    REQUIRE(intEntry->size() == 3 * sizeof(int));
+}
+
+TEST_CASE_METHOD(SmaugTest, "Tensors backed by a raw parameter file",
+                 "[rawparams]") {
+    RawParamsFile rawParams(kRawParamsPath);
+    Tensor* floatTensor = createRawTensor(
+            rawParams,
+            createTensorProto("float_data", Float32, NC, { 2, 3 }, 0),
+            workspace());
+    Tensor* fp16Tensor = createRawTensor(
+            rawParams,
+            createTensorProto("fp16_data", Float16, NC, { 2, 3 }, 8),
+            workspace());
+    Tensor* intTensor = createRawTensor(
+            rawParams,
+            createTensorProto("int_data", Int32, N, { 3 }, 0),
+            workspace());
+
+    SECTION("The data is read in place") {
+        verifyOutputs<float>(floatTensor, { 0, 1, 2, 3, 4, 5 });
+        verifyOutputs<float16>(fp16Tensor,
+                               { fp16(1.1), fp16(2.2), fp16(3.3), fp16(4.4),
+                                 fp16(5.5), fp16(6.6) });
+        verifyOutputs<int>(intTensor, { -1, 2, -3 });
+    }
+
+    SECTION("The data of every tensor is aligned") {
+        for (const void* data :
+             { (const void*)floatTensor->data<float>(),
+               (const void*)fp16Tensor->data<float16>(),
+               (const void*)intTensor->data<int>() }) {
+            REQUIRE(reinterpret_cast<uintptr_t>(data) % kRawParamsAlignment ==
+                    0);
+        }
+    }
+
+    SECTION("Writes to the data do not reach the file") {
+        floatTensor->data<float>()[0] = 42;
+        verifyOutputs<float>(floatTensor, { 42, 1, 2, 3, 4, 5 });
+        // A new mapping of the file still has the original data.
+        RawParamsFile otherRawParams(kRawParamsPath);
+        std::shared_ptr<void> otherData =
+                otherRawParams.data(*otherRawParams.find("float_data"));
+        REQUIRE(static_cast<float*>(otherData.get())[0] == 0);
+    }
+}
+
+TEST_CASE_METHOD(SmaugTest, "Tensors keep the raw parameter file mapped",
+                 "[rawparams]") {
+    std::unique_ptr<RawParamsFile> rawParams(new RawParamsFile(kRawParamsPath));
+    Tensor* intTensor = createRawTensor(
+            *rawParams,
+            createTensorProto("int_data", Int32, N, { 3 }, 0),
+            workspace());
+    // The mapping is only unmapped once the tensor releases its data.
+    rawParams.reset();
+    verifyOutputs<int>(intTensor, { -1, 2, -3 });
+}
@@ -79,6 +79,26 @@ class TensorShape {
     int getAlignment() const { return alignment; }
     int getPadding(int index) const { return padding_[index]; }
 
+    /**
+     * Returns the storage strides of each dimension when this shape is
+     * broadcast to `target`. A dimension of size 1 that is larger in `target`
+     * gets a stride of 0, so the same element is read along it.
+     */
+    std::vector<int> getBroadcastStrides(const TensorShape& target) const {
+        assert(ndims() == target.ndims());
+        std::vector<int> strides(ndims(), 0);
+        int stride = 1;
+        for (int i = ndims() - 1; i >= 0; i--) {
+            if (dims_[i] == target.dims_[i]) {
+                strides[i] = stride;
+            } else {
+                assert(dims_[i] == 1 && "Shapes cannot be broadcast!");
+            }
+            stride *= getStorageDim(i);
+        }
+        return strides;
+    }
+
     /** Return a TensorShapeProto that serializes this TensorShape. */
     TensorShapeProto* asTensorShapeProto();
 
@@ -383,6 +403,18 @@ class Tensor : public TensorBase {
         }
     }
 
+    /**
+     * Constructs a Tensor from a serialized TensorProto, using externally
+     * owned data, e.g. from a memory-mapped raw parameter file, without
+     * copying it.
+     *
+     * @param tensorProto Basic parameters of the Tensor.
+     * @param externalData The data contents of the Tensor, in the storage
+     * layout (including padding) of the shape.
+     */
+    Tensor(const TensorProto& tensorProto, std::shared_ptr<void> externalData)
+            : TensorBase(tensorProto), tensorData(externalData) {}
+
     /** Returns an iterator starting at the beginning of the Tensor. */
     TensorIndexIterator startIndex() const {
         return TensorIndexIterator(shape);
@@ -22,13 +22,139 @@ class EltwiseOp : public Operator {
         outputs.resize(kNumOutputs, nullptr);
     }
 
+    /**
+     * The output is shaped as the inputs broadcast to each other. Inputs of
+     * different shapes are read with stride-0 dimensions instead of being
+     * repeated beforehand.
+     */
     void createAllTensors() override {
-        Tensor* output = new Tensor(name, getInput(Input0)->getShape());
+        const TensorShape& shape0 = getInput(Input0)->getShape();
+        const TensorShape& shape1 = getInput(Input1)->getShape();
+        assert(shape0.ndims() == shape1.ndims());
+        std::vector<int> dims = shape0.dims();
+        for (int i = 0; i < shape0.ndims(); i++) {
+            assert((shape0[i] == shape1[i] || shape0[i] == 1 ||
+                    shape1[i] == 1) &&
+                   "Shapes cannot be broadcast!");
+            dims[i] = std::max(shape0[i], shape1[i]);
+        }
+        TensorShape shape(dims, shape0.getLayout(), shape0.getAlignment());
+        Tensor* output = new Tensor(name, shape);
         outputs.at(Outputs) = output;
         workspace->addTensor(output);
     }
 
    protected:
+    /** Returns true if an input has to be broadcast to the output shape. */
+    bool isBroadcast() const {
+        const TensorShape& outputShape = getOutput(Outputs)->getShape();
+        return !(getInput(Input0)->getShape() == outputShape &&
+                 getInput(Input1)->getShape() == outputShape);
+    }
+
+    /**
+     * Gets the bounds of a 4D loop nest over the output, and the strides of
+     * each input along it. Shapes with fewer dimensions are extended with
+     * leading dimensions of size 1.
+     *
+     * @param dims The output dims.
+     * @param strides0 The broadcast strides of Input0.
+     * @param strides1 The broadcast strides of Input1.
+     */
+    void getBroadcastLoopNest(std::vector<int>& dims,
+                              std::vector<int>& strides0,
+                              std::vector<int>& strides1) const {
+        getBroadcastLoopNest(getOutput(Outputs)->getShape(),
+                             getInput(Input0)->getShape(),
+                             getInput(Input1)->getShape(),
+                             dims,
+                             strides0,
+                             strides1);
+    }
+
+    /**
+     * Same as above, but for the given output and input shapes, e.g. those
+     * of an output tile and of the input tiles it reads.
+     */
+    static void getBroadcastLoopNest(const TensorShape& outputShape,
+                                     const TensorShape& shape0,
+                                     const TensorShape& shape1,
+                                     std::vector<int>& dims,
+                                     std::vector<int>& strides0,
+                                     std::vector<int>& strides1) {
+        int ndims = outputShape.ndims();
+        assert(ndims <= 4 && "Broadcasting supports up to 4D tensors!");
+        std::vector<int> s0 = shape0.getBroadcastStrides(outputShape);
+        std::vector<int> s1 = shape1.getBroadcastStrides(outputShape);
+        dims.assign(4 - ndims, 1);
+        dims.insert(dims.end(), outputShape.dims().begin(),
+                    outputShape.dims().end());
+        strides0.assign(4 - ndims, 0);
+        strides0.insert(strides0.end(), s0.begin(), s0.end());
+        strides1.assign(4 - ndims, 0);
+        strides1.insert(strides1.end(), s1.begin(), s1.end());
+    }
+
+    /**
+     * Gets the tile shapes for a broadcast operation.
+     *
+     * The output tile takes as many of the innermost dimensions as fit in
+     * `maxTileSize` elements. Each input tile keeps its broadcast dimensions
+     * at 1, so only the input data a tile actually reads is sent to the
+     * accelerator.
+     *
+     * @return The tile shapes of Input0, Input1 and the output.
+     */
+    std::array<TensorShape, 3> getBroadcastTileShapes(int maxTileSize) const {
+        const TensorShape& outputShape = getOutput(Outputs)->getShape();
+        int ndims = outputShape.ndims();
+        std::vector<int> tileDims(ndims, 1);
+        int remaining = maxTileSize;
+        for (int i = ndims - 1; i >= 0; i--) {
+            int dimSize = i == ndims - 1 ? outputShape.getStorageDim(i)
+                                         : outputShape[i];
+            if (dimSize > remaining) {
+                // Split this dimension; the outer ones are tiled by 1.
+                tileDims[i] = i == ndims - 1
+                                      ? remaining - remaining % Backend::Alignment
+                                      : remaining;
+                break;
+            }
+            tileDims[i] = outputShape[i];
+            remaining /= dimSize;
+        }
+        std::array<TensorShape, 3> tileShapes;
+        for (int j = Input0; j <= Input1; j++) {
+            const TensorShape& inputShape = getInput(j)->getShape();
+            std::vector<int> inputTileDims(tileDims);
+            for (int i = 0; i < ndims; i++) {
+                if (inputShape[i] == 1)
+                    inputTileDims[i] = 1;
+            }
+            tileShapes[j] = TensorShape(
+                    inputTileDims, inputShape.getLayout(), Backend::Alignment);
+        }
+        tileShapes[2] = TensorShape(
+                tileDims, outputShape.getLayout(), Backend::Alignment);
+        return tileShapes;
+    }
+
+    /**
+     * Returns the index of the input tile that the output tile at
+     * `outputIndex` reads. The input has a single tile along each of its
+     * broadcast dimensions.
+     */
+    static int getBroadcastTileIndex(const TiledTensor& inputs,
+                                     const TensorIndexIterator& outputIndex) {
+        const TensorShape& tilesShape = inputs.getShape();
+        int index = 0;
+        for (int i = 0; i < tilesShape.ndims(); i++) {
+            index = index * tilesShape[i] +
+                    (tilesShape[i] == 1 ? 0 : outputIndex.currentIndex(i));
+        }
+        return index;
+    }
+
     enum { Input0, Input1, kNumInputs };
     enum { Outputs, kNumOutputs };
 };
@@ -23,6 +23,57 @@ void ref_eltwise_mul(float* input0,
     dmaStore(results, results, input_size * sizeof(float));
 }
 
+/** \ingroup AladdinKernels
+ *
+ * A Reference implementation of elementwise multiplication with broadcasting.
+ *
+ * The output is iterated as a 4D array. An input dimension that is broadcast
+ * has a stride of 0, so the same input elements are read again instead of
+ * being repeated into a full-sized tensor first.
+ */
+void ref_eltwise_mul_broadcast(float* input0,
+                               float* input1,
+                               float* results,
+                               int input0_size,
+                               int input1_size,
+                               int dim0,
+                               int dim1,
+                               int dim2,
+                               int dim3,
+                               int results_pad,
+                               int input0_stride0,
+                               int input0_stride1,
+                               int input0_stride2,
+                               int input0_stride3,
+                               int input1_stride0,
+                               int input1_stride1,
+                               int input1_stride2,
+                               int input1_stride3) {
+    int results_cols = dim3 + results_pad;
+    dmaLoad(input0, input0, input0_size * sizeof(float));
+    dmaLoad(input1, input1, input1_size * sizeof(float));
+    ARRAY_4D(float, _results, results, dim1, dim2, results_cols);
+    eltwise_mul_dim0:
+    for (int i = 0; i < dim0; i++) {
+        eltwise_mul_dim1:
+        for (int j = 0; j < dim1; j++) {
+            eltwise_mul_dim2:
+            for (int k = 0; k < dim2; k++) {
+                eltwise_mul_dim3:
+                for (int l = 0; l < dim3; l++) {
+                    int index0 = i * input0_stride0 + j * input0_stride1 +
+                                 k * input0_stride2 + l * input0_stride3;
+                    int index1 = i * input1_stride0 + j * input1_stride1 +
+                                 k * input1_stride2 + l * input1_stride3;
+                    _results[i][j][k][l] = input0[index0] * input1[index1];
+                }
+            }
+        }
+    }
+    dmaStore(results, results,
+             dim0 * dim1 * dim2 * results_cols * sizeof(float));
+}
+
 #ifdef __cplusplus
 }
 #endif
@@ -37,7 +88,6 @@ void EltwiseMulOp<ReferenceBackend>::run() {
     const TensorShape& input0Shape = input0->getShape();
     const TensorShape& input1Shape = input1->getShape();
     const TensorShape& outputShape = output->getShape();
-    assert(input0Shape == input1Shape && input0Shape == outputShape);
 
     float* input0Data = input0->data<float>();
     float* input1Data = input1->data<float>();
@@ -48,8 +98,19 @@ void EltwiseMulOp<ReferenceBackend>::run() {
                     input1Shape.storageSize() * sizeof(float));
     mapArrayToAccel(ref::kEltwiseOpHw, "results", outputData,
                     outputShape.storageSize() * sizeof(float));
-    invokeKernel(ref::kEltwiseOpHw, ref_eltwise_mul, input0Data, input1Data,
-                 outputData, input0Shape.size());
+    if (!isBroadcast()) {
+        invokeKernel(ref::kEltwiseOpHw, ref_eltwise_mul, input0Data,
+                     input1Data, outputData, input0Shape.size());
+        return;
+    }
+    std::vector<int> dims, strides0, strides1;
+    getBroadcastLoopNest(dims, strides0, strides1);
+    invokeKernel(ref::kEltwiseOpHw, ref_eltwise_mul_broadcast, input0Data,
+                 input1Data, outputData, input0Shape.storageSize(),
+                 input1Shape.storageSize(), dims[0], dims[1], dims[2], dims[3],
+                 outputShape.getPadding(outputShape.ndims() - 1), strides0[0],
+                 strides0[1], strides0[2], strides0[3], strides1[0],
+                 strides1[1], strides1[2], strides1[3]);
 }
 
 }  // namespace smaug
@@ -56,6 +56,52 @@ TEST_CASE_METHOD(SmaugTest, "Reference eltwise operators", "[refop]") {
         verifyOutputs(outputsTensor, expectedValues);
     }
 
+    SECTION("Element-wise add operator with broadcasting") {
+        auto addOp = new EltwiseAddOp<ReferenceBackend>("add", workspace());
+        TensorShape input0Shape({ 2, 3 }, DataLayout::NC);
+        Tensor* input0 = new Tensor("input0", input0Shape);
+        input0->allocateStorage<float>();
+        input0->fillData<float>({ 1, 2, 3, 4, 5, 6 });
+        workspace()->addTensor(input0);
+        TensorShape input1Shape({ 2, 1 }, DataLayout::NC);
+        Tensor* input1 = new Tensor("input1", input1Shape);
+        input1->allocateStorage<float>();
+        input1->fillData<float>({ 10, 20 });
+        workspace()->addTensor(input1);
+        addOp->setInput(input0, 0);
+        addOp->setInput(input1, 1);
+        addOp->createAllTensors();
+        allocateAllTensors<float>(addOp);
+        addOp->run();
+        auto outputsTensor = addOp->getOutput(0);
+        REQUIRE(outputsTensor->getShape().dims() == std::vector<int>{ 2, 3 });
+        std::vector<float> expectedValues{ 11, 12, 13, 24, 25, 26 };
+        verifyOutputs(outputsTensor, expectedValues);
+    }
+
+    SECTION("Element-wise mul operator with broadcasting") {
+        auto mulOp = new EltwiseMulOp<ReferenceBackend>("mul", workspace());
+        TensorShape input0Shape({ 1, 3 }, DataLayout::NC);
+        Tensor* input0 = new Tensor("input0", input0Shape);
+        input0->allocateStorage<float>();
+        input0->fillData<float>({ 1, 0, -1 });
+        workspace()->addTensor(input0);
+        TensorShape input1Shape({ 2, 3 }, DataLayout::NC);
+        Tensor* input1 = new Tensor("input1", input1Shape);
+        input1->allocateStorage<float>();
+        input1->fillData<float>({ 1, 2, 3, 4, 5, 6 });
+        workspace()->addTensor(input1);
+        mulOp->setInput(input0, 0);
+        mulOp->setInput(input1, 1);
+        mulOp->createAllTensors();
+        allocateAllTensors<float>(mulOp);
+        mulOp->run();
+        auto outputsTensor = mulOp->getOutput(0);
+        REQUIRE(outputsTensor->getShape().dims() == std::vector<int>{ 2, 3 });
+        std::vector<float> expectedValues{ 1, 0, -3, 4, 0, -6 };
+        verifyOutputs(outputsTensor, expectedValues);
+    }
+
     SECTION("Less operator") {
         TensorShape inputShape({ 1, 4 }, DataLayout::NC);
         auto lessOp = new LessOp<ReferenceBackend>("less", workspace());
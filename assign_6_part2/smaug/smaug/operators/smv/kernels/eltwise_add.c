@@ -34,6 +34,83 @@ void smv_eltwise_add_nc_vec_fxp(float16* host_inputs0,
     host_store_fp16(results, host_results, inputs_size, 0, 0);
 }
 
+/** \ingroup AladdinKernels
+ *
+ * SMV implementation of elementwise addition with broadcasting.
+ *
+ * The results are iterated as a 4D array, vectorized along the last
+ * dimension. An input dimension that is broadcast has a stride of 0, so the
+ * input tiles only hold the data of their own (smaller) shape. An input
+ * broadcast along the last dimension is read as a scalar and splatted.
+ *
+ * @param load_inputs0 Whether to load the inputs0 tile. If false, the tile
+ *        already in the scratchpad from the previous invocation is reused.
+ * @param load_inputs1 Same as load_inputs0, for the inputs1 tile.
+ */
+void smv_eltwise_add_broadcast_vec_fxp(float16* host_inputs0,
+                                       float16* host_inputs1,
+                                       float16* host_results,
+                                       float* inputs0,
+                                       float* inputs1,
+                                       float* results,
+                                       int inputs0_size,
+                                       int inputs1_size,
+                                       int results_dims[4],
+                                       int results_pad,
+                                       int inputs0_strides[4],
+                                       int inputs1_strides[4],
+                                       bool load_inputs0,
+                                       bool load_inputs1) {
+    int results_cols = results_dims[3] + results_pad;
+    int results_size =
+            results_dims[0] * results_dims[1] * results_dims[2] * results_cols;
+    // Load inputs.
+    if (load_inputs0)
+        host_load_fp16(inputs0, host_inputs0, inputs0_size, 0, 0);
+    if (load_inputs1)
+        host_load_fp16(inputs1, host_inputs1, inputs1_size, 0, 0);
+
+    VEC_ARRAY_1D(v8fp_t, _inputs0, inputs0);
+    VEC_ARRAY_1D(v8fp_t, _inputs1, inputs1);
+    VEC_ARRAY_4D(v8fp_t, _results, results, results_dims[1], results_dims[2],
+                 results_cols);
+
+    eltwise_add_dim0:
+    for (int i = 0; i < results_dims[0]; i++) {
+        eltwise_add_dim1:
+        for (int j = 0; j < results_dims[1]; j++) {
+            eltwise_add_dim2:
+            for (int k = 0; k < results_dims[2]; k++) {
+                int index0 = i * inputs0_strides[0] + j * inputs0_strides[1] +
+                             k * inputs0_strides[2];
+                int index1 = i * inputs1_strides[0] + j * inputs1_strides[1] +
+                             k * inputs1_strides[2];
+                float scalar0 = inputs0[index0];
+                float scalar1 = inputs1[index1];
+                v8fp_t splat0 = { scalar0, scalar0, scalar0, scalar0,
+                                  scalar0, scalar0, scalar0, scalar0 };
+                v8fp_t splat1 = { scalar1, scalar1, scalar1, scalar1,
+                                  scalar1, scalar1, scalar1, scalar1 };
+                eltwise_add_dim3:
+                for (int l = 0; l < results_cols / VECTOR_SIZE; l++) {
+                    v8fp_t input0 =
+                            inputs0_strides[3] == 0
+                                    ? splat0
+                                    : _inputs0[index0 / VECTOR_SIZE + l];
+                    v8fp_t input1 =
+                            inputs1_strides[3] == 0
+                                    ? splat1
+                                    : _inputs1[index1 / VECTOR_SIZE + l];
+                    _results[i][j][k][l] = input0 + input1;
+                }
+            }
+        }
+    }
+
+    // Store results to the host memory.
+    host_store_fp16(results, host_results, results_size, 0, 0);
+}
+
 #ifdef __cplusplus
 }  // extern "C"
 #endif
@@ -16,6 +16,9 @@ class SmvEltwiseAddOp : public EltwiseAddOp<SmvBackend> {
 
   protected:
    void runX(TiledTensor& inputs0, TiledTensor& inputs1, TiledTensor& outputs);
+   void runBroadcastX(TiledTensor& inputs0,
+                      TiledTensor& inputs1,
+                      TiledTensor& outputs);
 
    std::array<TiledTensor, 3> tiledTensors;
 };
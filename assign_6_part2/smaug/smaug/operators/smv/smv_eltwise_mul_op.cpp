@@ -44,15 +44,77 @@ void SmvEltwiseMulOp::runX(TiledTensor& inputs0,
     }
 }
 
+// The tile dispatcher for elementwise multiplication with broadcast inputs.
+void SmvEltwiseMulOp::runBroadcastX(TiledTensor& inputs0,
+                                    TiledTensor& inputs1,
+                                    TiledTensor& outputs) {
+    setArrayMemTypeIfSimulating(
+            smv::kEltwiseOpHw, "host_inputs0", getInputsMemType());
+    setArrayMemTypeIfSimulating(
+            smv::kEltwiseOpHw, "host_inputs1", getInputsMemType());
+    setArrayMemTypeIfSimulating(
+            smv::kEltwiseOpHw, "host_results", getOutputsMemType());
+    int lastInput0Idx = -1;
+    int lastInput1Idx = -1;
+    for (auto outputIdx = outputs.startIndex(); !outputIdx.end();
+         ++outputIdx) {
+        int input0Idx = getBroadcastTileIndex(inputs0, outputIdx);
+        int input1Idx = getBroadcastTileIndex(inputs1, outputIdx);
+        dout(1) << "Input0: " << input0Idx << ", input1: " << input1Idx
+                << ", output: " << outputIdx << "\n";
+        Tensor* input0Tile = inputs0.getTileWithData(input0Idx);
+        Tensor* input1Tile = inputs1.getTileWithData(input1Idx);
+        Tensor* outputTile = outputs[outputIdx];
+        const TensorShape& input0Shape = input0Tile->getShape();
+        const TensorShape& input1Shape = input1Tile->getShape();
+        const TensorShape& outputShape = outputTile->getShape();
+        mapArrayToAccel(smv::kEltwiseOpHw, "host_inputs0",
+                        input0Tile->data<float16>(),
+                        input0Shape.storageSize() * sizeof(float16));
+        mapArrayToAccel(smv::kEltwiseOpHw, "host_inputs1",
+                        input1Tile->data<float16>(),
+                        input1Shape.storageSize() * sizeof(float16));
+        mapArrayToAccel(smv::kEltwiseOpHw, "host_results",
+                        outputTile->data<float16>(),
+                        outputShape.storageSize() * sizeof(float16));
+        std::vector<int> dims, strides0, strides1;
+        getBroadcastLoopNest(outputShape, input0Shape, input1Shape, dims,
+                             strides0, strides1);
+        // An input tile that is read by consecutive output tiles stays in
+        // the scratchpad.
+        invokeKernel(smv::kEltwiseOpHw, smv_eltwise_mul_broadcast_vec_fxp,
+                     input0Tile->data<float16>(), input1Tile->data<float16>(),
+                     outputTile->data<float16>(), smv::spad0, smv::spad1,
+                     smv::spad2, input0Shape.storageSize(),
+                     input1Shape.storageSize(), dims.data(),
+                     outputShape.getPadding(outputShape.ndims() - 1),
+                     strides0.data(), strides1.data(),
+                     input0Idx != lastInput0Idx, input1Idx != lastInput1Idx);
+        lastInput0Idx = input0Idx;
+        lastInput1Idx = input1Idx;
+    }
+}
+
 void SmvEltwiseMulOp::tile() {
-    // We reuse the unary op tiler for the elementwise multiplication operator.
-    using namespace smaug::smv::unary;
     auto inputs0 = getInput(Input0);
     auto inputs1 = getInput(Input1);
     auto outputs = getOutput(Outputs);
-    int maxTileSize =
-            std::min(SmvBackend::SpadSize() / inputs0->getDataTypeSize(),
-                     inputs0->getShape().storageSize());
+    int maxTileSize = SmvBackend::SpadSize() / inputs0->getDataTypeSize();
+    if (isBroadcast()) {
+        // The broadcast inputs are tiled at their own shapes, and the kernel
+        // reads them with stride-0 dimensions.
+        auto tileShapes = getBroadcastTileShapes(maxTileSize);
+        tiledTensors[0] =
+                generateTiledTensor(inputs0, tileShapes[0], this, false);
+        tiledTensors[1] =
+                generateTiledTensor(inputs1, tileShapes[1], this, false);
+        tiledTensors[2] =
+                generateTiledTensor(outputs, tileShapes[2], this, false);
+        return;
+    }
+    // We reuse the unary op tiler for the elementwise multiplication operator.
+    using namespace smaug::smv::unary;
+    maxTileSize = std::min(maxTileSize, inputs0->getShape().storageSize());
     TensorShape tileShape(
             { 1, maxTileSize }, DataLayout::NC, SmvBackend::Alignment);
     tiledTensors[0] =
@@ -64,14 +126,8 @@ void SmvEltwiseMulOp::tile() {
 }
 
 void SmvEltwiseMulOp::run() {
-    auto inputs0 = getInput(Input0);
-    auto inputs1 = getInput(Input1);
     auto outputs = getOutput(Outputs);
-    const TensorShape& inputs0Shape = inputs0->getShape();
-    const TensorShape& inputs1Shape = inputs1->getShape();
-    const TensorShape& outputsShape = outputs->getShape();
-    assert(inputs0Shape == inputs1Shape && inputs0Shape == outputsShape);
-
+    bool broadcast = isBroadcast();
     {
         auto stats = gem5::ScopedStats(
                 stats::kTensorPrepStart, stats::kTensorPrepEnd);
@@ -79,12 +135,18 @@ void SmvEltwiseMulOp::run() {
         tiledTensors[1].copyDataToAllTiles();
     }
 
-    runX(tiledTensors[0], tiledTensors[1], tiledTensors[2]);
+    if (broadcast)
+        runBroadcastX(tiledTensors[0], tiledTensors[1], tiledTensors[2]);
+    else
+        runX(tiledTensors[0], tiledTensors[1], tiledTensors[2]);
 
     {
         auto stats = gem5::ScopedStats(
                 stats::kTensorFinalStart, stats::kTensorFinalEnd);
-        flattenTiledTensor(tiledTensors[2], outputs);
+        if (broadcast)
+            tiledTensors[2].untile();
+        else
+            flattenTiledTensor(tiledTensors[2], outputs);
     }
 }
 
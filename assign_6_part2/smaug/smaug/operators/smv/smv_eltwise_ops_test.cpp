@@ -68,7 +68,10 @@ class SmvEltwiseOpsTest : public SmaugTest {
             return convertFp32ToFp16Tensor(refEltOp->getOutput(0), workspace());
     }
 
-    void doSingleTest(const std::vector<int>& dims, OpType opType) {
+    // If `input1Dims` is given, the inputs are broadcast to each other.
+    void doSingleTest(const std::vector<int>& dims,
+                      OpType opType,
+                      const std::vector<int>& input1Dims = {}) {
         Operator* eltOp;
         bool boolOutput = true;
         switch (opType) {
@@ -97,8 +100,11 @@ class SmvEltwiseOpsTest : public SmaugTest {
         }
         DataLayout layout = dims.size() == 4 ? NHWC : NC;
         TensorShape inputShape(dims, layout, SmvBackend::Alignment);
+        TensorShape input1Shape(input1Dims.empty() ? dims : input1Dims,
+                                layout,
+                                SmvBackend::Alignment);
         Tensor* inputs0 = new Tensor("input0", inputShape);
-        Tensor* inputs1 = new Tensor("input1", inputShape);
+        Tensor* inputs1 = new Tensor("input1", input1Shape);
         inputs0->allocateStorage<float16>();
         inputs1->allocateStorage<float16>();
         workspace()->addTensor(inputs0);
@@ -148,3 +154,27 @@ TEST_CASE_METHOD(SmvEltwiseOpsTest, "SMV Tiled 2D Eltwise Ops", "[smveltops]") {
     SECTION("DimNC tiling") { doTest({ 1, 32768 }); }
 }
 
+TEST_CASE_METHOD(SmvEltwiseOpsTest,
+                 "SMV Tiled Broadcast Eltwise Ops",
+                 "[smveltops]") {
+    SECTION("Broadcast channels") {
+        doSingleTest({ 1, 8, 8, 8 }, EltwiseAdd, { 1, 8, 8, 1 });
+        doSingleTest({ 1, 8, 8, 8 }, EltwiseMul, { 1, 8, 8, 1 });
+    }
+    SECTION("Broadcast rows and columns, DimNH tiling") {
+        doSingleTest({ 1, 64, 64, 32 }, EltwiseAdd, { 1, 1, 1, 32 });
+        doSingleTest({ 1, 64, 64, 32 }, EltwiseMul, { 1, 1, 1, 32 });
+    }
+    SECTION("Broadcast batches, DimNC tiling") {
+        doSingleTest({ 4, 32768 }, EltwiseAdd, { 1, 32768 });
+        doSingleTest({ 4, 32768 }, EltwiseMul, { 1, 32768 });
+    }
+    SECTION("Broadcast channels, DimNH tiling") {
+        doSingleTest({ 1, 64, 64, 32 }, EltwiseAdd, { 1, 64, 64, 1 });
+        doSingleTest({ 1, 64, 64, 32 }, EltwiseMul, { 1, 64, 64, 1 });
+    }
+    SECTION("Broadcast both inputs, DimNH tiling") {
+        doSingleTest({ 2, 1, 64, 24 }, EltwiseAdd, { 1, 64, 1, 24 });
+        doSingleTest({ 2, 1, 64, 24 }, EltwiseMul, { 1, 64, 1, 24 });
+    }
+}
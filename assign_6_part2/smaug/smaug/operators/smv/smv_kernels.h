@@ -150,6 +150,21 @@ void smv_eltwise_add_nc_vec_fxp(float16* host_inputs0,
                                 float* results,
                                 int inputs_size);
 
+void smv_eltwise_add_broadcast_vec_fxp(float16* host_inputs0,
+                                       float16* host_inputs1,
+                                       float16* host_results,
+                                       float* inputs0,
+                                       float* inputs1,
+                                       float* results,
+                                       int inputs0_size,
+                                       int inputs1_size,
+                                       int results_dims[4],
+                                       int results_pad,
+                                       int inputs0_strides[4],
+                                       int inputs1_strides[4],
+                                       bool load_inputs0,
+                                       bool load_inputs1);
+
 void smv_eltwise_mul_nc_vec_fxp(float16* host_inputs0,
                                 float16* host_inputs1,
                                 float16* host_results,
@@ -158,6 +173,21 @@ void smv_eltwise_mul_nc_vec_fxp(float16* host_inputs0,
                                 float* results,
                                 int inputs_size);
 
+void smv_eltwise_mul_broadcast_vec_fxp(float16* host_inputs0,
+                                       float16* host_inputs1,
+                                       float16* host_results,
+                                       float* inputs0,
+                                       float* inputs1,
+                                       float* results,
+                                       int inputs0_size,
+                                       int inputs1_size,
+                                       int results_dims[4],
+                                       int results_pad,
+                                       int inputs0_strides[4],
+                                       int inputs1_strides[4],
+                                       bool load_inputs0,
+                                       bool load_inputs1);
+
 void smv_less_nc_vec_fxp(float16* host_inputs0,
                          float16* host_inputs1,
                          bool* host_results,
@@ -11,6 +11,9 @@ np_to_smaug_type = {
     np.bool_: types_pb2.Bool,
 }
 
+smaug_to_np_type = {
+    smaug_type: np_type for np_type, smaug_type in np_to_smaug_type.items()}
+
 class LayoutSet:
   def __init__(self, bitmask=0):
     self.layouts = bitmask
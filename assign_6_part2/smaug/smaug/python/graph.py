@@ -7,9 +7,14 @@ from smaug.core import graph_pb2
 from smaug.core import types_pb2
 from smaug.core import tensor_pb2
 from smaug.python import global_vars
+from smaug.python import raw_params
+from smaug.python import tensor_utils
 from smaug.python.node import Node
 from smaug.python.tensor import Tensor
 
+# Name indices of the protos returned by `Graph.to_proto(with_index=True)`.
+ProtoIndex = namedtuple("ProtoIndex", ["nodes", "tensor_data"])
+
 class Graph:
   def __init__(
       self, name="DefaultGraph", backend="Reference",
@@ -20,6 +25,8 @@ class Graph:
     self._backend = backend
     self._mem_policy = mem_policy
     self._nodes = []
+    # Nodes of this graph by name, kept in sync with `_nodes`.
+    self._nodes_by_name = {}
     self._node_names = {}
     self._alignment = global_vars.backend_alignment[self._backend]
     # Layout transformation is enabled by default.
@@ -55,12 +62,12 @@ class Graph:
 
   def merge(self, other):
     """Merge another graph into this."""
-    for node in other.get_nodes():
-      if self.get_node(node.name) is not None:
-        raise ValueError(
-            "The graph to be merged contains a node with the same name as one "
-            "in the current graph. Possibly merging a graph more than once?")
-    self.get_nodes().extend(other.get_nodes())
+    if not self._nodes_by_name.keys().isdisjoint(other._nodes_by_name):
+      raise ValueError(
+          "The graph to be merged contains a node with the same name as one "
+          "in the current graph. Possibly merging a graph more than once?")
+    self._nodes.extend(other.get_nodes())
+    self._nodes_by_name.update(other._nodes_by_name)
 
   def add_node(
       self, name, op, input_tensors, output_tensors_dims,
@@ -86,6 +93,7 @@ class Graph:
     name = self.create_unique_name(name)
     node = Node(name, op, params)
     self._nodes.append(node)
+    self._nodes_by_name[name] = node
 
     # Add every input tensor to the node.
     for i,tensor in enumerate(input_tensors):
@@ -108,6 +116,24 @@ class Graph:
 
     return output_tensors
 
+  def remove_nodes(self, nodes):
+    """Remove nodes from the graph.
+
+    The nodes are also removed from the targets of their input tensors. Their
+    output tensors must no longer be used by any other node.
+
+    Args:
+      nodes: An iterable of `Node`s in this graph.
+    """
+    removed = {id(node) for node in nodes}
+    for node in self._nodes:
+      if id(node) not in removed:
+        continue
+      for tensor in node.inputs:
+        tensor.targets[:] = [t for t in tensor.targets if t is not node]
+      del self._nodes_by_name[node.name]
+    self._nodes = [node for node in self._nodes if id(node) not in removed]
+
   def get_node(self, node_name, recursive=False):
     """Return a node in the graph by its name.
 
@@ -118,9 +144,9 @@ class Graph:
     Returns:
       A `Node` if we find the node or None is returned.
     """
-    for node in self._nodes:
-      if node.name == node_name:
-        return node
+    node = self._nodes_by_name.get(node_name)
+    if node is not None:
+      return node
     if recursive and self._parent_graph is not None:
       return self._parent_graph.get_node(node_name, True)
     return None
@@ -167,11 +193,18 @@ class Graph:
     """Enable automatic layout transformation."""
     self._layout_trans_enabled = True
 
-  def to_proto(self):
+  def to_proto(self, with_index=False):
     """Serialize the graph.
 
+    Args:
+      with_index: If True, also return a `ProtoIndex` of the node protos and
+        the tensor data by name, for O(1) lookups with `get_node_proto` and
+        `get_tensor_data`. The index is not updated if the protos are
+        modified afterwards.
+
     Returns:
-      A tuple of (`GraphProto`, `TensorDataArray`).
+      A tuple of (`GraphProto`, `TensorDataArray`), or of (`GraphProto`,
+      `TensorDataArray`, `ProtoIndex`) if `with_index` is True.
     """
     graph_proto = graph_pb2.GraphProto()
     graph_proto.name = self._name
@@ -180,23 +213,60 @@ class Graph:
     tensor_data_array = tensor_pb2.TensorDataArray()
     for node in self._nodes:
       graph_proto.nodes.append(node.to_proto(tensor_data_array))
+    if with_index:
+      return graph_proto, tensor_data_array, ProtoIndex(
+          nodes=tensor_utils.index_by_name(graph_proto.nodes),
+          tensor_data=tensor_utils.index_by_name(tensor_data_array.data_array))
     return graph_proto, tensor_data_array
 
-  def write_graph(self, name=None):
+  def get_data_tensors(self):
+    """Return all tensors of the graph that carry data, in node order."""
+    tensors = []
+    for node in self._nodes:
+      for tensor in node.inputs + node.outputs:
+        if tensor.has_data:
+          tensors.append(tensor)
+    return tensors
+
+  def write_graph(self, name=None, params_format="pb"):
     """Serialize the graph to a protobuf file.
 
     Args:
       name: Name of the output protobuf file. If not specified, use the graph's
             name instead.
+      params_format: "pb" writes the parameters as a `TensorDataArray` protobuf
+            into <name>_params.pb. "raw" writes them as a raw parameter file
+            into <name>_params.bin, which is memory-mapped when loaded instead
+            of parsed, and has no protobuf size limit.
     """
-    graph_proto, tensor_data_array = self.to_proto()
+    if params_format not in ("pb", "raw"):
+      raise ValueError("An unknown parameter format %s is used!" % params_format)
     if name is None:
       name = self._name
-    topo_name = name + "_topo.pbtxt"
-    params_name = name + "_params.pb"
-    with open(topo_name, "w") as f_topo, open(params_name, "wb") as f_params:
-      f_topo.write(text_format.MessageToString(graph_proto))
-      f_params.write(tensor_data_array.SerializeToString())
+    # The graph is written one node and one tensor at a time, so the memory
+    # needed is bounded by the largest tensor instead of the whole model. The
+    # output is the same as serializing `to_proto()` in one go: the text
+    # format of a message is the concatenation of the text format of its
+    # fields, and a serialized `TensorDataArray` is the concatenation of its
+    # serialized elements.
+    with open(name + "_topo.pbtxt", "w") as f_topo:
+      f_topo.write(text_format.MessageToString(
+          graph_pb2.GraphProto(name=self._name)))
+      for node in self._nodes:
+        f_topo.write(text_format.MessageToString(
+            graph_pb2.GraphProto(nodes=[node.to_proto(None)])))
+      f_topo.write(text_format.MessageToString(
+          graph_pb2.GraphProto(
+              backend=self._backend, mem_policy=self._mem_policy)))
+    if params_format == "pb":
+      with open(name + "_params.pb", "wb") as f_params:
+        for tensor in self.get_data_tensors():
+          tensor_data_array = tensor_pb2.TensorDataArray()
+          tensor.to_tensor_proto(tensor_pb2.TensorProto(), tensor_data_array)
+          f_params.write(tensor_data_array.SerializeToString())
+    else:
+      raw_params.write_raw_params(
+          self.get_data_tensors(), name + "_params.bin")
 
   def print_summary(self):
     """Print the summary of the graph.
@@ -234,16 +304,20 @@ class Graph:
             "alignment(%d)" % t.shape.alignment)
       print("-----------------------------------------------------------------")
 
-def get_node_proto(graph_proto, node_name):
+def get_node_proto(graph_proto, node_name, index=None):
   """Get a `NodeProto` from `GraphProto` by node name.
 
   Args:
     graph_proto: A `GraphProto`.
     node_name: Name of the node.
+    index: Optional name index of the node protos, e.g. `ProtoIndex.nodes`
+      from `Graph.to_proto`. Without it, the node protos are scanned.
 
   Returns:
     A `NodeProto` or None.
   """
+  if index is not None:
+    return index.get(node_name)
   for node_proto in graph_proto.nodes:
     if node_proto.name == node_name:
       return node_proto
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""Tests for python/graph.py."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from google.protobuf import text_format
+
+from smaug.core import types_pb2
+from smaug.python.tensor import Tensor
+from smaug.python.graph import Graph, get_node_proto
+from smaug.python.tensor_utils import get_tensor_data
+from smaug.python.ops import math_ops, nn_ops
+from smaug.python.ops.data_op import input_data
+
+class WriteGraphTest(unittest.TestCase):
+  def setUp(self):
+    self.run_dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.run_dir)
+
+  def build_graph(self, backend):
+    with Graph("test_graph", backend, mem_policy=types_pb2.AllAcp) as graph:
+      dtype = np.float16 if backend == "SMV" else np.float32
+      x = input_data(
+          Tensor(
+              data_layout=types_pb2.NHWC,
+              tensor_data=np.random.rand(1, 4, 4, 3).astype(dtype)), "x")
+      w = input_data(
+          Tensor(
+              data_layout=types_pb2.NHWC,
+              tensor_data=np.random.rand(8, 3, 3, 3).astype(dtype)), "w")
+      out = nn_ops.convolution(
+          x, w, stride=[1, 1], padding="same", activation="relu")
+      out = math_ops.add(out, out)
+    return graph
+
+  def test_streamed_files_match_to_proto(self):
+    """Test that the streamed files equal the serialized `to_proto()`."""
+    for backend in ["Reference", "SMV"]:
+      graph = self.build_graph(backend)
+      name = os.path.join(self.run_dir, backend)
+      graph.write_graph(name)
+      graph_proto, tensor_data_array = graph.to_proto()
+      with open(name + "_topo.pbtxt") as f:
+        self.assertEqual(f.read(), text_format.MessageToString(graph_proto))
+      with open(name + "_params.pb", "rb") as f:
+        self.assertEqual(f.read(), tensor_data_array.SerializeToString())
+
+class NodeLookupTest(unittest.TestCase):
+  def test_get_node(self):
+    """Test looking up nodes by name, also in parent graphs."""
+    x = Tensor(
+        data_layout=types_pb2.N,
+        tensor_data=np.random.rand(4).astype(np.float32))
+    with Graph("parent_graph", "Reference") as parent_graph:
+      math_ops.add(x, x, name="add")
+      with Graph("child_graph", "Reference") as child_graph:
+        math_ops.mul(x, x, name="mul")
+        self.assertIsNone(child_graph.get_node("add"))
+        self.assertEqual(
+            child_graph.get_node("add", recursive=True).name, "add")
+      # The child graph has been merged.
+      self.assertEqual(parent_graph.get_node("mul").name, "mul")
+    self.assertIsNone(parent_graph.get_node("sub"))
+
+  def test_merge_name_collision(self):
+    """Test that merging a graph twice is rejected."""
+    x = Tensor(
+        data_layout=types_pb2.N,
+        tensor_data=np.random.rand(4).astype(np.float32))
+    with Graph("parent_graph", "Reference") as parent_graph:
+      with Graph("child_graph", "Reference") as child_graph:
+        math_ops.add(x, x, name="add")
+    num_nodes = len(parent_graph.get_nodes())
+    with self.assertRaises(ValueError):
+      parent_graph.merge(child_graph)
+    self.assertEqual(len(parent_graph.get_nodes()), num_nodes)
+
+  def test_proto_lookup(self):
+    """Test looking up node protos and tensor data by name."""
+    with Graph("test_graph", "Reference") as test_graph:
+      for i in range(10):
+        input_data(
+            Tensor(
+                name="tensor%d" % i,
+                tensor_data=np.full(2, i, dtype=np.float32)), "input%d" % i)
+    graph_proto, tensor_data_array, index = test_graph.to_proto(
+        with_index=True)
+    for i in range(10):
+      for node_index, data_index in ((None, None),
+                                     (index.nodes, index.tensor_data)):
+        self.assertEqual(
+            get_node_proto(graph_proto, "input%d" % i, node_index).name,
+            "input%d" % i)
+        self.assertEqual(
+            get_tensor_data(
+                tensor_data_array, "tensor%d" % i, data_index).float_data,
+            [i, i])
+    self.assertIsNone(get_node_proto(graph_proto, "input10"))
+    self.assertIsNone(get_node_proto(graph_proto, "input10", index.nodes))
+    # Lookups without an index stay correct after the protos are modified.
+    del graph_proto.nodes[0]
+    self.assertIsNone(get_node_proto(graph_proto, "input0"))
+    self.assertEqual(get_node_proto(graph_proto, "input1").name, "input1")
+    new_data = tensor_data_array.data_array.add()
+    new_data.name = "tensor10"
+    self.assertEqual(
+        get_tensor_data(tensor_data_array, "tensor10").name, "tensor10")
+
+if __name__ == "__main__":
+  unittest.main()
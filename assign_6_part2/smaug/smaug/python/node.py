@@ -7,6 +7,8 @@ from smaug.python import global_vars
 from smaug.python import datatypes
 
 class Node:
+  __slots__ = ("_name", "_op", "_params", "_inputs", "_outputs")
+
   def __init__(self, name, op, params=None, inputs=None, outputs=None):
     """Create a node.
 
@@ -38,6 +40,10 @@ class Node:
   def op(self):
     return self._op
 
+  @property
+  def params(self):
+    return self._params
+
   @property
   def inputs(self):
     return self._inputs
@@ -1,11 +1,28 @@
 import numpy as np
 import warnings
+import weakref
 
 from smaug.core import types_pb2
 from smaug.core import node_pb2
 from smaug.python import global_vars, tensor_utils
+from smaug.python.tensor import Tensor
 from smaug.python.ops import common
 
+# The axes order of every layout transformation that is a transpose, as
+# passed to np.transpose.
+_LAYOUT_TRANSPOSES = {
+    (types_pb2.NCHW, types_pb2.NHWC): (0, 2, 3, 1),
+    (types_pb2.NHWC, types_pb2.NCHW): (0, 3, 1, 2),
+    (types_pb2.NTC, types_pb2.NCT): (0, 2, 1),
+    (types_pb2.NCT, types_pb2.NTC): (0, 2, 1),
+    (types_pb2.NC, types_pb2.CN): (1, 0),
+    (types_pb2.CN, types_pb2.NC): (1, 0),
+}
+
+# Layout transformed copies of constant tensors, by the original tensor and
+# the target layout. Entries go away with the original tensor.
+_folded_constants = weakref.WeakKeyDictionary()
+
 def reorder(input_tensor, target_layout, name="reorder"):
   """Reorder the data of a given `Tensor` with the target layout.
 
@@ -245,14 +262,47 @@ def unstack(input_tensor, axis, name="unstack"):
     outputs.append(squeeze(tensor, axis, name=name + ":squeeze"))
   return outputs
 
+def broadcast_shape(tensor_a, tensor_b):
+  """Return the dims of two tensors broadcast to each other.
+
+  This uses NumPy's broadcasting rules: on each axis, a dimension of size 1 is
+  broadcast across the larger dimension of the other tensor.
+
+  Args:
+    tensor_a: The first input tensor.
+    tensor_b: The second input tensor.
+
+  Returns:
+    A list of the broadcast dims.
+
+  Raises:
+    ValueError: If the shapes of the tensors are incompatible.
+  """
+  if len(tensor_a.shape.dims) != len(tensor_b.shape.dims):
+    raise ValueError(
+        "Cannot broadcast: tensor_a has %d dimensions but tensor_b has %d." %
+        (len(tensor_a.shape.dims), len(tensor_b.shape.dims)))
+  dims = []
+  for a_dim, b_dim in zip(tensor_a.shape.dims, tensor_b.shape.dims):
+    if a_dim != b_dim and a_dim != 1 and b_dim != 1:
+      raise ValueError(
+          "tensor_a shape %s and tensor_b shape %s are incompatible for "
+          "broadcasting" % (str(tensor_a.shape.dims), str(
+              tensor_b.shape.dims)))
+    dims.append(max(a_dim, b_dim))
+  return dims
+
 def broadcast_inputs(tensor_a, tensor_b, name="broadcast_inputs"):
   """Broadcast inputs to have a compatible shape.
 
   This uses NumPy's broadcasting rules to make inputs of different shapes have a
   compatible shape during arithmetic operations. On each axis, the smaller
-  dimension (of size 1) is broadcast across the larger dimension so that they
-  have compatible shapes. Broadcasting provides a means of vectorizing
-  operations.
+  dimension (of size 1) is repeated across the larger dimension so that they
+  have compatible shapes.
+
+  The repeated data is materialized by `Repeat` operators. The elementwise
+  add and mul operators don't need this, as the backends read their broadcast
+  dimensions with a stride of 0 instead.
 
   Args:
     tensor_a: The first input tensor.
@@ -270,9 +320,9 @@ def broadcast_inputs(tensor_a, tensor_b, name="broadcast_inputs"):
      b = np.random.rand(2, 1).astype(np.float16)
      tensor_a = Tensor(data_layout=NC, tensor_data=a)
      tensor_b = Tensor(data_layout=NC, tensor_data=b)
-     # The elementwise add operator calls _broadcast_inputs() so that tensor_b
-     # is broadcast in axis 1, making both inputs shaped [2, 8].
-     output = add(tensor_a, tensor_b)
+     # The less operator calls broadcast_inputs() so that tensor_b is
+     # broadcast in axis 1, making both inputs shaped [2, 8].
+     output = less(tensor_a, tensor_b)
 
   .. code:: python
 
@@ -280,44 +330,67 @@ def broadcast_inputs(tensor_a, tensor_b, name="broadcast_inputs"):
      b = np.random.rand(2, 1, 8, 8).astype(np.float16)
      tensor_a = Tensor(data_layout=NHWC, tensor_data=a)
      tensor_b = Tensor(data_layout=NHWC, tensor_data=b)
-     # The elementwise mul operator calls _broadcast_inputs() so that both
-     # inputs will be shaped [2, 16, 8, 8].
-     output = mul(tensor_a, tensor_b)
+     # The greater operator calls broadcast_inputs() so that both inputs will
+     # be shaped [2, 16, 8, 8].
+     output = greater(tensor_a, tensor_b)
   """
-  if len(tensor_a.shape.dims) != len(tensor_b.shape.dims):
-    raise ValueError(
-        "Cannot broadcast: tensor_a has % dimensions but tensor_b has %." %
-        (len(tensor_a.shape.dims), len(tensor_b.shape.dims)))
-  multiples_a = np.ones(len(tensor_a.shape.dims), dtype=np.int32)
-  multiples_b = np.ones(len(tensor_a.shape.dims), dtype=np.int32)
-  # Loop over the matching dimensions of the two inputs.
-  for i, (a_dim, b_dim) in enumerate(
-      zip(tensor_a.shape.dims, tensor_b.shape.dims)):
-    if a_dim == b_dim:
-      continue
-    elif a_dim == 1:
-      # tensor_a will be broadcast along this dimension.
-      multiples_a[i] = b_dim
-    elif b_dim == 1:
-      # tensor_b will be broadcast along this dimension.
-      multiples_b[i] = a_dim
-    else:
-      raise ValueError(
-          "tensor_a shape %s and tensor_b shape %s are incompatible for "
-          "broadcasting)" % (str(tensor_a.shape.dims), str(
-              tensor_b.shape.dims)))
+  dims = broadcast_shape(tensor_a, tensor_b)
+  multiples_a = np.array(dims, dtype=np.int32) // tensor_a.shape.dims
+  multiples_b = np.array(dims, dtype=np.int32) // tensor_b.shape.dims
   if not np.all(multiples_a == 1):
     tensor_a = repeat(tensor_a, multiples_a, name=name + ":repeat_a")
   if not np.all(multiples_b == 1):
     tensor_b = repeat(tensor_b, multiples_b, name=name + ":repeat_b")
   return tensor_a, tensor_b
 
+def fold_layout_transform(input_tensor, target_layout):
+  """Transform the layout of a constant tensor at graph-build time.
+
+  This is the counterpart of `reorder` for tensors that carry data and have no
+  source node, e.g. weights. The data is transposed in NumPy, so the graph
+  gets a constant already in `target_layout` instead of a `Reorder` node.
+  Transforming the same tensor again returns the same constant.
+
+  Args:
+    input_tensor: A `Tensor` with data and no source node.
+    target_layout: The target layout.
+
+  Returns:
+    A new constant `Tensor` with the layout as `target_layout`, or None if the
+    transformation cannot be folded.
+  """
+  src_layout = input_tensor.shape.layout
+  folded = _folded_constants.setdefault(input_tensor, {})
+  if target_layout in folded:
+    return folded[target_layout]
+  # Padding is added to the last dimension, which moves in a transpose, so the
+  # data is transformed without it.
+  data = input_tensor.unpadded_data
+  if (src_layout, target_layout) in _LAYOUT_TRANSPOSES:
+    data = np.transpose(data, _LAYOUT_TRANSPOSES[(src_layout, target_layout)])
+  elif (src_layout in (types_pb2.NCHW, types_pb2.NHWC)
+        and target_layout == types_pb2.NC):
+    data = np.reshape(data, (data.shape[0], -1))
+  else:
+    return None
+  name = None
+  if input_tensor.name is not None:
+    name = "%s/%s" % (
+        input_tensor.name, types_pb2.DataLayout.Name(target_layout))
+  folded[target_layout] = Tensor(
+      name=name, data_layout=target_layout,
+      tensor_data=np.ascontiguousarray(data),
+      data_format=input_tensor.data_format,
+      alignment=input_tensor.shape.alignment)
+  return folded[target_layout]
+
 def check_and_add_layout_transform(name, op, input_tensors):
   """ Check and perform layout transformation for the input tensors.
 
   This checks the input layout against the expected layout, and if a mismatch
   is found, an reorder operator will be added to transform the tensors into
-  expected layouts.
+  expected layouts. Constant tensors are transformed at graph-build time
+  instead, see `fold_layout_transform`.
 
   Args:
     name: Name of the operator.
@@ -336,6 +409,13 @@ def check_and_add_layout_transform(name, op, input_tensors):
         op].input_layoutsets[i]
     input_layout = input_tensors[i].shape.layout
     if not expected_layoutset.contains(input_layout):
+      if (input_tensors[i].source is None
+          and input_tensors[i].has_data):
+        folded_tensor = fold_layout_transform(
+            input_tensors[i], expected_layoutset.layouts)
+        if folded_tensor is not None:
+          input_tensors[i] = folded_tensor
+          continue
       reorder_op_output = tensor_utils.get_tensor_reorder_op(
           input_tensors[i], expected_layoutset.layouts)
       if reorder_op_output is not None:
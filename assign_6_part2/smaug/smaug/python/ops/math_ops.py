@@ -1,22 +1,36 @@
 from smaug.core import types_pb2
 from smaug.python.ops import array_ops, common
 
-def _math_op_common(tensor_a, tensor_b, op, name, output_tensor_dtype=None):
+def _math_op_common(
+    tensor_a, tensor_b, op, name, output_tensor_dtype=None,
+    native_broadcast=False):
+  """Add an elementwise operator of two inputs.
+
+  If `native_broadcast` is True, inputs of different shapes are passed to the
+  operator as they are, which reads their broadcast dimensions with a stride of
+  0. Otherwise they are broadcast with `Repeat` operators first.
+  """
+  output_dims = tensor_a.shape.dims
   if tensor_a.shape.dims != tensor_b.shape.dims:
-    tensor_a, tensor_b = array_ops.broadcast_inputs(tensor_a, tensor_b, name)
+    if native_broadcast:
+      output_dims = array_ops.broadcast_shape(tensor_a, tensor_b)
+    else:
+      tensor_a, tensor_b = array_ops.broadcast_inputs(tensor_a, tensor_b, name)
+      output_dims = tensor_a.shape.dims
   if output_tensor_dtype == None:
     output_tensor_dtype = tensor_a.data_type
   return common.add_node(
       name=name, op=op, input_tensors=[tensor_a, tensor_b],
-      output_tensors_dims=[tensor_a.shape.dims],
+      output_tensors_dims=[output_dims],
       output_tensor_layout=tensor_a.shape.layout,
       output_tensor_dtype=output_tensor_dtype)[0]
 
 def add(tensor_a, tensor_b, name="add"):
   """Elementwise addition.
 
-  If the inputs have different shapes, broadcasting is used to to make the
-  shapes compatible.
+  If the inputs have different shapes, they are broadcast to each other. The
+  broadcast dimensions are read with a stride of 0, so no `Repeat` operator is
+  added for them.
 
   Args:
     tensor_a: First input tensor.
@@ -24,15 +38,17 @@ def add(tensor_a, tensor_b, name="add"):
     name: Name of the operator.
 
   Returns:
-    A tensor with the same shape as the inputs (or broadcast inputs).
+    A tensor with the broadcast shape of the inputs.
   """
-  return _math_op_common(tensor_a, tensor_b, types_pb2.EltwiseAdd, name)
+  return _math_op_common(
+      tensor_a, tensor_b, types_pb2.EltwiseAdd, name, native_broadcast=True)
 
 def mul(tensor_a, tensor_b, name="mul"):
   """Elementwise multiplication.
 
-  If the inputs have different shapes, broadcasting is used to to make the
-  shapes compatible.
+  If the inputs have different shapes, they are broadcast to each other. The
+  broadcast dimensions are read with a stride of 0, so no `Repeat` operator is
+  added for them.
 
   Args:
     tensor_a: First input tensor.
@@ -40,9 +56,10 @@ def mul(tensor_a, tensor_b, name="mul"):
     name: Name of the operator.
 
   Returns:
-    A tensor with the same shape as the inputs (or broadcast inputs).
+    A tensor with the broadcast shape of the inputs.
   """
-  return _math_op_common(tensor_a, tensor_b, types_pb2.EltwiseMul, name)
+  return _math_op_common(
+      tensor_a, tensor_b, types_pb2.EltwiseMul, name, native_broadcast=True)
 
 def less(tensor_a, tensor_b, name="less"):
   """Returns the truth value of (tensor_a < tensor_b) element-wise.
@@ -46,7 +46,7 @@ class OperatorTest:
       assert False, "Other layouts not expected here!"
 
   def get_node(self, name):
-    return get_node_proto(self.test_graph, name)
+    return get_node_proto(self.test_graph, name, self.test_graph_index.nodes)
 
   def build_test_sequential_graph(self, backend):
     """Create a sequential model."""
@@ -105,7 +105,8 @@ class OperatorTest:
       out0 = array_ops.reshape(out0, [1, 1, 8, 10], types_pb2.NCHW, "reshape")
       out0 = array_ops.padding(out0, [0, 0, 0, 0, 1, 1, 1, 1], "padding")
 
-    self.test_graph, _ = graph.to_proto()
+    self.test_graph, _, self.test_graph_index = graph.to_proto(
+        with_index=True)
     self.backend = backend
     self.alignment = global_vars.backend_alignment[backend]
 
@@ -165,7 +166,8 @@ class OperatorTest:
           math_ops.add(out0, out1, "add1"), math_ops.add(out2, out3, "add2"),
           "mul1")
 
-    self.test_graph, _ = graph.to_proto()
+    self.test_graph, _, self.test_graph_index = graph.to_proto(
+        with_index=True)
     self.backend = backend
     self.alignment = global_vars.backend_alignment[
         self.test_graph.backend]
@@ -818,19 +820,24 @@ class RefSequentialGraphTest(unittest.TestCase, SequentialGraphTest):
     # flatten (Flatten)
     node = self.get_node("flatten")
     self.assertEqual(node.parents[0], "pool")
-    # Transpose fc0 weights
-    node = self.get_node("reorder")
+    # The fc weights are transposed at graph-build time, so no reorder is
+    # added for them.
+    self.assertIsNone(self.get_node("reorder"))
     # fc0 (FC)
     node = self.get_node("fc0")
-    self.assertEqual(node.parents, ["flatten", "reorder"])
+    self.assertEqual(node.parents[0], "flatten")
+    weights = self.get_node(node.parents[1])
+    self.assertEqual(weights.op, types_pb2.Data)
+    self.assertEqual(weights.output_tensors[0].shape.layout, types_pb2.CN)
     # fc0_relu (ReLU)
     node = self.get_node("fc0_relu")
     self.assertEqual(node.parents[0], "fc0")
-    # Transpose fc1/weights
-    node = self.get_node("reorder_1")
     # fc1 (FC)
     node = self.get_node("fc1")
-    self.assertEqual(node.parents, ["fc0_relu", "reorder_1"])
+    self.assertEqual(node.parents[0], "fc0_relu")
+    weights = self.get_node(node.parents[1])
+    self.assertEqual(weights.op, types_pb2.Data)
+    self.assertEqual(weights.output_tensors[0].shape.layout, types_pb2.CN)
     # expand_dims (Reshape).
     node = self.get_node("expand_dims")
     self.assertEqual(node.parents[0], "fc1")
@@ -965,5 +972,96 @@ class RefResidualGraphTest(unittest.TestCase, ResidualGraphTest):
     node = self.get_node("mul1")
     self.assertEqual(node.parents, ["add1", "add2"])
 
+class LayoutFoldingTest(unittest.TestCase):
+  """Test the graph-build time layout transformation of constants."""
+
+  def test_mat_mul_weights(self):
+    weights = np.random.rand(16, 8).astype(np.float32)
+    weight_tensor = Tensor(
+        name="weights", data_layout=types_pb2.NC, tensor_data=weights)
+    with Graph(name="test_graph", backend="Reference") as graph:
+      input_tensor = data_op.input_data(Tensor(
+          data_layout=types_pb2.NC,
+          tensor_data=np.random.rand(2, 8).astype(np.float32)))
+      out = nn_ops.mat_mul(input_tensor, weight_tensor, name="fc0")
+      out = nn_ops.mat_mul(input_tensor, weight_tensor, name="fc1")
+    self.assertEqual(
+        [node.op for node in graph.get_nodes()],
+        [types_pb2.Data, types_pb2.Data, types_pb2.InnerProduct,
+         types_pb2.InnerProduct])
+    folded_tensor = graph.get_node("fc0").inputs[1].source.inputs[0]
+    self.assertIs(graph.get_node("fc1").inputs[1].source.inputs[0],
+                  folded_tensor)
+    self.assertEqual(folded_tensor.name, "weights/CN")
+    self.assertEqual(folded_tensor.shape.layout, types_pb2.CN)
+    np.testing.assert_array_equal(folded_tensor.tensor_data, weights.T)
+
+  def test_conv_filters(self):
+    filters = np.random.rand(8, 3, 3, 3).astype(np.float16)
+    filter_tensor = Tensor(data_layout=types_pb2.NCHW, tensor_data=filters)
+    with Graph(name="test_graph", backend="SMV") as graph:
+      input_tensor = data_op.input_data(Tensor(
+          data_layout=types_pb2.NHWC,
+          tensor_data=np.random.rand(1, 8, 8, 3).astype(np.float16)))
+      out = nn_ops.convolution(
+          input_tensor, filter_tensor, stride=[1, 1], padding="same")
+    self.assertNotIn(
+        types_pb2.Reorder, [node.op for node in graph.get_nodes()])
+    folded_tensor = graph.get_node("conv").inputs[1].source.inputs[0]
+    self.assertEqual(folded_tensor.shape.layout, types_pb2.NHWC)
+    self.assertEqual(folded_tensor.shape.dims, (8, 3, 3, 3))
+    np.testing.assert_array_equal(
+        folded_tensor.tensor_data[..., :3], np.transpose(filters, (0, 2, 3, 1)))
+
+class BroadcastTest(unittest.TestCase):
+  """Test broadcasting the inputs of elementwise operators."""
+
+  def setUp(self):
+    self.tensor_a = Tensor(
+        data_layout=types_pb2.NC,
+        tensor_data=np.random.rand(2, 8).astype(np.float32))
+    self.tensor_b = Tensor(
+        data_layout=types_pb2.NC,
+        tensor_data=np.random.rand(1, 8).astype(np.float32))
+
+  def test_native_broadcast(self):
+    with Graph(name="test_graph", backend="Reference") as graph:
+      a = data_op.input_data(self.tensor_a, name="a")
+      b = data_op.input_data(self.tensor_b, name="b")
+      out = math_ops.add(a, b, name="add")
+      out = math_ops.mul(b, out, name="mul")
+    self.assertNotIn(
+        types_pb2.Repeat, [node.op for node in graph.get_nodes()])
+    self.assertEqual(graph.get_node("add").get_parents(), ["a", "b"])
+    self.assertEqual(graph.get_node("mul").get_parents(), ["b", "add"])
+    self.assertEqual(out.shape.dims, (2, 8))
+
+  def test_repeat_broadcast(self):
+    with Graph(name="test_graph", backend="Reference") as graph:
+      a = data_op.input_data(self.tensor_a, name="a")
+      b = data_op.input_data(self.tensor_b, name="b")
+      out = math_ops.less(a, b, name="less")
+    self.assertEqual(
+        graph.get_node("less").get_parents(), ["a", "less:repeat_b"])
+    self.assertEqual(out.shape.dims, (2, 8))
+
+  def test_incompatible_shapes(self):
+    tensor_c = Tensor(
+        data_layout=types_pb2.NC,
+        tensor_data=np.random.rand(2, 4).astype(np.float32))
+    with Graph(name="test_graph", backend="Reference"):
+      with self.assertRaises(ValueError):
+        math_ops.add(self.tensor_a, tensor_c)
+    tensor_d = Tensor(
+        data_layout=types_pb2.NHWC,
+        tensor_data=np.random.rand(2, 1, 1, 8).astype(np.float32))
+    # both the native and the Repeat broadcast check the ranks
+    for op in [math_ops.add, math_ops.less]:
+      with Graph(name="test_graph", backend="Reference"):
+        with self.assertRaisesRegex(
+            ValueError,
+            "Cannot broadcast: tensor_a has 2 dimensions but tensor_b has 4."):
+          op(self.tensor_a, tensor_d)
+
 if __name__ == "__main__":
   unittest.main()
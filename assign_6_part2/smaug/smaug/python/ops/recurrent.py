@@ -1,6 +1,7 @@
 import numpy as np
 
 from smaug.core import types_pb2
+from smaug.python import datatypes
 from smaug.python.tensor import Tensor
 from smaug.python.ops import nn_ops
 from smaug.python.ops import math_ops
@@ -10,13 +11,18 @@ from smaug.python.ops import activation_ops
 class LSTM:
   def __init__(
       self, weight_tensors, activation="tanh", activation_params=dict(),
-      name="lstm"):
+      name="lstm", batch_input_projection=False):
     """ An LSTM layer.
 
     Args:
       weight_tensors: A list of two weights.
       activation: Activation function used in LSTM.
       activation_params: kwargs for the activation function.
+      batch_input_projection: If true, the inputs of all timesteps are
+        multiplied by the kernel in one large `mat_mul` before the timesteps
+        are unrolled, and only the recurrent `mat_mul` is done per timestep.
+        This only applies to inputs given as a single [batch, time, depth]
+        tensor.
     """
     assert len(weight_tensors) == 2
     self.name = name + ":"
@@ -24,10 +30,11 @@ class LSTM:
     self.prepare_states()
     self.activation = activation_ops.get_activation_op(activation)
     self.activation_params = activation_params
+    self.batch_input_projection = batch_input_projection
 
   def prepare_states(self):
     """Initialize states as zeros."""
-    data_type = self.kernel.tensor_data.dtype
+    data_type = datatypes.smaug_to_np_type[self.kernel.data_type]
     num_units = (
         self.kernel.shape.dims[0] if self.kernel.shape.layout == types_pb2.NC
         else self.wf.shape.dims[1]) // 4
@@ -45,7 +52,25 @@ class LSTM:
       outputs_expand.append(expand_dims(o, 1, name=self.name + "expand_dims"))
     return concat(outputs_expand, 1, name=self.name + "concat")
 
-  def __call__(self, input_tensor, concat_output=False):
+  def _project_inputs(self, input_tensor):
+    """Multiply the inputs of all timesteps by the kernel in one `mat_mul`.
+
+    Args:
+      input_tensor: Input tensor of shape [batch, time, depth].
+
+    Returns:
+      The projected inputs of shape [batch, time, 4 * units].
+    """
+    batch, time, depth = input_tensor.shape.dims
+    x = array_ops.reshape(
+        input_tensor, [batch * time, depth], types_pb2.NC,
+        name=self.name + "reshape_x")
+    z = nn_ops.mat_mul(x, self.kernel, name=self.name + "mm_x")
+    return array_ops.reshape(
+        z, [batch, time, z.shape.dims[1]], types_pb2.NTC,
+        name=self.name + "reshape_z")
+
+  def __call__(self, input_tensor, concat_output=False, reverse=False):
     """Invoke this cell repeatedly until finishing inputs.
 
     Args:
@@ -55,6 +80,8 @@ class LSTM:
       concat_output: If true, the output for each timestep will be concatenated
         into a single tensor, otherwise a list of output tensors will be
         returned.
+      reverse: If true, the timesteps are processed from the last to the
+        first.
 
     Returns:
       Output contains two parts:
@@ -63,29 +90,37 @@ class LSTM:
       2) The final state of the LSTM.
     """
     num_steps = 0
+    input_projected = False
     if not isinstance(input_tensor, list):
+      if self.batch_input_projection:
+        input_tensor = self._project_inputs(input_tensor)
+        input_projected = True
       input_steps = array_ops.unstack(
           input_tensor, 1, name=self.name + "unstack")
       num_steps = input_tensor.shape.dims[1]
     else:
-      input_steps = input_tensor
+      input_steps = list(input_tensor)
       num_steps = len(input_steps)
+    if reverse:
+      input_steps.reverse()
     state = self.c
     output_steps = []
     # Unroll the timesteps.
     for i in range(num_steps):
-      output, state = self.step(input_steps[i], i)
+      output, state = self.step(input_steps[i], i, input_projected)
       output_steps.append(output)
     if concat_output:
       return self._concat_output_steps(output_steps), state
     return output_steps, state
 
-  def step(self, input_tensor, timestep):
+  def step(self, input_tensor, timestep, input_projected=False):
     """Invoke this cell for a single timestep.
 
     Args:
       input_tensor: An input tensor of shape [batch, depth].
       timestep: The start timestep. This is used for naming the output tensors.
+      input_projected: If true, `input_tensor` is already multiplied by the
+        kernel and shaped [batch, 4 * units].
 
     Returns:
       Output contains two parts:
@@ -95,7 +130,10 @@ class LSTM:
     x = input_tensor
     name_pfx = self.name + "step%d:" % timestep
 
-    z = nn_ops.mat_mul(x, self.kernel, name=name_pfx + "mm_f")
+    if input_projected:
+      z = x
+    else:
+      z = nn_ops.mat_mul(x, self.kernel, name=name_pfx + "mm_f")
     z = math_ops.add(
         z, nn_ops.mat_mul(self.h, self.recurrent_kernel, name="mm_u"),
         name=name_pfx + "add_z")
@@ -121,25 +159,29 @@ class LSTM:
 class BidirectionalLSTM:
   def __init__(
       self, fwd_weight_tensors, bwd_weight_tensors, activation="tanh",
-      activation_params=dict(), name="bidir_lstm"):
+      activation_params=dict(), name="bidir_lstm",
+      batch_input_projection=False):
     """ A bidirectional LSTM layer.
 
     Args:
       fwd_weight_tensors: weights used for the forward LSTM.
       bwd_weight_tensors: weights used for the backward LSTM.
-      activation/activation_params: See in the LSTM class.
+      activation/activation_params/batch_input_projection: See in the LSTM
+        class.
     """
     self.name = name + ":"
     self.fwd_lstm = LSTM(
         fwd_weight_tensors,
         activation=activation,
         activation_params=activation_params,
-        name=self.name + "fwd_lstm")
+        name=self.name + "fwd_lstm",
+        batch_input_projection=batch_input_projection)
     self.bwd_lstm = LSTM(
         bwd_weight_tensors,
         activation=activation,
         activation_params=activation_params,
-        name=self.name + "bwd_lstm")
+        name=self.name + "bwd_lstm",
+        batch_input_projection=batch_input_projection)
 
   def __call__(self, input_tensor, concat_output=False):
     """ Invoke the bidirectional LSTM layer.
@@ -156,13 +198,7 @@ class BidirectionalLSTM:
     """
     fwd_outputs, fwd_state = self.fwd_lstm(input_tensor)
     # Reverse the time dimension of the input for the backward LSTM.
-    input_bwd = input_tensor
-    if isinstance(input_bwd, list):
-      input_bwd.reverse()
-    else:
-      input_bwd = array_ops.unstack(input_bwd, 1)
-      input_bwd.reverse()
-    bwd_outputs, bwd_state = self.bwd_lstm(input_bwd)
+    bwd_outputs, bwd_state = self.bwd_lstm(input_tensor, reverse=True)
     outputs = []
     for i in range(len(fwd_outputs)):
       outputs.append(
@@ -42,6 +42,32 @@ class LSTMTest(SmaugTest):
 
     self.runAndValidate(graph, tf_output)
 
+  def test_lstm_batch_input_projection(self):
+    # Build and run an LSTM layer in TF.
+    tf.keras.backend.set_floatx(
+        global_vars.backend_datatype[self.backend].__name__)
+    inputs = tf.random.normal([2, 4, 32],
+                              dtype=global_vars.backend_datatype[self.backend])
+    tf_lstm = tf.keras.layers.LSTM(32, use_bias=False, unit_forget_bias=False)
+    tf_output = tf_lstm(inputs)
+
+    # Build the model in SMAUG, projecting the inputs of all timesteps at once.
+    inputs_tensor = Tensor(
+        data_layout=types_pb2.NTC, tensor_data=inputs.numpy())
+    w, u = createSmaugWeights(tf_lstm)
+    with Graph(name=self.graph_name, backend=self.backend) as graph:
+      inputs = input_data(inputs_tensor)
+      sg_lstm = LSTM([w, u], batch_input_projection=True)
+      sg_lstm(inputs)
+    # One inner product for the inputs plus one recurrent one per timestep.
+    inner_products = [
+        node for node in graph.get_nodes()
+        if node.op == types_pb2.InnerProduct
+    ]
+    self.assertEqual(len(inner_products), 5)
+
+    self.runAndValidate(graph, tf_output)
+
   def test_multilayered_lstm(self):
     # Build and run an LSTM layer in TF.
     tf.keras.backend.set_floatx(
@@ -0,0 +1,263 @@
+"""Optimization passes that run over a `Graph` before it is written.
+
+The ops insert `Reorder`, `Reshape`, `Repeat` and `Data` nodes wherever a
+layout or shape needs fixing up, without looking at the rest of the graph.
+Every such node costs simulated time in the C++ runtime, so the passes here
+remove the ones that are redundant, and fuse standalone activations into the
+operators that can apply them. A `PassManager` runs the passes in order and
+reports the nodes each of them removed.
+
+Example:
+
+.. code:: python
+
+   with Graph("my_graph", "SMV") as graph:
+     ...
+   for report in PassManager().run(graph):
+     print(report.name, report.removed_nodes)
+   graph.write_graph()
+"""
+
+from collections import namedtuple
+
+from smaug.core import node_pb2
+from smaug.core import types_pb2
+
+PassReport = namedtuple("PassReport", ["name", "removed_nodes"])
+
+def _shape_key(tensor):
+  """Everything about a tensor that the C++ runtime sees, apart from data."""
+  return (
+      tensor.shape.dims, tensor.shape.layout, tensor.shape.alignment,
+      tensor.data_type, tensor.data_format)
+
+def _replace_uses(old_tensor, new_tensor):
+  """Make every node using `old_tensor` as input use `new_tensor` instead."""
+  for node in old_tensor.targets:
+    for i, tensor in enumerate(node.inputs):
+      if tensor is old_tensor:
+        node.update_input(new_tensor, i)
+        new_tensor.targets.append(node)
+  old_tensor.targets[:] = []
+
+def _producer(tensor, op):
+  """Return the source node of `tensor` if it is of type `op`, or None."""
+  if tensor.source is not None and tensor.source.op == op:
+    return tensor.source
+  return None
+
+class GraphPass:
+  """Base class of the graph optimization passes.
+
+  A pass rewires the nodes of a graph and removes the ones it made redundant.
+  It never removes a node producing one of the graph outputs.
+  """
+  name = "graph_pass"
+
+  def run(self, graph, outputs):
+    """Run the pass over a graph.
+
+    Args:
+      graph: The `Graph` to optimize.
+      outputs: The `Tensor`s the graph is run for.
+
+    Returns:
+      A list of the names of the removed nodes.
+    """
+    raise NotImplementedError
+
+class CancelInverseReorders(GraphPass):
+  """Remove pairs of `Reorder`s that transform a tensor back to its layout.
+
+  E.g. an NCHW->NHWC reorder followed by an NHWC->NCHW one, which happens when
+  ops with different backend layouts alternate.
+  """
+  name = "cancel_inverse_reorders"
+
+  def run(self, graph, outputs):
+    output_ids = {id(tensor) for tensor in outputs}
+    removed = []
+    for node in graph.get_nodes():
+      if node.op != types_pb2.Reorder or id(node.outputs[0]) in output_ids:
+        continue
+      first = _producer(node.inputs[0], types_pb2.Reorder)
+      if first is None:
+        continue
+      source_tensor = first.inputs[0]
+      if _shape_key(source_tensor) != _shape_key(node.outputs[0]):
+        continue
+      _replace_uses(node.outputs[0], source_tensor)
+      removed.append(node)
+      # The first reorder may still be used by other nodes.
+      if (len(first.outputs[0].targets) == 1
+          and id(first.outputs[0]) not in output_ids):
+        removed.append(first)
+    graph.remove_nodes(removed)
+    return [node.name for node in removed]
+
+class FoldReshapeChains(GraphPass):
+  """Fold consecutive `Reshape`s into one.
+
+  Reshapes keep the order of the data, so a chain of them is the same as its
+  last one applied to the input of the first. A reshape that ends up not
+  changing the shape is removed altogether.
+  """
+  name = "fold_reshape_chains"
+
+  def run(self, graph, outputs):
+    output_ids = {id(tensor) for tensor in outputs}
+    removed = []
+    for node in graph.get_nodes():
+      if node.op != types_pb2.Reshape:
+        continue
+      previous = _producer(node.inputs[0], types_pb2.Reshape)
+      if previous is not None:
+        node.inputs[0].targets.remove(node)
+        node.update_input(previous.inputs[0], 0)
+        previous.inputs[0].targets.append(node)
+        if (not previous.outputs[0].targets
+            and id(previous.outputs[0]) not in output_ids):
+          removed.append(previous)
+      if (_shape_key(node.inputs[0]) == _shape_key(node.outputs[0])
+          and id(node.outputs[0]) not in output_ids):
+        _replace_uses(node.outputs[0], node.inputs[0])
+        removed.append(node)
+    graph.remove_nodes(removed)
+    return [node.name for node in removed]
+
+class FuseActivations(GraphPass):
+  """Fuse activation nodes into the operator producing their input.
+
+  Convolutions, inner products and batch norms apply an activation set in
+  their `act_params` to their output, which saves the separate accelerator
+  invocation and memory round-trip of a standalone activation node. An
+  activation is only fused if it is the single user of its input.
+  """
+  name = "fuse_activations"
+
+  # Operators that apply `params.act_params` in the C++ runtime.
+  FUSIBLE_OPS = (
+      types_pb2.Convolution3d, types_pb2.ConvolutionDepthwise,
+      types_pb2.InnerProduct, types_pb2.BatchNorm)
+  # Activations that `act_params` can express.
+  FUSIBLE_ACTIVATIONS = (
+      types_pb2.ReLU, types_pb2.LReLU, types_pb2.ELU, types_pb2.SELU,
+      types_pb2.Tanh, types_pb2.HardTanh, types_pb2.Sigmoid)
+
+  def run(self, graph, outputs):
+    output_ids = {id(tensor) for tensor in outputs}
+    removed = []
+    for node in graph.get_nodes():
+      if (node.op not in self.FUSIBLE_ACTIVATIONS
+          or id(node.outputs[0]) in output_ids):
+        continue
+      input_tensor = node.inputs[0]
+      producer = input_tensor.source
+      if (producer is None or producer.op not in self.FUSIBLE_OPS
+          or producer.params is None
+          or producer.params.act_params.activation != types_pb2.UnknownOp
+          or len(input_tensor.targets) != 1
+          or id(input_tensor) in output_ids):
+        continue
+      act_params = node_pb2.ActivationParams()
+      if node.params is not None:
+        act_params.CopyFrom(node.params.act_params)
+      act_params.activation = node.op
+      producer.params.act_params.CopyFrom(act_params)
+      _replace_uses(node.outputs[0], input_tensor)
+      removed.append(node)
+    graph.remove_nodes(removed)
+    return [node.name for node in removed]
+
+class RemoveDeadNodes(GraphPass):
+  """Remove nodes whose outputs are never used.
+
+  Nodes only used by removed nodes are removed as well.
+  """
+  name = "remove_dead_nodes"
+
+  def run(self, graph, outputs):
+    output_ids = {id(tensor) for tensor in outputs}
+    removed = []
+    removed_ids = set()
+    # Nodes are in topological order, so visiting them backwards sees every
+    # node after all of its users.
+    for node in reversed(graph.get_nodes()):
+      used = any(
+          id(tensor) in output_ids or any(
+              id(target) not in removed_ids for target in tensor.targets)
+          for tensor in node.outputs)
+      if not used:
+        removed.append(node)
+        removed_ids.add(id(node))
+    graph.remove_nodes(removed)
+    return [node.name for node in reversed(removed)]
+
+class EliminateCommonSubexpressions(GraphPass):
+  """Merge nodes that compute the same outputs from the same inputs.
+
+  Two nodes are the same if they have the same operator, parameters and
+  output shapes, and use the same input tensors.
+  """
+  name = "eliminate_common_subexpressions"
+
+  def run(self, graph, outputs):
+    output_ids = {id(tensor) for tensor in outputs}
+    removed = []
+    seen = {}
+    for node in graph.get_nodes():
+      params = (
+          None if node.params is None else
+          node.params.SerializeToString(deterministic=True))
+      key = (
+          node.op, params, tuple(id(tensor) for tensor in node.inputs),
+          tuple(_shape_key(tensor) for tensor in node.outputs))
+      existing = seen.get(key)
+      if existing is None:
+        seen[key] = node
+        continue
+      if any(id(tensor) in output_ids for tensor in node.outputs):
+        continue
+      for tensor, existing_tensor in zip(node.outputs, existing.outputs):
+        _replace_uses(tensor, existing_tensor)
+      removed.append(node)
+    graph.remove_nodes(removed)
+    return [node.name for node in removed]
+
+def default_passes():
+  """Return the passes run by a `PassManager` by default, in order."""
+  return [
+      CancelInverseReorders(), FoldReshapeChains(),
+      EliminateCommonSubexpressions(), FuseActivations(), RemoveDeadNodes()
+  ]
+
+class PassManager:
+  def __init__(self, passes=None):
+    """Create a pass manager.
+
+    Args:
+      passes: A list of `GraphPass`es, run in order. Uses `default_passes()`
+        if not specified.
+    """
+    self._passes = default_passes() if passes is None else passes
+
+  def run(self, graph, outputs=None):
+    """Run all passes over a graph.
+
+    Args:
+      graph: The `Graph` to optimize.
+      outputs: The `Tensor`s the graph is run for, which are always kept. If
+        not specified, these are the outputs of the last node in the graph,
+        which is the one whose output the C++ runtime returns.
+
+    Returns:
+      A list of `PassReport`s, one per pass, with the names of the nodes the
+      pass removed.
+    """
+    if outputs is None:
+      nodes = graph.get_nodes()
+      outputs = nodes[-1].outputs if nodes else []
+    return [
+        PassReport(graph_pass.name, graph_pass.run(graph, outputs))
+        for graph_pass in self._passes
+    ]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+"""Tests for python/passes.py."""
+
+import unittest
+import numpy as np
+
+from smaug.core import types_pb2
+from smaug.python.tensor import Tensor
+from smaug.python.graph import Graph, get_node_proto
+from smaug.python.ops import activation_ops, array_ops, math_ops, nn_ops
+from smaug.python.ops.data_op import input_data
+from smaug.python.passes import (
+    PassManager, CancelInverseReorders, FoldReshapeChains, FuseActivations,
+    RemoveDeadNodes, EliminateCommonSubexpressions)
+
+class PassesTest(unittest.TestCase):
+  def setUp(self):
+    self.x = Tensor(
+        data_layout=types_pb2.NCHW,
+        tensor_data=np.random.rand(1, 2, 4, 4).astype(np.float32))
+    self.y = Tensor(
+        data_layout=types_pb2.NC,
+        tensor_data=np.random.rand(2, 8).astype(np.float32))
+
+  def assertGraphContains(self, graph, node_names):
+    self.assertEqual([node.name for node in graph.get_nodes()], node_names)
+
+  def test_cancel_inverse_reorders(self):
+    with Graph("test_graph", "Reference") as graph:
+      x = input_data(self.x, "input")
+      out = array_ops.reorder(x, types_pb2.NHWC, name="to_nhwc")
+      out = array_ops.reorder(out, types_pb2.NCHW, name="to_nchw")
+      out = activation_ops.relu(out, name="relu")
+    reports = PassManager([CancelInverseReorders()]).run(graph)
+    self.assertEqual(
+        reports, [("cancel_inverse_reorders", ["to_nchw", "to_nhwc"])])
+    self.assertGraphContains(graph, ["input", "relu"])
+    self.assertEqual(graph.get_node("relu").get_parents(), ["input"])
+    graph_proto, _ = graph.to_proto()
+    self.assertEqual(get_node_proto(graph_proto, "relu").parents, ["input"])
+
+  def test_keep_output_reorder(self):
+    """Test that the node producing the graph output is kept."""
+    with Graph("test_graph", "Reference") as graph:
+      x = input_data(self.x, "input")
+      out = array_ops.reorder(x, types_pb2.NHWC, name="to_nhwc")
+      out = array_ops.reorder(out, types_pb2.NCHW, name="to_nchw")
+    reports = PassManager([CancelInverseReorders()]).run(graph)
+    self.assertEqual(reports, [("cancel_inverse_reorders", [])])
+    self.assertGraphContains(graph, ["input", "to_nhwc", "to_nchw"])
+
+  def test_fold_reshape_chains(self):
+    with Graph("test_graph", "Reference") as graph:
+      y = input_data(self.y, "input")
+      out = array_ops.reshape(y, [2, 4, 2], types_pb2.NTC, name="reshape_a")
+      out = array_ops.reshape(out, [2, 2, 4], types_pb2.NTC, name="reshape_b")
+      out = activation_ops.relu(out, name="relu_b")
+      out = array_ops.reshape(out, [2, 4, 2], types_pb2.NTC, name="reshape_c")
+      out = array_ops.reshape(out, [2, 2, 4], types_pb2.NTC, name="reshape_d")
+      out = activation_ops.relu(out, name="relu_d")
+    reports = PassManager([FoldReshapeChains()]).run(graph)
+    self.assertEqual(
+        reports,
+        [("fold_reshape_chains", ["reshape_a", "reshape_c", "reshape_d"])])
+    self.assertGraphContains(graph, ["input", "reshape_b", "relu_b", "relu_d"])
+    self.assertEqual(graph.get_node("reshape_b").get_parents(), ["input"])
+    self.assertEqual(graph.get_node("relu_d").get_parents(), ["relu_b"])
+
+  def test_remove_dead_nodes(self):
+    with Graph("test_graph", "Reference") as graph:
+      y = input_data(self.y, "input")
+      unused = activation_ops.relu(y, name="unused_relu")
+      unused = activation_ops.sigmoid(unused, name="unused_sigmoid")
+      out = activation_ops.tanh(y, name="tanh")
+    reports = PassManager([RemoveDeadNodes()]).run(graph)
+    self.assertEqual(
+        reports, [("remove_dead_nodes", ["unused_relu", "unused_sigmoid"])])
+    self.assertGraphContains(graph, ["input", "tanh"])
+    self.assertEqual(graph.get_node("input").get_children(), ["tanh"])
+
+  def test_eliminate_common_subexpressions(self):
+    with Graph("test_graph", "Reference") as graph:
+      y = input_data(self.y, "input")
+      a = activation_ops.relu(y, name="relu")
+      b = activation_ops.relu(y, name="relu")
+      c = activation_ops.lrelu(y, slope=0.1, name="lrelu")
+      d = activation_ops.lrelu(y, slope=0.2, name="lrelu")
+      out = math_ops.add(math_ops.add(a, b), math_ops.add(c, d))
+    reports = PassManager([EliminateCommonSubexpressions()]).run(graph)
+    self.assertEqual(reports, [("eliminate_common_subexpressions", ["relu_1"])])
+    self.assertEqual(graph.get_node("add").get_parents(), ["relu", "relu"])
+    self.assertEqual(
+        graph.get_node("add_1").get_parents(), ["lrelu", "lrelu_1"])
+
+  def test_fuse_activations(self):
+    w = Tensor(
+        data_layout=types_pb2.NC,
+        tensor_data=np.random.rand(8, 8).astype(np.float32))
+    with Graph("test_graph", "SMV") as graph:
+      y = input_data(self.y, "input")
+      out = nn_ops.mat_mul(y, w, name="fc0")
+      out = activation_ops.lrelu(out, slope=0.5, name="lrelu")
+      out = nn_ops.mat_mul(out, w, name="fc1", activation="relu")
+      # The output of fc1 is used twice, so neither sigmoid is fused.
+      a = activation_ops.sigmoid(out, name="sigmoid")
+      b = activation_ops.sigmoid(out, name="sigmoid")
+      out = nn_ops.mat_mul(math_ops.add(a, b), w, name="fc2")
+      out = activation_ops.tanh(out, name="tanh")
+      out = math_ops.add(out, y, name="add")
+    reports = PassManager([FuseActivations()]).run(graph)
+    self.assertEqual(reports, [("fuse_activations", ["lrelu", "tanh"])])
+    self.assertEqual(graph.get_node("fc1").get_parents(), ["fc0", "data"])
+    self.assertEqual(graph.get_node("add_1").get_parents(), ["fc2", "input"])
+    graph_proto, _ = graph.to_proto()
+    act_params = get_node_proto(graph_proto, "fc0").params.act_params
+    self.assertEqual(act_params.activation, types_pb2.LReLU)
+    self.assertAlmostEqual(act_params.lrelu_params.slope, 0.5)
+    act_params = get_node_proto(graph_proto, "fc1").params.act_params
+    self.assertEqual(act_params.activation, types_pb2.ReLU)
+    act_params = get_node_proto(graph_proto, "fc2").params.act_params
+    self.assertEqual(act_params.activation, types_pb2.Tanh)
+
+  def test_default_passes(self):
+    with Graph("test_graph", "Reference") as graph:
+      x = input_data(self.x, "input")
+      a = array_ops.reorder(x, types_pb2.NHWC, name="to_nhwc")
+      a = array_ops.reorder(a, types_pb2.NCHW, name="to_nchw")
+      b = array_ops.reorder(x, types_pb2.NHWC, name="to_nhwc")
+      unused = activation_ops.relu(b, name="unused")
+      out = math_ops.add(
+          activation_ops.relu(a, name="relu"),
+          activation_ops.relu(x, name="relu"), name="add")
+    reports = PassManager().run(graph)
+    self.assertEqual(reports, [
+        ("cancel_inverse_reorders", ["to_nchw", "to_nhwc"]),
+        ("fold_reshape_chains", []),
+        ("eliminate_common_subexpressions", ["relu_1"]),
+        ("fuse_activations", []),
+        ("remove_dead_nodes", ["to_nhwc_1", "unused"]),
+    ])
+    self.assertGraphContains(graph, ["input", "relu", "add"])
+    graph_proto, _ = graph.to_proto()
+    self.assertEqual(len(graph_proto.nodes), 3)
+    self.assertEqual(
+        get_node_proto(graph_proto, "add").parents, ["relu", "relu"])
+
+if __name__ == "__main__":
+  unittest.main()
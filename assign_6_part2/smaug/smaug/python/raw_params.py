@@ -0,0 +1,92 @@
+"""Raw parameter files that the C++ side memory-maps instead of parsing.
+
+A raw parameter file is an alternative to the `TensorDataArray` protobuf
+written by `Graph.write_graph`. It holds a small `RawTensorIndex`, mapping the
+name of every tensor to its data type, shape and offset, followed by the raw
+data of all tensors at aligned offsets. See `RawTensorIndex` in
+smaug/core/tensor.proto for the exact layout.
+"""
+
+import struct
+
+import numpy as np
+
+from smaug.core import tensor_pb2
+from smaug.python import datatypes
+
+RAW_PARAMS_MAGIC = b"SMAUGRAW"
+# Alignment of the data section and of every tensor in it, in bytes.
+RAW_PARAMS_ALIGNMENT = 64
+# The magic, followed by the size of the serialized index.
+_HEADER = struct.Struct("<8sQ")
+
+def _align(value, alignment):
+  return (value + alignment - 1) // alignment * alignment
+
+def write_raw_params(tensors, path, alignment=RAW_PARAMS_ALIGNMENT):
+  """Write the data of tensors into a raw parameter file.
+
+  Args:
+    tensors: An iterable of `Tensor`s with data. Tensors are identified by
+      name, later tensors with the name of an earlier one are skipped.
+    path: Path of the output file.
+    alignment: Alignment of every tensor's data, in bytes.
+  """
+  index = tensor_pb2.RawTensorIndex(alignment=alignment)
+  # Only references to the tensors are kept, every tensor is converted to its
+  # raw form right before it is written.
+  indexed_tensors = []
+  names = set()
+  offset = 0
+  for tensor in tensors:
+    if tensor.name in names:
+      continue
+    names.add(tensor.name)
+    # Tensor data is padded on access, so the size is computed from the
+    # padded dims instead.
+    dims = tensor.padded_dims
+    size = int(np.prod(dims)) * np.dtype(
+        datatypes.smaug_to_np_type[tensor.data_type]).itemsize
+    index.entries.add(
+        name=tensor.name, data_type=tensor.data_type, dims=dims,
+        offset=offset, size=size)
+    indexed_tensors.append(tensor)
+    offset = _align(offset + size, alignment)
+
+  index_bytes = index.SerializeToString()
+  data_start = _align(_HEADER.size + len(index_bytes), alignment)
+  with open(path, "wb") as f:
+    f.write(_HEADER.pack(RAW_PARAMS_MAGIC, len(index_bytes)))
+    f.write(index_bytes)
+    for entry, tensor in zip(index.entries, indexed_tensors):
+      array = np.ascontiguousarray(tensor.tensor_data)
+      array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+      f.seek(data_start + entry.offset)
+      f.write(memoryview(array).cast("B"))
+    # Pad the file to the end of the last tensor's aligned slot.
+    f.truncate(data_start + offset)
+
+def read_raw_params(path):
+  """Memory-map the tensors of a raw parameter file.
+
+  Args:
+    path: Path of the raw parameter file.
+
+  Returns:
+    A dict from tensor name to a read-only NumPy array backed by the file.
+  """
+  with open(path, "rb") as f:
+    magic, index_size = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != RAW_PARAMS_MAGIC:
+      raise ValueError("%s is not a raw parameter file!" % path)
+    index = tensor_pb2.RawTensorIndex()
+    index.ParseFromString(f.read(index_size))
+  data_start = _align(_HEADER.size + index_size, index.alignment)
+  mapping = np.memmap(path, dtype=np.uint8, mode="r")
+  tensors = {}
+  for entry in index.entries:
+    dtype = np.dtype(datatypes.smaug_to_np_type[entry.data_type]).newbyteorder("<")
+    start = data_start + entry.offset
+    tensors[entry.name] = mapping[start:start + entry.size].view(
+        dtype).reshape(entry.dims)
+  return tensors
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+"""Tests for python/raw_params.py."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from smaug.core import types_pb2
+from smaug.core import tensor_pb2
+from smaug.python.tensor import Tensor
+from smaug.python.graph import Graph
+from smaug.python.tensor_utils import get_tensor_data
+from smaug.python.ops import math_ops
+from smaug.python.ops.data_op import input_data
+from smaug.python import raw_params
+
+class RawParamsTest(unittest.TestCase):
+  def setUp(self):
+    self.run_dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.run_dir)
+
+  def test_round_trip(self):
+    """Test that every tensor is read back as it was written."""
+    tensors = [
+        Tensor(name="a", tensor_data=np.random.rand(2, 3).astype(np.float32)),
+        Tensor(name="b", tensor_data=np.random.rand(5).astype(np.float16)),
+        Tensor(name="c", tensor_data=np.arange(-3, 4, dtype=np.int64)),
+        Tensor(name="d", tensor_data=np.array([[True], [False]])),
+    ]
+    path = os.path.join(self.run_dir, "test_params.bin")
+    raw_params.write_raw_params(tensors, path)
+    read_tensors = raw_params.read_raw_params(path)
+    self.assertEqual(list(read_tensors), ["a", "b", "c", "d"])
+    for tensor in tensors:
+      read_tensor = read_tensors[tensor.name]
+      self.assertEqual(read_tensor.dtype, tensor.tensor_data.dtype)
+      np.testing.assert_array_equal(read_tensor, tensor.tensor_data)
+
+  def test_alignment(self):
+    """Test that the data of every tensor starts at an aligned offset."""
+    tensors = [
+        Tensor(name="a", tensor_data=np.random.rand(3).astype(np.float32)),
+        Tensor(name="b", tensor_data=np.random.rand(7).astype(np.float64)),
+    ]
+    path = os.path.join(self.run_dir, "test_params.bin")
+    raw_params.write_raw_params(tensors, path, alignment=32)
+    with open(path, "rb") as f:
+      header = f.read(16)
+      index_size = int.from_bytes(header[8:], "little")
+      index = tensor_pb2.RawTensorIndex()
+      index.ParseFromString(f.read(index_size))
+    self.assertEqual(header[:8], raw_params.RAW_PARAMS_MAGIC)
+    self.assertEqual(index.alignment, 32)
+    self.assertEqual([entry.offset for entry in index.entries], [0, 32])
+    self.assertEqual([entry.size for entry in index.entries], [12, 56])
+    self.assertEqual(os.path.getsize(path) % 32, 0)
+
+  def test_padding(self):
+    """Test that tensor data is written padded to the tensor alignment."""
+    tensor_data = np.random.rand(3, 5).astype(np.float16)
+    with Graph("test_graph", "SMV") as test_graph:
+      tensor = Tensor(name="a", tensor_data=tensor_data)
+    path = os.path.join(self.run_dir, "test_params.bin")
+    raw_params.write_raw_params([tensor], path)
+    read_tensor = raw_params.read_raw_params(path)["a"]
+    self.assertEqual(read_tensor.shape, (3, 8))
+    np.testing.assert_array_equal(read_tensor[:, :5], tensor_data)
+    np.testing.assert_array_equal(read_tensor[:, 5:], 0)
+
+  def test_write_graph(self):
+    """Test that both parameter formats of a graph hold the same data."""
+    x = Tensor(
+        data_layout=types_pb2.N,
+        tensor_data=np.random.rand(4).astype(np.float16))
+    y = Tensor(
+        data_layout=types_pb2.N,
+        tensor_data=np.random.rand(4).astype(np.float16))
+    with Graph("test_graph", "SMV") as test_graph:
+      math_ops.add(x, y, name="add")
+    name = os.path.join(self.run_dir, "test_graph")
+    test_graph.write_graph(name, params_format="raw")
+    self.assertTrue(os.path.exists(name + "_topo.pbtxt"))
+    self.assertFalse(os.path.exists(name + "_params.pb"))
+    read_tensors = raw_params.read_raw_params(name + "_params.bin")
+    _, tensor_data_array = test_graph.to_proto()
+    for tensor in test_graph.get_data_tensors():
+      tensor_data_proto = get_tensor_data(tensor_data_array, tensor.name)
+      self.assertEqual(
+          list(tensor_data_proto.half_data),
+          list(read_tensors[tensor.name].view(np.int32)))
+
+  def test_unknown_format(self):
+    """Test that an unknown parameter format is rejected."""
+    with Graph("test_graph", "Reference") as test_graph:
+      input_data(
+          Tensor(tensor_data=np.random.rand(4).astype(np.float32)), "input")
+    with self.assertRaises(ValueError):
+      test_graph.write_graph(
+          os.path.join(self.run_dir, "test_graph"), params_format="json")
+
+if __name__ == "__main__":
+  unittest.main()
@@ -1,11 +1,84 @@
 import numpy as np
 
-from smaug.core import tensor_pb2
 from smaug.core import types_pb2
 from smaug.python import global_vars
 from smaug.python import datatypes
 
+# The `TensorData` field that holds each data type, and the element type it
+# is encoded with.
+_DATA_FIELDS = {
+    types_pb2.Float16: ("half_data", np.int32),
+    types_pb2.Float32: ("float_data", np.float32),
+    types_pb2.Float64: ("double_data", np.float64),
+    types_pb2.Int32: ("int_data", np.int32),
+    types_pb2.Int64: ("int64_data", np.int64),
+    types_pb2.Bool: ("bool_data", np.bool_),
+}
+
+# Wire type of length-delimited fields, used by all packed repeated fields.
+_WIRETYPE_LENGTH_DELIMITED = 2
+# A 64-bit varint takes at most 10 bytes.
+_MAX_VARINT_BYTES = 10
+
+def _encode_varints(values):
+  """Encode an array of integers as consecutive protobuf varints.
+
+  The encoding is done on whole arrays, one 7-bit group at a time, so no
+  Python object is created per element. Negative values are sign-extended to
+  64 bits, as protobuf does for int32 and int64 fields.
+  """
+  values = np.ascontiguousarray(values).ravel().astype(np.int64).view(np.uint64)
+  num_bytes = np.ones(values.size, dtype=np.uint8)
+  for i in range(1, _MAX_VARINT_BYTES):
+    num_bytes += values >= np.uint64(1 << (7 * i))
+  width = int(num_bytes.max()) if values.size > 0 else 1
+  groups = np.empty((values.size, width), dtype=np.uint8)
+  for i in range(width):
+    groups[:, i] = (values >> np.uint64(7 * i)) & np.uint64(0x7f)
+  group_index = np.arange(width, dtype=np.uint8)
+  groups[group_index < num_bytes[:, np.newaxis] - 1] |= 0x80
+  return groups[group_index < num_bytes[:, np.newaxis]].tobytes()
+
+def _encode_packed_field(field_number, values, dtype):
+  """Encode an array as a packed repeated protobuf field.
+
+  Floating point elements are fixed-width on the wire, so their payload is
+  the little-endian array buffer itself. Integer and bool elements are
+  varints.
+  """
+  if np.issubdtype(dtype, np.floating):
+    payload = np.ascontiguousarray(
+        values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+  else:
+    payload = _encode_varints(values)
+  key = _encode_varints(
+      [(field_number << 3) | _WIRETYPE_LENGTH_DELIMITED, len(payload)])
+  return key + payload
+
+class TensorShape:
+  """The shape of a `Tensor`.
+
+  This holds the same fields as `TensorShapeProto`, with the dimensions as a
+  plain tuple. The proto is only created when the tensor is serialized.
+  """
+  __slots__ = ("dims", "layout", "alignment")
+
+  def __init__(self, dims=(), layout=types_pb2.NCHW, alignment=0):
+    self.dims = tuple(dims)
+    self.layout = layout
+    self.alignment = alignment
+
+  def to_proto(self, shape_proto):
+    """Serialize the shape into a `TensorShapeProto`."""
+    shape_proto.dims[:] = self.dims
+    shape_proto.layout = self.layout
+    shape_proto.alignment = self.alignment
+
 class Tensor:
+  __slots__ = (
+      "_shape", "_tensor_data", "_data_type", "_name", "_data_format",
+      "_source", "_source_index", "_targets", "__weakref__")
+
   def __init__(
       self, dims=None, name=None, data_layout=types_pb2.NCHW, data_type=None,
       data_format=types_pb2.Uncompressed, tensor_data=None, source=None,
@@ -28,14 +101,13 @@ class Tensor:
     Returns:
       A `Tensor` object.
     """
-    self._shape = tensor_pb2.TensorShapeProto()
     self._tensor_data = tensor_data
     # If tensor_data is provided, deduce dims and data_type directly from it
     # (the kwargs are ignored if they are provided).
     if self._tensor_data is not None:
       self._deduce_attrs_from_data()
     else:
-      self._shape.dims.extend(dims)
+      self._shape = TensorShape(dims)
       self._data_type = data_type
 
     self._shape.layout = data_layout
@@ -54,12 +126,6 @@ class Tensor:
     else:
       self._shape.alignment = global_vars.get_graph().alignment
 
-    # Do data padding if this Tensor contains data.
-    if self._tensor_data is not None:
-      pad_width = [(0, 0) for i in range(len(self._shape.dims) - 1)]
-      pad_width.append((0, self.calc_padding(self._shape.dims[-1])))
-      self._tensor_data = np.pad(self._tensor_data, pad_width, 'constant')
-
   @property
   def name(self):
     return self._name
@@ -82,8 +148,37 @@ class Tensor:
 
   @property
   def tensor_data(self):
+    """The tensor data, padded on the last dimension to the alignment.
+
+    The supplied array is kept as is and padding is applied on access, so a
+    padded copy only exists while the caller holds it, e.g. while the tensor
+    is being serialized. Data that needs no padding is returned without a
+    copy.
+    """
+    if self._tensor_data is None:
+      return None
+    padding = self.calc_padding(self._shape.dims[-1])
+    if padding == 0:
+      return self._tensor_data
+    pad_width = [(0, 0)] * (len(self._shape.dims) - 1) + [(0, padding)]
+    return np.pad(self._tensor_data, pad_width, 'constant')
+
+  @property
+  def has_data(self):
+    """Whether the tensor carries data. This does not pad a copy of it."""
+    return self._tensor_data is not None
+
+  @property
+  def unpadded_data(self):
+    """The tensor data as supplied, without the alignment padding."""
     return self._tensor_data
 
+  @property
+  def padded_dims(self):
+    """The dimensions of `tensor_data`, with the last one padded."""
+    dims = self._shape.dims
+    return dims[:-1] + (dims[-1] + self.calc_padding(dims[-1]),)
+
   @property
   def source(self):
     return self._source
@@ -107,7 +202,7 @@ class Tensor:
     The deducible attributes include tensor shape dimensions and data type.
     """
     # Deduce dims from tensor data.
-    self._shape.dims.extend(list(self._tensor_data.shape))
+    self._shape = TensorShape(self._tensor_data.shape)
     # Deduce data type from tensor data
     try:
       self._data_type = datatypes.np_to_smaug_type[self._tensor_data.dtype.type]
@@ -128,11 +223,11 @@ class Tensor:
       tensor_data_array: The tensor data array this tensor gets serialized into.
     """
     tensor_proto.name = self._name
-    tensor_proto.shape.CopyFrom(self._shape)
+    self._shape.to_proto(tensor_proto.shape)
     tensor_proto.data_type = self._data_type
     tensor_proto.data_format = self._data_format
     if self._tensor_data is not None and tensor_data_array is not None:
-
+      tensor_data = self.tensor_data
       # Since Protobuf doesn't support float16 data type, we pack two float16
       # elements into one int32.
       if self._data_type == types_pb2.Float16:
@@ -142,24 +237,19 @@ class Tensor:
         # odd size, we pad a zero at the end of the list. When we later
         # deserialize the tensor data, we know the correct shape of the
         # tensor, and the padded zero will be discarded.
-        self._tensor_data = self._tensor_data.flatten()
-        if self._tensor_data.size % 2 != 0:
-          self._tensor_data = np.append(self._tensor_data, np.float16(0))
-        self._tensor_data = self._tensor_data.view(np.int32)
-
-      # Serialize the data into the proto.
+        tensor_data = tensor_data.ravel()
+        if tensor_data.size % 2 != 0:
+          tensor_data = np.append(tensor_data, np.float16(0))
+        tensor_data = np.ascontiguousarray(tensor_data).view(np.int32)
+
+      # Serialize the data into the proto. The whole array is encoded in the
+      # wire format and merged in one go, instead of being added element by
+      # element.
       tensor_data_proto = tensor_data_array.data_array.add()
       tensor_data_proto.name = tensor_proto.name
-      data_list = [x for x in np.nditer(self._tensor_data)]
-      if self._data_type == types_pb2.Float16:
-        tensor_data_proto.half_data.extend(data_list)
-      elif self._data_type == types_pb2.Float32:
-        tensor_data_proto.float_data.extend(data_list)
-      elif self._data_type == types_pb2.Float64:
-        tensor_data_proto.double_data.extend(data_list)
-      elif self._data_type == types_pb2.Int32:
-        tensor_data_proto.int_data.extend(data_list)
-      elif self._data_type == types_pb2.Int64:
-        tensor_data_proto.int64_data.extend(data_list)
-      elif self._data_type == types_pb2.Bool:
-        tensor_data_proto.bool_data.extend(data_list)
+      field_name, dtype = _DATA_FIELDS[self._data_type]
+      if tensor_data.size > 0:
+        field_number = tensor_data_proto.DESCRIPTOR.fields_by_name[
+            field_name].number
+        tensor_data_proto.MergeFromString(
+            _encode_packed_field(field_number, tensor_data, dtype))
@@ -45,6 +45,24 @@ class TensorBasicTest(TensorTestBase):
     self.assertEqual(len(tensor_data_proto.int_data), 0)
     self.assertEqual(len(tensor_data_proto.int64_data), 0)
 
+  def test_shape(self):
+    """Test the in-Python shape and its serialized proto."""
+    with Graph("test_graph", "SMV") as test_graph:
+      input_tensor = Tensor(
+          data_layout=types_pb2.NC,
+          tensor_data=np.random.rand(2, 6).astype(np.float16))
+      act = input_data(input_tensor, "input")
+    self.assertEqual(act.shape.dims, (2, 6))
+    self.assertEqual(act.shape.layout, types_pb2.NC)
+    self.assertEqual(act.shape.alignment, 8)
+    self.assertFalse(hasattr(act, "__dict__"))
+    self.assertFalse(hasattr(act.shape, "__dict__"))
+    graph_proto, _ = test_graph.to_proto()
+    node = get_node_proto(graph_proto, "input")
+    self.assertEqual(node.output_tensors[0].shape.dims, [2, 6])
+    self.assertEqual(node.output_tensors[0].shape.layout, types_pb2.NC)
+    self.assertEqual(node.output_tensors[0].shape.alignment, 8)
+
   def test_attr_smv_no_padding(self):
     """Test tensor attributes with SMV backend. No padding is required."""
     tensor_data = np.random.rand(2, 2, 4, 8).astype(np.float16)
@@ -92,6 +110,24 @@ class TensorBasicTest(TensorTestBase):
     self.assertEqual(len(tensor_data_proto.int_data), 0)
     self.assertEqual(len(tensor_data_proto.int64_data), 0)
 
+  def test_lazy_padding(self):
+    """Test that tensor data is only padded when it is accessed."""
+    tensor_data = np.array([[1.1, 2.2, 3.3, 4.4], [5.5, 6.6, 7.7, 8.8]],
+                           dtype=np.float16)
+    with Graph("test_graph", "SMV") as test_graph:
+      padded_tensor = Tensor(tensor_data=tensor_data)
+      aligned_tensor = Tensor(tensor_data=np.ones((2, 8), dtype=np.float16))
+    self.assertEqual(padded_tensor.shape.dims, (2, 4))
+    self.assertEqual(padded_tensor.padded_dims, (2, 8))
+    np.testing.assert_array_equal(
+        padded_tensor.tensor_data,
+        np.pad(tensor_data, [(0, 0), (0, 4)], "constant"))
+    self.assertEqual(aligned_tensor.padded_dims, (2, 8))
+    self.assertIs(aligned_tensor.tensor_data, aligned_tensor.tensor_data)
+    self.assertTrue(padded_tensor.has_data)
+    self.assertIs(padded_tensor.unpadded_data, tensor_data)
+    self.assertFalse(Tensor(dims=(2, 4)).has_data)
+
 class FP16Test(TensorTestBase):
   def test_fp16_even(self):
     """Test float16 packing when tensor's last dimension is of even size"""
@@ -136,5 +172,55 @@ class FP16Test(TensorTestBase):
     self.assertEqualFP16(tensor_data_proto.half_data,
                          np.append(tensor_data.flatten(), np.float16(0)))
 
+class SerializationTest(TensorTestBase):
+  def serialize(self, tensor_data):
+    with Graph("test_graph", "Reference") as test_graph:
+      input_tensor = Tensor(tensor_data=tensor_data)
+      act = input_data(input_tensor, "input")
+    graph_proto, tensor_data_array = test_graph.to_proto()
+    node = get_node_proto(graph_proto, "input")
+    return get_tensor_data(tensor_data_array, node.input_tensors[0].name)
+
+  def test_float64(self):
+    """Test serializing float64 data."""
+    tensor_data = np.random.rand(3, 5)
+    tensor_data_proto = self.serialize(tensor_data)
+    self.assertEqual(tensor_data_proto.double_data, list(tensor_data.flatten()))
+
+  def test_int32(self):
+    """Test serializing int32 data, including negative and extreme values."""
+    tensor_data = np.array(
+        [[0, 1, -1, 127], [128, -128, 2**31 - 1, -2**31]], dtype=np.int32)
+    tensor_data_proto = self.serialize(tensor_data)
+    self.assertEqual(tensor_data_proto.int_data, list(tensor_data.flatten()))
+
+  def test_int64(self):
+    """Test serializing int64 data, including negative and extreme values."""
+    tensor_data = np.array([0, 300, -300, 2**63 - 1, -2**63], dtype=np.int64)
+    tensor_data_proto = self.serialize(tensor_data)
+    self.assertEqual(tensor_data_proto.int64_data, list(tensor_data))
+
+  def test_bool(self):
+    """Test serializing bool data."""
+    tensor_data = np.array([[True, False], [False, True]])
+    tensor_data_proto = self.serialize(tensor_data)
+    self.assertEqual(tensor_data_proto.bool_data, list(tensor_data.flatten()))
+
+  def test_fp16_data_unchanged(self):
+    """Test that packing float16 data leaves the tensor data untouched."""
+    tensor_data = np.random.rand(3, 3).astype(np.float16)
+    input_tensor = Tensor(tensor_data=tensor_data)
+    with Graph("test_graph", "Reference") as test_graph:
+      act = input_data(input_tensor, "input")
+    test_graph.to_proto()
+    graph_proto, tensor_data_array = test_graph.to_proto()
+    self.assertEqual(input_tensor.tensor_data.dtype, np.float16)
+    np.testing.assert_array_equal(input_tensor.tensor_data, tensor_data)
+    node = get_node_proto(graph_proto, "input")
+    tensor_data_proto = get_tensor_data(
+        tensor_data_array, node.input_tensors[0].name)
+    self.assertEqualFP16(tensor_data_proto.half_data,
+                         np.append(tensor_data.flatten(), np.float16(0)))
+
 if __name__ == "__main__":
   unittest.main()
@@ -1,11 +1,37 @@
 from smaug.core import types_pb2
 from smaug.python.tensor import Tensor
 
-def get_tensor_data(tensor_data_array, tensor_name):
-  """Find the tensor data for this tensor by its name."""
-  for i in range(len(tensor_data_array.data_array)):
-    if tensor_data_array.data_array[i].name == tensor_name:
-      return tensor_data_array.data_array[i]
+def index_by_name(elements):
+  """Index the elements of a repeated message field by their names.
+
+  Args:
+    elements: A repeated message field, e.g. `GraphProto.nodes`.
+
+  Returns:
+    A dict from every name to the first element with that name.
+  """
+  index = {}
+  for element in elements:
+    index.setdefault(element.name, element)
+  return index
+
+def get_tensor_data(tensor_data_array, tensor_name, index=None):
+  """Find the tensor data for this tensor by its name.
+
+  Args:
+    tensor_data_array: A `TensorDataArray`.
+    tensor_name: Name of the tensor.
+    index: Optional name index of `tensor_data_array`, as returned by
+      `Graph.to_proto(with_index=True)`. Without it, the array is scanned.
+
+  Returns:
+    A `TensorData` or None.
+  """
+  if index is not None:
+    return index.get(tensor_name)
+  for tensor_data in tensor_data_array.data_array:
+    if tensor_data.name == tensor_name:
+      return tensor_data
   return None
 
 def get_padded_shape(shape):